@@ -0,0 +1,237 @@
+# discord-bot/bench/fakes.py
+"""
+Offline stand-ins for the parts of Discord the poll touches: guilds, channels, messages,
+component interactions and the HTTP calls behind them. Everything is in memory; HTTP
+calls just sleep for `latency` seconds and are counted.
+"""
+import time
+import asyncio
+import itertools
+from types import SimpleNamespace
+from datetime import datetime, timezone
+from typing import Dict, List
+import discord
+from discord.ext import commands
+
+
+class FakeHTTP:
+    """Counts (and slows down) what would have been REST calls."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls: Dict[str, int] = {}
+        # (perf_counter, channel id, content) of every message sent
+        self.sent: List[tuple] = []
+
+    async def request(self, kind: str):
+        self.calls[kind] = self.calls.get(kind, 0) + 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+
+_ids = itertools.count()
+
+
+def snowflake() -> int:
+    """A fresh message/user ID with the current time in it (cleanup looks at message age)."""
+    return discord.utils.time_snowflake(datetime.now(timezone.utc)) + next(_ids) % 4096
+
+
+class FakeRole:
+    def __init__(self, role_id: int):
+        self.id = role_id
+        self.name = f"role{role_id}"
+        self.mention = f"<@&{role_id}>"
+
+    def is_default(self) -> bool:
+        return False
+
+    def __eq__(self, other):
+        return isinstance(other, FakeRole) and other.id == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+
+class FakeGuild:
+    """A guild where every role ID exists."""
+
+    def __init__(self, guild_id: int, http: FakeHTTP | None = None):
+        self.id = guild_id
+        self.http = http or FakeHTTP()
+        self.me = FakeUser(guild_id, "bench-bot", bot=True, guild=self)
+        self.members: Dict[int, "FakeUser"] = {}
+
+    def get_member(self, member_id: int):
+        return self.members.get(member_id)
+
+    async def fetch_member(self, member_id: int):
+        await self.http.request("fetch_member")
+        if member_id not in self.members:
+            raise discord.NotFound(SimpleNamespace(status=404, reason="Not Found"), "Unknown Member")
+        return self.members[member_id]
+
+    def get_role(self, role_id):
+        return FakeRole(role_id) if role_id else None
+
+
+class FakeUser:
+    def __init__(self, user_id: int, name: str, bot: bool = False, admin: bool = False, guild: FakeGuild | None = None):
+        self.id = user_id
+        self.name = name
+        self.bot = bot
+        self.mention = f"<@{user_id}>"
+        self.guild = guild
+        self.guild_permissions = discord.Permissions.all() if admin else discord.Permissions.none()
+        self.roles: List[FakeRole] = []
+
+    async def add_roles(self, *roles, **kwargs):
+        for role in roles:
+            await self.guild.http.request("add_role")
+            if role not in self.roles:
+                self.roles.append(role)
+
+    async def remove_roles(self, *roles, **kwargs):
+        for role in roles:
+            await self.guild.http.request("remove_role")
+            if role in self.roles:
+                self.roles.remove(role)
+
+    async def edit(self, roles=None, **kwargs):
+        await self.guild.http.request("member_edit")
+        if roles is not None:
+            self.roles = list(roles)
+
+
+class FakeMessage:
+    def __init__(self, channel: "FakeChannel", content: str | None, view=None, message_id: int | None = None,
+                 author: FakeUser | None = None, embeds=()):
+        self.id = message_id or snowflake()
+        self.channel = channel
+        self.guild = channel.guild
+        self.author = author or channel.guild.me
+        self.content = content or ""
+        self.view = view
+        self.components = view.to_components() if view is not None else []
+        self.interaction = None
+        self.embeds = list(embeds)
+        self.mentions = []
+        self.attachments = []
+        self.deleted = False
+        self._state = None  # commands.Context reads it; fakes never talk to the gateway
+
+    async def edit(self, content=None, view=None, **kwargs):
+        await self.channel.http.request("edit")
+        self.content = content
+        self.view = view
+        self.components = view.to_components() if view is not None else []
+        return self
+
+    async def delete(self):
+        await self.channel.http.request("delete")
+        self.channel.messages.pop(self.id, None)
+        self.deleted = True
+
+
+class FakeChannel:
+    def __init__(self, channel_id: int, guild: FakeGuild, http: FakeHTTP, name: str = "poll"):
+        self.id = channel_id
+        self.guild = guild
+        self.http = http
+        self.name = name
+        self.mention = f"<#{channel_id}>"
+        self.type = discord.ChannelType.text
+        self.messages: Dict[int, FakeMessage] = {}
+
+    def permissions_for(self, member):
+        return member.guild_permissions
+
+    async def send(self, content=None, view=None, **kwargs):
+        await self.http.request("send")
+        message = FakeMessage(self, content, view)
+        self.messages[message.id] = message
+        self.http.sent.append((time.perf_counter(), self.id, content))
+        return message
+
+    async def delete_messages(self, messages):
+        await self.http.request("bulk_delete")
+        for m in messages:
+            gone = self.messages.pop(m.id, None)
+            if gone is not None:
+                gone.deleted = True
+
+    def get_partial_message(self, message_id: int):
+        return self.messages.get(message_id) or _GoneMessage()
+
+    async def fetch_message(self, message_id: int):
+        await self.http.request("fetch")
+        return self.messages[message_id]
+
+
+class _GoneMessage:
+    async def delete(self):
+        return None
+
+
+class FakeResponse:
+    def __init__(self, interaction: "FakeInteraction"):
+        self.interaction = interaction
+        self.text: str | None = None
+
+    def is_done(self) -> bool:
+        return self.text is not None
+
+    async def send_message(self, content=None, ephemeral: bool = False, **kwargs):
+        if self.text is not None:
+            raise RuntimeError("interaction answered twice")
+        self.text = content
+        if self.interaction.latency:
+            # the interaction callback is a REST call too
+            await asyncio.sleep(self.interaction.latency)
+        self.interaction.acked_at = time.perf_counter()
+        self.interaction.done.set()
+
+
+class FakeInteraction:
+    """A button click as the view store sees it: who clicked which custom_id on which message."""
+
+    def __init__(self, user: FakeUser, message: FakeMessage, custom_id: str, latency: float = 0.0):
+        self.user = user
+        self.message = message
+        self.channel = message.channel
+        self.guild = message.guild
+        self.guild_id = message.guild.id if message.guild else None
+        self.channel_id = message.channel.id
+        self.data = {"custom_id": custom_id, "component_type": 2}
+        self.type = discord.InteractionType.component
+        self.response = FakeResponse(self)
+        self.created_at = time.perf_counter()
+        self.acked_at: float | None = None
+        self.done = asyncio.Event()
+        self.latency = latency
+
+    @property
+    def ack_latency(self) -> float | None:
+        return None if self.acked_at is None else self.acked_at - self.created_at
+
+
+class FakeContext(commands.Context):
+    """Command context whose replies go to the fake channel instead of Discord's HTTP API."""
+
+    async def send(self, content=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
+
+
+def install(bot, channels: List[FakeChannel]):
+    """Make bot.get_channel() find the fake channels (and nothing else)."""
+    by_id = {c.id: c for c in channels}
+    bot.get_channel = by_id.get
+    return by_id
+
+
+def click(bot, user: FakeUser, message: FakeMessage, custom_id: str, latency: float = 0.0) -> FakeInteraction:
+    """Deliver a click the way discord.py does: through the view store, one task per interaction."""
+    interaction = FakeInteraction(user, message, custom_id, latency)
+    bot.dispatch("interaction", interaction)
+    bot._connection._view_store.dispatch_view(discord.ComponentType.button.value, custom_id, interaction)
+    return interaction
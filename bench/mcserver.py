@@ -0,0 +1,127 @@
+# discord-bot/bench/mcserver.py
+"""
+A stand-in Minecraft server that only answers status requests: the Java server list
+ping on TCP and the Bedrock unconnected ping on UDP. Point the status prober at it to
+see it go online/offline without a real server:
+
+    python -m bench.mcserver --java-port 25565 --bedrock-port 19132 --players 3
+    PROBE_HOST=127.0.0.1 LOGIN_CREDENTIALS=127.0.0.1,19132 PROBE_INTERVAL_SECONDS=5 python main.py
+
+Stop it (Ctrl+C) to make the server "shut down".
+"""
+import sys
+import json
+import time
+import struct
+import asyncio
+import argparse
+from utils.probe import RAKNET_MAGIC, UNCONNECTED_PING, UNCONNECTED_PONG, _packet, _read_varint, _varint
+
+
+class StandInServer:
+    """Serves one fixed status; `players` can be changed while it runs."""
+
+    def __init__(self, motd: str = "Stand-in server", players: int = 0, max_players: int = 20, version: str = "1.21"):
+        self.motd = motd
+        self.players = players
+        self.max_players = max_players
+        self.version = version
+        self.guid = int(time.time() * 1000) & 0x7FFFFFFFFFFFFFFF
+        self.requests = {"java": 0, "bedrock": 0}
+        self._tcp: asyncio.AbstractServer | None = None
+        self._udp: asyncio.DatagramTransport | None = None
+
+    async def start(self, host: str = "127.0.0.1", java_port: int = 0, bedrock_port: int = 0):
+        """Listen on the given ports (0 = any free port, None = don't serve that edition). Returns the ports used."""
+        ports = {}
+        if java_port is not None:
+            self._tcp = await asyncio.start_server(self._java, host, java_port)
+            ports["java"] = self._tcp.sockets[0].getsockname()[1]
+        if bedrock_port is not None:
+            loop = asyncio.get_running_loop()
+            self._udp, _ = await loop.create_datagram_endpoint(lambda: _BedrockProtocol(self), local_addr=(host, bedrock_port))
+            ports["bedrock"] = self._udp.get_extra_info("sockname")[1]
+        return ports
+
+    async def stop(self):
+        if self._tcp is not None:
+            self._tcp.close()
+            await self._tcp.wait_closed()
+            self._tcp = None
+        if self._udp is not None:
+            self._udp.close()
+            self._udp = None
+
+    def java_response(self) -> bytes:
+        status = {"version": {"name": self.version, "protocol": 767},
+                  "players": {"online": self.players, "max": self.max_players},
+                  "description": {"text": self.motd}}
+        data = json.dumps(status).encode()
+        return _packet(0x00, _varint(len(data)) + data)
+
+    def bedrock_pong(self, ping: bytes) -> bytes:
+        server_id = f"MCPE;{self.motd};686;{self.version};{self.players};{self.max_players};{self.guid};bench;Survival;1;"
+        text = server_id.encode()
+        return (bytes([UNCONNECTED_PONG]) + ping[1:9] + struct.pack(">q", self.guid) + RAKNET_MAGIC
+                + struct.pack(">H", len(text)) + text)
+
+    async def _java(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                length = await _read_varint(reader)
+                body = await reader.readexactly(length)
+                if body[:1] == b"\x00" and len(body) == 1:  # status request (the handshake has a payload)
+                    self.requests["java"] += 1
+                    writer.write(self.java_response())
+                    await writer.drain()
+                elif body[:1] == b"\x01":  # ping: echo it back
+                    writer.write(_packet(0x01, body[1:]))
+                    await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+class _BedrockProtocol(asyncio.DatagramProtocol):
+    def __init__(self, server: StandInServer):
+        self.server = server
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        if data[:1] == bytes([UNCONNECTED_PING]) and RAKNET_MAGIC in data:
+            self.server.requests["bedrock"] += 1
+            self.transport.sendto(self.server.bedrock_pong(data), addr)
+
+
+async def serve(args):
+    server = StandInServer(args.motd, args.players, args.max_players)
+    ports = await server.start(args.host, args.java_port, args.bedrock_port)
+    print(f"🟢 Stand-in server on {args.host}: " + ", ".join(f"{k} {v}" for k, v in ports.items()))
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--java-port", type=int, default=25565)
+    parser.add_argument("--bedrock-port", type=int, default=19132)
+    parser.add_argument("--players", type=int, default=0)
+    parser.add_argument("--max-players", type=int, default=20)
+    parser.add_argument("--motd", default="Stand-in server")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        print("🔴 Stand-in server stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+# discord-bot/bench/poll_load.py
+"""
+Load test for the poll hot path (PollView.vote_button, the poll's actor, the edit
+coalescer, post_poll, cooldowns, pause/resume, reset) against fake Discord objects — no
+network, no token.
+
+    python -m bench.poll_load                      # all scenarios
+    python -m bench.poll_load --scenario rush --voters 5000 --latency 0.05
+    python -m bench.poll_load --max-duplicates 0 --max-p99-ms 50   # fail (exit 1) on regressions
+
+For every scenario it prints throughput, p50/p99 ack latency, how many batches the
+poll's actor needed for the clicks, REST calls, owner notifications (and duplicates of
+them), cooldowns started while one was already running, votes counted after the
+threshold was reached, and peak Python memory.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import contextlib
+import tempfile
+import tracemalloc
+
+GUILD_ID = 1000
+NOTIFY_THREAD_ID = 999
+
+# name -> how the crowd behaves
+SCENARIOS = {
+    # everyone clicks once, threshold out of reach: the plain vote path
+    "rush": {"clicks": 1, "threshold": None, "cooldown": 120},
+    # a tenth of the crowd hammers the button (each click toggles their vote)
+    "toggle_spam": {"clicks": 10, "voters_div": 10, "threshold": None, "cooldown": 120},
+    # low threshold and short cooldown: the threshold is crossed again and again, also while cooling down
+    "threshold_cooldown": {"clicks": 1, "threshold": 25, "cooldown": 0.3, "rate": 2000},
+    # a pause and a resume land in the middle of the burst
+    "pause_resume": {"clicks": 1, "threshold": None, "cooldown": 120, "pause_at": 0.3, "resume_at": 0.6, "rate": 5000},
+    # an admin resets the open poll in the middle of the burst (the purge and repost are slow REST work)
+    "reset": {"clicks": 1, "threshold": None, "cooldown": 120, "reset_at": 0.5, "rate": 5000},
+    # everything at once: the whole crowd, a threshold it crosses many times, and a pause and resume racing the clicks
+    "contention": {"clicks": 1, "threshold": 25, "cooldown": 0.02, "pause_at": 0.4, "resume_at": 0.5, "rate": 0},
+}
+
+
+def configure(data_dir: str, edit_interval: float):
+    """The bot reads everything from the environment; point it at bench values before importing it."""
+    os.environ.update({
+        "DISCORD_TOKEN": "bench",
+        "POLL_CHANNEL_ID": "1",
+        "BOT_DATA_DIR": data_dir,
+        "NOTIFY_THREAD_ID": str(NOTIFY_THREAD_ID),
+        "NOTIFY_ROLE_ID": "1",
+        "POLL_EDIT_INTERVAL": str(edit_interval),
+    })
+    os.environ.setdefault("LOG_FORMAT", "text")
+    from utils.config import init_config
+    init_config(None)
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def run_scenario(name: str, spec: dict, args, channel_id: int) -> dict:
+    from bot_app import bot
+    import cogs.poll as pollmod
+    from cogs.pause import PauseCog
+    from utils.config import reload_config
+    from utils.helpers import DummyContext
+    from utils.outbound import outbound
+    from utils.notify import notifier
+    from utils.timers import timers
+    from utils.metrics import POLL_BATCH_SIZE
+    from bench.fakes import FakeHTTP, FakeGuild, FakeChannel, FakeUser, install, click
+
+    voters = max(1, args.voters // spec.get("voters_div", 1))
+    clicks = spec["clicks"] * voters
+    threshold = spec["threshold"] or clicks + 1
+    os.environ.update({
+        "POLL_CHANNEL_ID": str(channel_id),
+        "VOTE_THRESHOLD": str(threshold),
+        "POLL_COOLDOWN_SECONDS": str(spec["cooldown"]),
+    })
+    reload_config()
+
+    http = FakeHTTP(args.latency)
+    guild = FakeGuild(GUILD_ID)
+    channel = FakeChannel(channel_id, guild, http)
+    thread = FakeChannel(NOTIFY_THREAD_ID, guild, http, name="owners")
+    install(bot, [channel, thread])
+    pause_cog = PauseCog(bot)
+
+    message = await pollmod.post_poll(channel)
+    state = pollmod.poll_for_channel(channel)
+    users = [FakeUser(10_000 + i, f"voter{i}") for i in range(voters)]
+    rate = spec.get("rate", args.rate)
+    pause_at = int(clicks * spec["pause_at"]) if "pause_at" in spec else None
+    resume_at = int(clicks * spec["resume_at"]) if "resume_at" in spec else None
+    reset_at = int(clicks * spec["reset_at"]) if "reset_at" in spec else None
+
+    if args.memory:
+        tracemalloc.reset_peak()
+    http.calls.clear()
+    sent_before = len(http.sent)
+    # when notifications were accepted: sends to the thread are queued and may bunch up
+    accepted = []
+    notify = notifier.notify
+    def recording_notify(*a, **kw):
+        queued = notify(*a, **kw)
+        if queued:
+            accepted.append(time.perf_counter())
+        return queued
+    notifier.notify = recording_notify
+    # a cooldown starting while the last one is still running means two clicks both crossed the threshold
+    overlaps = 0
+    start_cooldown = pollmod.start_cooldown
+    async def recording_start_cooldown(s):
+        nonlocal overlaps
+        if timers.remaining(s.cooldown_key) is not None:
+            overlaps += 1
+        await start_cooldown(s)
+    pollmod.start_cooldown = recording_start_cooldown
+    # ...and a vote counted on a poll already at the threshold means a click slipped past it
+    late_votes = 0
+    add_vote = pollmod.vote_store.add
+    def recording_add(message_id, user_id):
+        nonlocal late_votes
+        if len(pollmod.vote_store.get(message_id)) >= threshold:
+            late_votes += 1
+        return add_vote(message_id, user_id)
+    pollmod.vote_store.add = recording_add
+    batches_before = POLL_BATCH_SIZE.count()
+    interactions = []
+    control = []
+    start = time.perf_counter()
+    for i in range(clicks):
+        if i == pause_at:
+            control.append(asyncio.create_task(pause_cog.pause.callback(pause_cog, DummyContext(channel))))
+        if i == resume_at:
+            control.append(asyncio.create_task(pause_cog.unpause.callback(pause_cog, DummyContext(channel))))
+        if i == reset_at:
+            control.append(asyncio.create_task(state.actor.ask("reset", channel)))
+        # people click whatever poll message they currently see
+        message = state.message or message
+        if not message.deleted:
+            # (a purged message has no button left to click)
+            interactions.append(click(bot, users[i % voters], message, state.custom_id, args.ack_latency))
+        if rate:
+            await asyncio.sleep(1 / rate)
+        elif i % 100 == 99:
+            await asyncio.sleep(0)
+
+    unanswered = 0
+    try:
+        await asyncio.wait_for(asyncio.gather(*(it.done.wait() for it in interactions)), args.timeout)
+    except asyncio.TimeoutError:
+        unanswered = sum(1 for it in interactions if not it.done.is_set())
+    acked = time.perf_counter()
+    for result in await asyncio.gather(*control, return_exceptions=True):
+        if isinstance(result, Exception):
+            print(f"❌ pause/unpause/reset failed: {result!r}", file=sys.stderr)
+    await pollmod.poll_edits.flush()
+    try:
+        await asyncio.wait_for(outbound.drain(), args.timeout)
+    except asyncio.TimeoutError:
+        pass
+    settled = time.perf_counter()
+    # whatever is still queued would only slow down the next scenario
+    pending_rest = outbound.clear()
+    notifier.notify = notify
+    pollmod.start_cooldown = start_cooldown
+    pollmod.vote_store.add = add_vote
+    pollmod.cancel_cooldown(state)
+
+    latencies = [it.ack_latency for it in interactions if it.ack_latency is not None]
+    notified = [t for t, cid, _ in http.sent[sent_before:] if cid == NOTIFY_THREAD_ID]
+    # votes are locked for the cooldown after a notification, so two within it are duplicates
+    duplicates = sum(1 for a, b in zip(accepted, accepted[1:]) if b - a < spec["cooldown"] / 2)
+    return {
+        "scenario": name,
+        "clicks": clicks,
+        "voters": voters,
+        "unanswered": unanswered,
+        "clicks_per_s": len(latencies) / max(acked - start, 1e-9),
+        "ack_p50_ms": (percentile(latencies, 0.50) or 0) * 1000,
+        "ack_p99_ms": (percentile(latencies, 0.99) or 0) * 1000,
+        "batches": POLL_BATCH_SIZE.count() - batches_before,
+        "settle_s": settled - start,
+        "edits": http.calls.get("edit", 0),
+        "rest_calls": sum(http.calls.values()),
+        "pending_rest": pending_rest,
+        "notifications": len(notified),
+        "duplicate_notifications": duplicates,
+        "cooldown_overlaps": overlaps,
+        "late_votes": late_votes,
+        # message views discord.py still routes clicks to (every poll so far, one each)
+        "live_views": pollmod.poll_views.stats()["store_messages"],
+        "peak_mem_mb": tracemalloc.get_traced_memory()[1] / 2**20 if args.memory else None,
+    }
+
+
+def print_table(results):
+    columns = ["scenario", "clicks", "unanswered", "clicks_per_s", "ack_p50_ms", "ack_p99_ms", "batches", "settle_s",
+               "edits", "rest_calls", "pending_rest", "notifications", "duplicate_notifications", "cooldown_overlaps",
+               "late_votes", "live_views", "peak_mem_mb"]
+    rows = [[(f"{r[c]:.2f}" if isinstance(r[c], float) else str(r[c])) for c in columns] for r in results]
+    widths = [max(len(c), *(len(row[i]) for row in rows)) for i, c in enumerate(columns)]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(v.ljust(w) for v, w in zip(row, widths)))
+
+
+async def main(args) -> int:
+    if args.memory:
+        tracemalloc.start()
+    names = args.scenario or list(SCENARIOS)
+    results = []
+    # the bot's own log lines go to stderr so stdout only carries the results
+    with contextlib.redirect_stdout(sys.stderr if not args.verbose else sys.stdout):
+        from cogs.poll import vote_store
+        for i, name in enumerate(names):
+            results.append(await run_scenario(name, SCENARIOS[name], args, channel_id=2000 + i))
+        vote_store.flush_now()
+        # log lines are written by a background thread; let it catch up before stdout is restored
+        from utils.log import log
+        log.flush()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+
+    failed = []
+    for r in results:
+        if args.max_duplicates is not None and r["duplicate_notifications"] > args.max_duplicates:
+            failed.append(f"{r['scenario']}: {r['duplicate_notifications']} duplicate owner notifications")
+        if r["cooldown_overlaps"]:
+            failed.append(f"{r['scenario']}: {r['cooldown_overlaps']} cooldowns started while one was running")
+        if r["late_votes"]:
+            failed.append(f"{r['scenario']}: {r['late_votes']} votes counted after the threshold was reached")
+        if args.max_p99_ms is not None and r["ack_p99_ms"] > args.max_p99_ms:
+            failed.append(f"{r['scenario']}: ack p99 {r['ack_p99_ms']:.1f} ms > {args.max_p99_ms} ms")
+        if r["unanswered"]:
+            failed.append(f"{r['scenario']}: {r['unanswered']} clicks never got a response")
+    for problem in failed:
+        print(f"❌ {problem}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS), help="run only this scenario (repeatable)")
+    parser.add_argument("--voters", type=int, default=2000, help="size of the crowd (default 2000)")
+    parser.add_argument("--rate", type=float, default=0, help="clicks per second, 0 = everyone at once (default)")
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated seconds per REST call (default 0.02)")
+    parser.add_argument("--ack-latency", type=float, default=0.0,
+                        help="simulated seconds for the interaction response itself (default 0: answered instantly)")
+    parser.add_argument("--edit-interval", type=float, default=1.0, help="POLL_EDIT_INTERVAL to test with (default 1.0)")
+    parser.add_argument("--timeout", type=float, default=30,
+                        help="seconds to wait for all clicks to be answered, and again for queued REST calls (default 30)")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="skip tracemalloc (it slows things down)")
+    parser.add_argument("--verbose", action="store_true", help="show the bot's log lines on stdout too")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--max-duplicates", type=int, help="exit 1 if a scenario sent more duplicate owner notifications")
+    parser.add_argument("--max-p99-ms", type=float, help="exit 1 if a scenario's p99 ack latency is higher")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    with tempfile.TemporaryDirectory(prefix="poll-bench-") as tmp:
+        with contextlib.redirect_stdout(sys.stderr if not arguments.verbose else sys.stdout):
+            configure(tmp, arguments.edit_interval)
+        sys.exit(asyncio.run(main(arguments)))
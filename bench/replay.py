@@ -0,0 +1,203 @@
+# discord-bot/bench/replay.py
+"""
+Replay a recording made with BOT_RECORD_FILE through the bot's cogs, against fake
+Discord objects and on a virtual clock: cooldowns and scheduled pauses fire at the
+simulated time of the recording, however fast the replay runs.
+
+    python -m bench.replay events.jsonl              # as fast as possible
+    python -m bench.replay events.jsonl --speed 1    # real time
+    python -m bench.replay events.jsonl --speed 60   # one recorded minute per second
+
+The settings (channels, schedule, rules file, ...) come from the environment / .env
+like for the bot itself, so replay with the config the recording was made with.
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import functools
+import contextlib
+import tempfile
+
+BOT_USER_ID = 1
+
+
+class World:
+    """The fake guilds and channels the replay runs in; channels appear when first used."""
+
+    def __init__(self, http, guild_of):
+        from bench.fakes import FakeGuild
+        self.http = http
+        self.guild_of = guild_of
+        self.guilds = {}
+        self.channels = {}
+        self._guild_cls = FakeGuild
+
+    def guild(self, guild_id: int):
+        if guild_id not in self.guilds:
+            self.guilds[guild_id] = self._guild_cls(guild_id, self.http)
+        return self.guilds[guild_id]
+
+    def channel(self, channel_id: int):
+        from bench.fakes import FakeChannel
+        if not channel_id:
+            return None
+        if channel_id not in self.channels:
+            guild = self.guild(self.guild_of.get(channel_id, 0))
+            self.channels[channel_id] = FakeChannel(channel_id, guild, self.http, name=str(channel_id))
+        return self.channels[channel_id]
+
+
+def configure(data_dir: str, header: dict):
+    os.environ.setdefault("DISCORD_TOKEN", "replay")
+    if header.get("poll_channels"):
+        os.environ.setdefault("POLL_CHANNEL_ID", ",".join(str(c) for c in header["poll_channels"]))
+    os.environ.update({"BOT_DATA_DIR": data_dir, "BOT_RECORD_FILE": "", "METRICS_PORT": "0"})
+    os.environ.setdefault("LOG_FORMAT", "text")
+    from utils.config import init_config
+    init_config(os.environ.get("BOT_ENV_FILE", ".env"))
+
+
+def channel_guilds(events) -> dict:
+    """channel id -> guild id, from the events themselves and the poll buttons' custom_ids."""
+    guild_of = {}
+    for ev in events:
+        if ev.get("c"):
+            guild_of.setdefault(ev["c"], ev.get("g", 0))
+        parts = ev.get("k", "").split(":")
+        if len(parts) == 4 and parts[:2] == ["poll", "vote"]:
+            guild_of.setdefault(int(parts[3]), int(parts[2]))
+    return guild_of
+
+
+async def settle(rounds: int):
+    """Give the tasks an event started a few loop iterations to run."""
+    for _ in range(rounds):
+        await asyncio.sleep(0)
+
+
+async def replay(events, args) -> dict:
+    import discord
+    from discord.ext import commands
+    from utils.timers import timers, VirtualClock
+    from utils.outbound import outbound
+    from utils import metrics
+    from bench.fakes import FakeHTTP, FakeUser, FakeMessage, FakeContext, click
+
+    header, events = events[0], events[1:]
+    timers.clock = VirtualClock(start=header["t"])
+    # Discord's rate limits don't apply to fake channels
+    outbound.default_limit = 10 ** 9
+
+    from bot_app import bot
+    import cogs.poll as pollmod
+    # edit coalescing works in real time, which means nothing when a day passes in seconds
+    pollmod.poll_edits.interval = 0
+
+    http = FakeHTTP()
+    world = World(http, channel_guilds(events))
+    bot.get_channel = world.channel
+    bot.get_context = functools.partial(commands.Bot.get_context, bot, cls=FakeContext)
+    await bot._async_setup_hook()
+    await bot.setup_hook()
+    bot._connection.user = FakeUser(BOT_USER_ID, "bot", bot=True)
+
+    # what on_ready does: a poll in every poll channel, then the scheduler may start
+    for channel_id in pollmod.poll_channel_ids():
+        await pollmod.post_poll(world.channel(channel_id))
+    pollmod.polls_restored.set()
+    bot._ready.set()
+    scheduler = bot.get_cog("SchedulerCog")
+    if scheduler is not None and scheduler._startup is not None:
+        await scheduler._startup
+
+    counts = {"message": 0, "interaction": 0, "skipped": 0}
+    fired = 0
+    start = time.perf_counter()
+    for ev in events:
+        delta = ev["t"] - timers.clock.time()
+        if delta > 0:
+            if args.speed:
+                await asyncio.sleep(delta / args.speed)
+            fired += await timers.advance(delta)
+
+        channel = world.channel(ev.get("c"))
+        author_id, name, is_bot, admin = ev["a"]
+        author = FakeUser(author_id, name, bot=is_bot, admin=admin, guild=channel.guild if channel else None)
+        if channel is not None:
+            # the same member across events, so role changes stick (and can be fetched)
+            author = channel.guild.members.setdefault(author_id, author)
+        if ev["e"] == "message" and channel is not None:
+            embeds = [discord.Embed.from_dict(e) for e in ev.get("m", [])]
+            message = FakeMessage(channel, ev.get("x", ""), message_id=ev["id"], author=author, embeds=embeds)
+            channel.messages[message.id] = message
+            bot.dispatch("message", message)
+            counts["message"] += 1
+        elif ev["e"] == "interaction":
+            # the recorded poll message is gone; click the one this replay posted for that poll
+            state = pollmod.poll_from_custom_id(ev.get("k", ""))
+            if state is None or state.message is None:
+                counts["skipped"] += 1
+                continue
+            click(bot, author, state.message, ev["k"])
+            counts["interaction"] += 1
+        else:
+            counts["skipped"] += 1
+            continue
+        await settle(args.settle)
+
+    wall = time.perf_counter() - start
+    # let what the last events started finish (edits are coalesced in real time)
+    await settle(args.settle)
+    await pollmod.poll_edits.flush()
+    await outbound.drain()
+    span = (events[-1]["t"] - header["t"]) if events else 0.0
+    return {
+        "events": len(events),
+        "messages": counts["message"],
+        "interactions": counts["interaction"],
+        "skipped": counts["skipped"],
+        "timers_fired": fired,
+        "simulated_s": span,
+        "wall_s": wall,
+        "events_per_s": len(events) / max(wall, 1e-9),
+        "speedup": span / max(wall, 1e-9),
+        "rest_calls": dict(sorted(http.calls.items())),
+        "commands": int(metrics.COMMAND_SECONDS.count()),
+        "command_errors": int(metrics.COMMAND_ERRORS.total()),
+        "watcher_events": int(metrics.WATCHER_EVENTS.total()),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recording", help="line-delimited event log written with BOT_RECORD_FILE")
+    parser.add_argument("--speed", type=float, default=0, help="replay speed, 1 = real time, 0 = as fast as possible (default)")
+    parser.add_argument("--settle", type=int, default=20, help="event loop turns given to each event's handlers (default 20)")
+    parser.add_argument("--verbose", action="store_true", help="show the bot's log lines")
+    args = parser.parse_args(argv)
+
+    from utils.recorder import read_events
+    events = list(read_events(args.recording))
+    if not events or events[0].get("e") != "start":
+        print(f"❌ {args.recording} is not a recording (no start line)", file=sys.stderr)
+        return 1
+
+    with tempfile.TemporaryDirectory(prefix="replay-") as tmp, open(os.devnull, "w") as quiet:
+        with contextlib.redirect_stdout(sys.stdout if args.verbose else quiet):
+            configure(tmp, events[0])
+            result = asyncio.run(replay(events, args))
+            from utils.log import log
+            log.flush()
+
+    print(f"Replayed {result['events']} events ({result['messages']} messages, {result['interactions']} clicks, "
+          f"{result['skipped']} skipped) covering {result['simulated_s'] / 3600:.1f} h in {result['wall_s']:.2f} s")
+    print(f"  {result['events_per_s']:.0f} events/s, {result['speedup']:.0f}x real time, {result['timers_fired']} timers fired")
+    print(f"  commands: {result['commands']} ({result['command_errors']} errors), watcher events: {result['watcher_events']}")
+    print(f"  REST calls: {', '.join(f'{k} {v}' for k, v in result['rest_calls'].items()) or 'none'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
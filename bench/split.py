@@ -0,0 +1,233 @@
+# discord-bot/bench/split.py
+"""
+Click ack latency with and without REST worker processes (BOT_WORKERS). Vote clicks
+arrive at a steady rate while a steady stream of REST calls (purge deletes, owner
+notifications, credential posts) goes through the outbound queue. No network, no token.
+
+Every REST call costs --rest-cpu-ms of CPU wherever it is made, half before and half
+after --latency seconds of waiting for Discord: what building the request, TLS and
+parsing Discord's JSON answer cost in discord.py. Without workers that CPU time is spent
+on the event loop that also answers the clicks; with them, in the worker processes, and
+the bot's loop only pays for passing the job over the socket.
+
+    python -m bench.split                      # no workers vs 2 workers
+    python -m bench.split --workers 4 --rest-rate 800 --rest-cpu-ms 2
+    python -m bench.split --mode split --json
+
+The local per-route rate limits are lifted (think of the calls as spread over many
+channels), so the REST rate really is --rest-rate.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import itertools
+import contextlib
+import tempfile
+
+MODES = ("single", "split")
+# channels the REST stream is spread over
+REST_CHANNELS = 50
+
+
+def burn(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class FakeRest:
+    """
+    Stands in for utils.workers.RestRunner: a REST call that costs CPU and waits for Discord.
+    Reads its numbers from the environment so worker processes see the same ones.
+    """
+
+    def __init__(self):
+        self.cpu = float(os.environ.get("SPLIT_BENCH_CPU_MS", "1")) / 1000
+        self.latency = float(os.environ.get("SPLIT_BENCH_LATENCY", "0.05"))
+        self.ids = itertools.count(1)
+
+    async def start(self, token: str):
+        pass
+
+    async def close(self):
+        pass
+
+    async def run(self, job):
+        burn(self.cpu / 2)
+        await asyncio.sleep(self.latency)
+        burn(self.cpu / 2)
+        kind, channel_id, *_ = job
+        return {"id": str(next(self.ids)), "channel_id": str(channel_id)} if kind in ("send", "edit") else None
+
+
+def in_process_backend():
+    """No workers: the same fake calls, made on the bot's own event loop."""
+    from utils.outbound import DiscordBackend
+
+    class InProcessBackend(DiscordBackend):
+        rest = FakeRest()
+
+        async def perform(self, action):
+            if action.job is None:
+                return await super().perform(action)
+            return await self.rest.run(action.job), None
+
+    return InProcessBackend()
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def paced(rate: float, duration: float, emit):
+    """Call emit(i) `rate` times per second for `duration` seconds, catching up when the loop fell behind."""
+    start = time.perf_counter()
+    done = 0
+    while (elapsed := time.perf_counter() - start) < duration:
+        for i in range(done, int(elapsed * rate)):
+            emit(i)
+        done = max(done, int(elapsed * rate))
+        await asyncio.sleep(0.001)
+
+
+async def run_mode(mode: str, args, channel_id: int, data_dir: str) -> dict:
+    from bot_app import bot
+    import cogs.poll as pollmod
+    from utils.config import reload_config
+    from utils.outbound import outbound, channel_route, NOTIFY, CREDENTIALS, CLEANUP
+    from utils.workers import WorkerPool, WorkerBackend
+    from bench.fakes import FakeHTTP, FakeGuild, FakeChannel, FakeUser, install, click
+
+    os.environ.update({"POLL_CHANNEL_ID": str(channel_id), "VOTE_THRESHOLD": str(10 ** 9)})
+    reload_config()
+    http = FakeHTTP(args.latency)
+    guild = FakeGuild(1000)
+    channel = FakeChannel(channel_id, guild, http)
+    install(bot, [channel])
+
+    backend = outbound.backend
+    outbound.default_limit = 10 ** 9
+    outbound._slots = asyncio.Semaphore(args.in_flight)
+    pool = None
+    if mode == "split":
+        pool = WorkerPool(args.workers, os.path.join(data_dir, f"workers-{channel_id}.sock"), runner="bench.split:FakeRest")
+        await pool.start()
+        deadline = time.perf_counter() + 30
+        while pool.connected < args.workers and time.perf_counter() < deadline:
+            await asyncio.sleep(0.05)
+        outbound.backend = WorkerBackend(pool)
+    else:
+        outbound.backend = in_process_backend()
+
+    message = await pollmod.post_poll(channel)
+    state = pollmod.poll_for_channel(channel)
+    users = [FakeUser(10_000 + i, f"voter{i}") for i in range(args.voters)]
+    interactions = []
+    calls = []
+
+    def rest(i: int):
+        # mostly purge deletes, with a notification and a credentials post now and then
+        target = 5000 + i % REST_CHANNELS
+        if i % 20 == 0:
+            job, priority = ("send", target, {"content": "owners: the poll reached its threshold"}), NOTIFY
+        elif i % 20 == 1:
+            job, priority = ("send", target, {"content": "Server is running! ✅"}), CREDENTIALS
+        else:
+            job, priority = ("delete", target, 10 ** 15 + i), CLEANUP
+        calls.append(outbound.submit(channel_route(target), priority, None, job=job))
+
+    def vote(i: int):
+        interactions.append(click(bot, users[i % len(users)], state.message or message, state.custom_id))
+
+    start = time.perf_counter()
+    await asyncio.gather(paced(args.rest_rate, args.duration, rest), paced(args.rate, args.duration, vote))
+    try:
+        await asyncio.wait_for(asyncio.gather(*(it.done.wait() for it in interactions)), args.timeout)
+    except asyncio.TimeoutError:
+        pass
+    results = await asyncio.gather(*calls, return_exceptions=True)
+    finished = time.perf_counter() - start
+    await pollmod.poll_edits.flush()
+    await outbound.drain()
+
+    outbound.backend = backend
+    if pool is not None:
+        await pool.stop()
+
+    latencies = [it.ack_latency for it in interactions if it.ack_latency is not None]
+    return {
+        "mode": mode if mode == "single" else f"split x{args.workers}",
+        "clicks": len(interactions),
+        "unanswered": sum(1 for it in interactions if it.ack_latency is None),
+        "ack_p50_ms": (percentile(latencies, 0.50) or 0) * 1000,
+        "ack_p99_ms": (percentile(latencies, 0.99) or 0) * 1000,
+        "ack_max_ms": max(latencies, default=0) * 1000,
+        "rest_calls": len(calls),
+        "rest_failed": sum(1 for r in results if isinstance(r, Exception)),
+        "rest_per_s": len(calls) / finished,
+        "worker_jobs": pool.jobs if pool is not None else 0,
+    }
+
+
+def print_table(results):
+    columns = ["mode", "clicks", "unanswered", "ack_p50_ms", "ack_p99_ms", "ack_max_ms", "rest_calls", "rest_failed",
+               "rest_per_s", "worker_jobs"]
+    rows = [[(f"{r[c]:.2f}" if isinstance(r[c], float) else str(r[c])) for c in columns] for r in results]
+    widths = [max(len(c), *(len(row[i]) for row in rows)) for i, c in enumerate(columns)]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(v.ljust(w) for v, w in zip(row, widths)))
+
+
+async def main(args, data_dir: str) -> int:
+    results = []
+    with contextlib.redirect_stdout(sys.stderr if not args.verbose else sys.stdout):
+        for i, mode in enumerate(args.mode or MODES):
+            results.append(await run_mode(mode, args, channel_id=3000 + i, data_dir=data_dir))
+        from cogs.poll import vote_store
+        from utils.log import log
+        vote_store.flush_now()
+        log.flush()
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+    return 1 if any(r["unanswered"] or r["rest_failed"] for r in results) else 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", action="append", choices=MODES, help="run only this mode (repeatable)")
+    parser.add_argument("--workers", type=int, default=2, help="worker processes in split mode (default 2)")
+    parser.add_argument("--duration", type=float, default=5, help="seconds of load (default 5)")
+    parser.add_argument("--rate", type=float, default=200, help="vote clicks per second (default 200)")
+    parser.add_argument("--voters", type=int, default=500, help="distinct voters (default 500)")
+    parser.add_argument("--rest-rate", type=float, default=400, help="REST calls per second (default 400)")
+    parser.add_argument("--rest-cpu-ms", type=float, default=1.5, help="CPU per REST call, in ms (default 1.5)")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds Discord takes to answer a REST call (default 0.05)")
+    parser.add_argument("--in-flight", type=int, default=64, help="REST calls the outbound queue runs at once (default 64)")
+    parser.add_argument("--timeout", type=float, default=30, help="seconds to wait for clicks and REST calls to finish (default 30)")
+    parser.add_argument("--verbose", action="store_true", help="show the bot's log lines on stdout too")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    # the worker processes inherit these
+    os.environ["SPLIT_BENCH_CPU_MS"] = str(arguments.rest_cpu_ms)
+    os.environ["SPLIT_BENCH_LATENCY"] = str(arguments.latency)
+    if not arguments.verbose:
+        # the workers write their log lines straight to stdout
+        os.environ.setdefault("LOG_LEVEL", "warning")
+    with tempfile.TemporaryDirectory(prefix="split-bench-") as tmp:
+        from bench.poll_load import configure
+        with contextlib.redirect_stdout(sys.stderr if not arguments.verbose else sys.stdout):
+            configure(tmp, 1.0)
+        sys.exit(asyncio.run(main(arguments, tmp)))
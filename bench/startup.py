@@ -0,0 +1,218 @@
+# discord-bot/bench/startup.py
+"""
+Startup benchmark for the BOT_PROFILE settings. Every profile starts in a fresh process
+and logs in to a simulated gateway: READY, one GUILD_CREATE per guild and, when the
+profile asks for them, member chunks of 1000 like Discord sends them. Then a stream of
+messages from random members arrives. No network, no token.
+
+    python -m bench.startup                                  # full vs lean, one guild of 50k members
+    python -m bench.startup --members 200000 --guilds 2 --messages 20000
+    python -m bench.startup --profile lean --json
+
+Reports the time from READY to on_ready, the resident memory once everything settled and
+how many members / messages ended up cached.
+"""
+import os
+import gc
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import contextlib
+import subprocess
+import tempfile
+
+PROFILES = ("full", "lean")
+BOT_USER_ID = 1
+CHUNK_SIZE = 1000
+JOINED = "2024-01-01T00:00:00+00:00"
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        import resource  # not Linux: peak instead of current
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10
+
+
+def user_payload(user_id: int, bot: bool = False) -> dict:
+    return {"id": str(user_id), "username": f"user{user_id}", "discriminator": "0", "avatar": None,
+            "global_name": None, "bot": bot}
+
+
+def member_payload(user_id: int, roles) -> dict:
+    return {"user": user_payload(user_id, bot=user_id == BOT_USER_ID), "roles": [str(r) for r in roles],
+            "joined_at": JOINED, "deaf": False, "mute": False, "flags": 0, "nick": None}
+
+
+def guild_payload(guild_id: int, members: int, role_ids) -> dict:
+    everyone = {"id": str(guild_id), "name": "@everyone", "permissions": "0", "position": 0, "color": 0,
+                "hoist": False, "managed": False, "mentionable": False, "flags": 0}
+    roles = [everyone] + [{**everyone, "id": str(r), "name": f"role{r}", "position": i + 1} for i, r in enumerate(role_ids)]
+    channels = [{"id": str(guild_id + i), "type": 0, "name": f"channel{i}", "position": i, "permission_overwrites": []}
+                for i in range(1, 11)]
+    return {
+        "id": str(guild_id), "name": f"guild{guild_id}", "icon": None, "owner_id": str(BOT_USER_ID),
+        "roles": roles, "channels": channels, "threads": [], "emojis": [], "stickers": [], "features": [],
+        # GUILD_CREATE of a large guild only carries the bot itself; the rest comes in chunks
+        "members": [member_payload(BOT_USER_ID, [])], "voice_states": [], "presences": [],
+        "member_count": members + 1, "large": members > 250, "unavailable": False, "joined_at": JOINED,
+        "afk_timeout": 300, "verification_level": 0, "default_message_notifications": 0, "explicit_content_filter": 0,
+        "mfa_level": 0, "premium_tier": 0, "system_channel_flags": 0, "preferred_locale": "en-US", "nsfw_level": 0,
+    }
+
+
+class FakeGateway:
+    """Answers REQUEST_GUILD_MEMBERS with GUILD_MEMBERS_CHUNK events, built on the fly."""
+
+    def __init__(self, state, members: int, role_ids):
+        self.state = state
+        self.members = members
+        self.role_ids = role_ids
+        self.chunks_sent = 0
+        self._tasks = set()
+
+    async def request_chunks(self, guild_id, query=None, *, limit=0, user_ids=None, presences=False, nonce=None):
+        task = asyncio.create_task(self._send_chunks(guild_id, nonce))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send_chunks(self, guild_id, nonce):
+        count = max(1, -(-self.members // CHUNK_SIZE))
+        rng = random.Random(guild_id)
+        for index in range(count):
+            first = guild_id * 10 ** 7 + index * CHUNK_SIZE
+            last = min(first + CHUNK_SIZE, guild_id * 10 ** 7 + self.members)
+            members = [member_payload(uid, rng.sample(self.role_ids, 2)) for uid in range(first, last)]
+            self.state.parse_guild_members_chunk({"guild_id": str(guild_id), "members": members, "nonce": nonce,
+                                                  "chunk_index": index, "chunk_count": count})
+            self.chunks_sent += 1
+            await asyncio.sleep(0)  # the next chunk arrives in a separate websocket frame
+
+
+async def start(args) -> dict:
+    """Runs in the child process: BOT_PROFILE is already set in its environment."""
+    from bot_app import bot
+
+    state = bot._connection
+    # the simulated events arrive back to back, no need to wait 2 s for more GUILD_CREATEs
+    state.guild_ready_timeout = args.ready_timeout
+    await bot._async_setup_hook()
+    await bot.setup_hook()
+
+    guild_ids = [10 + i for i in range(args.guilds)]
+    role_ids = list(range(100, 120))
+    gateway = FakeGateway(state, args.members, role_ids)
+    state._get_websocket = lambda guild_id=None, shard_id=None: gateway
+    gc.collect()
+    baseline = rss_mb()
+
+    start_at = time.perf_counter()
+    state.parse_ready({"v": 10, "user": user_payload(BOT_USER_ID, bot=True), "session_id": "bench",
+                       "guilds": [{"id": str(g), "unavailable": True} for g in guild_ids],
+                       "application": {"id": str(BOT_USER_ID), "flags": 0}})
+    for guild_id in guild_ids:
+        state.parse_guild_create(guild_payload(guild_id, args.members, role_ids))
+    await bot.wait_until_ready()
+    ready_s = time.perf_counter() - start_at
+
+    # steady state: members chatting in the guilds' channels
+    rng = random.Random(0)
+    for i in range(args.messages):
+        guild_id = rng.choice(guild_ids)
+        author = guild_id * 10 ** 7 + rng.randrange(args.members)
+        state.parse_message_create({
+            "id": str(10 ** 15 + i), "channel_id": str(guild_id + rng.randint(1, 10)), "guild_id": str(guild_id),
+            "author": user_payload(author), "member": {k: v for k, v in member_payload(author, role_ids[:2]).items() if k != "user"},
+            "content": "hello there", "timestamp": JOINED, "edited_timestamp": None, "tts": False,
+            "mention_everyone": False, "mentions": [], "mention_roles": [], "attachments": [], "embeds": [],
+            "pinned": False, "type": 0,
+        })
+        if i % 500 == 499:
+            await asyncio.sleep(0)
+    await asyncio.sleep(0.1)
+    gc.collect()
+
+    return {
+        "profile": bot.config.profile,
+        "guilds": args.guilds,
+        "members": args.members * args.guilds,
+        "ready_s": ready_s,
+        "chunks": gateway.chunks_sent,
+        "members_cached": sum(len(g.members) for g in bot.guilds),
+        "messages_cached": len(bot.cached_messages),
+        "baseline_mb": baseline,
+        "rss_mb": rss_mb(),
+        "rss_delta_mb": rss_mb() - baseline,
+    }
+
+
+def child(args) -> int:
+    with tempfile.TemporaryDirectory(prefix="startup-bench-") as tmp:
+        # the bot's log lines go to stderr so stdout only carries the result
+        with contextlib.redirect_stdout(sys.stderr if not args.verbose else sys.stdout):
+            os.environ.update({"DISCORD_TOKEN": "bench", "POLL_CHANNEL_ID": "11", "BOT_DATA_DIR": tmp,
+                               "BOT_RECORD_FILE": "", "METRICS_PORT": "0"})
+            os.environ.setdefault("LOG_FORMAT", "text")
+            from utils.config import init_config
+            init_config(None)
+            result = asyncio.run(start(args))
+            from utils.log import log
+            log.flush()
+        print(json.dumps(result))
+    return 0
+
+
+def run_profile(profile: str, args) -> dict:
+    cmd = [sys.executable, "-m", "bench.startup", "--child", "--members", str(args.members), "--guilds", str(args.guilds),
+           "--messages", str(args.messages), "--ready-timeout", str(args.ready_timeout)]
+    env = {**os.environ, "BOT_PROFILE": profile}
+    if args.max_messages is not None:
+        env["BOT_MAX_MESSAGES"] = str(args.max_messages)
+    out = subprocess.run(cmd, env=env, stdout=subprocess.PIPE, stderr=None if args.verbose else subprocess.DEVNULL,
+                         text=True, check=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def print_table(results):
+    columns = ["profile", "members", "ready_s", "chunks", "members_cached", "messages_cached", "rss_mb", "rss_delta_mb"]
+    rows = [[(f"{r[c]:.2f}" if isinstance(r[c], float) else str(r[c])) for c in columns] for r in results]
+    widths = [max(len(c), *(len(row[i]) for row in rows)) for i, c in enumerate(columns)]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(v.ljust(w) for v, w in zip(row, widths)))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", action="append", choices=PROFILES, help="run only this profile (repeatable)")
+    parser.add_argument("--members", type=int, default=50_000, help="members per guild (default 50000)")
+    parser.add_argument("--guilds", type=int, default=1, help="number of guilds (default 1)")
+    parser.add_argument("--messages", type=int, default=5000, help="messages received after on_ready (default 5000)")
+    parser.add_argument("--max-messages", type=int, help="BOT_MAX_MESSAGES to start with (default: the profile's)")
+    parser.add_argument("--ready-timeout", type=float, default=0.1,
+                        help="how long discord.py waits for more GUILD_CREATEs before on_ready (default 0.1, live: 2)")
+    parser.add_argument("--verbose", action="store_true", help="show the bot's log lines")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.child:
+        return child(args)
+    results = [run_profile(profile, args) for profile in (args.profile or PROFILES)]
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
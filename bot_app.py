@@ -1,17 +1,80 @@
 # discord-bot/bot_app.py
-import os
+import time
+import signal
+import asyncio
 import discord
 from discord.ext import commands
+from utils.config import Config, ConfigError, get_config, reload_config
+from utils.recorder import EventRecorder
+from utils.snapshot import snapshot
+from utils.outbound import outbound
+from utils.log import log
+
+
+def client_options(config: Config) -> dict:
+    """
+    Gateway intents and cache settings for BOT_PROFILE.
+
+    full: every member is chunked into the cache at startup (the old behaviour).
+    lean: only the intents the cogs use, no member chunking and only the bot itself in
+    the member cache. Commands and clicks still carry their author as a full Member
+    (roles included); anything else is fetched when needed (see utils/rolesync.py).
+    """
+    if config.profile == "lean":
+        intents = discord.Intents.none()
+        intents.guilds = True
+        intents.guild_messages = True
+        intents.message_content = True
+        return {
+            "intents": intents,
+            "member_cache_flags": discord.MemberCacheFlags.none(),
+            "chunk_guilds_at_startup": False,
+            "max_messages": config.max_messages if config.max_messages is not None else 100,
+        }
+
+    intents = discord.Intents.default()
+    intents.messages = True
+    intents.reactions = True
+    intents.message_content = True
+    intents.members = True
+    return {
+        "intents": intents,
+        "member_cache_flags": discord.MemberCacheFlags.from_intents(intents),
+        "chunk_guilds_at_startup": True,
+        "max_messages": config.max_messages if config.max_messages is not None else 1000,
+    }
 
-intents = discord.Intents.default()
-intents.messages = True
-intents.reactions = True
-intents.message_content = True
-intents.members = True
 
 class MyBot(commands.Bot):
     def __init__(self):
-        super().__init__(command_prefix="!", intents=intents)
+        # intents can't change on a live connection: BOT_PROFILE applies from the next start
+        super().__init__(command_prefix="!", **client_options(get_config()))
+        # set when BOT_RECORD_FILE is configured: every message/interaction gets logged for replay
+        self.recorder: EventRecorder | None = None
+        self._shutdown: asyncio.Task | None = None
+        # set by main.py when BOT_WORKERS > 0: processes that make the REST calls (utils/workers.py)
+        self.workers = None
+
+    def dispatch(self, event_name: str, /, *args, **kwargs):
+        # the bot's own messages are left out: a replay sends them again itself
+        if self.recorder is not None and not (event_name == "message" and args and args[0].author == self.user):
+            self.recorder.record(event_name, args)
+        super().dispatch(event_name, *args, **kwargs)
+
+    @property
+    def config(self) -> Config:
+        """The live, validated configuration (swapped atomically on reload)."""
+        return get_config()
+
+    def reload_config(self):
+        """Re-read env/.env without touching the gateway connection. Returns the changed setting names."""
+        try:
+            changed = reload_config()
+        except ConfigError as e:
+            log.error("config.reload_rejected", f"❌ Config reload rejected, keeping the old config: {e}", problems=e.problems)
+            raise
+        log.info("config.reloaded", f"🔄 Config reloaded ({', '.join(changed) or 'no changes'})", changed=changed)
+        return changed
 
     async def setup_hook(self):
         """
@@ -25,6 +88,9 @@ class MyBot(commands.Bot):
         from cogs.pause import PauseCog
         from cogs.scheduler import SchedulerCog
         from cogs.watcher import WatcherCog
+        from cogs.admin import AdminCog
+        from cogs.metrics import MetricsCog
+        from cogs.status import StatusCog
 
         # await add_cog so any async cog_load() runs now (with event loop active)
         await self.add_cog(PollCog(self))
@@ -33,6 +99,76 @@ class MyBot(commands.Bot):
         await self.add_cog(PauseCog(self))
         await self.add_cog(SchedulerCog(self))
         await self.add_cog(WatcherCog(self))
+        await self.add_cog(AdminCog(self))
+        await self.add_cog(MetricsCog(self))
+        await self.add_cog(StatusCog(self))
+
+        if self.config.record_file:
+            self.recorder = EventRecorder(self.config.record_file)
+            self.recorder.start(poll_channels=list(self.config.poll_channel_ids))
+            log.info("recorder.started", f"⏺️ Recording events to {self.config.record_file}", path=self.config.record_file)
+
+        if self.workers is not None:
+            from utils.workers import WorkerBackend
+            await self.workers.start()
+            outbound.backend = WorkerBackend(self.workers)
+
+        # pick up where the last shutdown left off, before the gateway sends anything
+        age = snapshot.restore()
+        if age is not None:
+            log.info("bot.warm_start", f"♻️ Restored polls from the shutdown snapshot ({age:.0f}s old)", age_s=round(age, 1))
+
+        # `kill -HUP <pid>` reloads the config; SIGTERM (every deploy) and Ctrl+C shut down cleanly
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGHUP, self._reload_on_signal)
+            loop.add_signal_handler(signal.SIGTERM, self._shutdown_on_signal)
+            loop.add_signal_handler(signal.SIGINT, self._shutdown_on_signal)
+        except (NotImplementedError, AttributeError):
+            pass  # no SIGHUP on Windows
+
+    async def shutdown(self):
+        """
+        Finish what is queued (poll edits, outbound messages) for up to BOT_SHUTDOWN_SECONDS,
+        write the snapshot the next start resumes from, then close.
+        """
+        import cogs.poll as pollmod
+
+        started = time.perf_counter()
+        log.info("bot.shutdown", "👋 Shutting down, finishing queued edits first")
+        try:
+            await asyncio.wait_for(self._drain(pollmod.poll_edits), self.config.shutdown_seconds)
+        except asyncio.TimeoutError:
+            log.warning("bot.drain_timeout", f"⚠️ Gave up waiting for {outbound.depth()} queued REST calls",
+                        pending=outbound.depth())
+        size = snapshot.write()
+        log.info("bot.snapshot", f"💾 Snapshot written ({size} bytes) after {time.perf_counter() - started:.2f}s",
+                 bytes=size, took_s=round(time.perf_counter() - started, 3))
+        await self.close()
+
+    @staticmethod
+    async def _drain(edits):
+        await edits.flush()
+        await outbound.drain()
+
+    async def close(self):
+        await super().close()
+        if self.workers is not None:
+            await self.workers.stop()
+        if self.recorder is not None:
+            self.recorder.flush_now()
+        # the writer thread is a daemon: write out the last lines before the process exits
+        log.flush()
+
+    def _shutdown_on_signal(self):
+        if self._shutdown is None:
+            self._shutdown = asyncio.create_task(self.shutdown())
+
+    def _reload_on_signal(self):
+        try:
+            self.reload_config()
+        except ConfigError:
+            pass
 
 
 # single bot instance to import elsewhere
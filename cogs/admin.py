@@ -0,0 +1,123 @@
+# discord-bot/cogs/admin.py
+import time
+from discord.ext import commands
+from utils.config import ConfigError, on_reload
+from utils.outbound import outbound
+from utils.stalls import stalls
+from utils import metrics
+
+
+def _ms(seconds: float | None) -> str:
+    return "n/a" if seconds is None else f"{seconds * 1000:.0f} ms"
+
+
+def _p50_p99(histogram, *labels) -> str:
+    return f"p50 {_ms(histogram.quantile(0.5, *labels))} / p99 {_ms(histogram.quantile(0.99, *labels))}"
+
+
+def _duration_ago(seconds: float) -> str:
+    return f"{seconds / 3600:.1f} h" if seconds >= 3600 else f"{seconds / 60:.0f} min" if seconds >= 60 else f"{seconds:.0f} s"
+
+
+class AdminCog(commands.Cog):
+    """Commands for whoever runs the bot."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        on_reload(lambda old, new: stalls.configure(new.stall_threshold_ms, new.stall_history))
+
+    async def cog_load(self):
+        stalls.configure(self.bot.config.stall_threshold_ms, self.bot.config.stall_history)
+
+    async def cog_unload(self):
+        stalls.stop()
+
+    @commands.command(name="reloadconfig")
+    @commands.has_permissions(administrator=True)
+    async def reloadconfig(self, ctx):
+        """Re-read the environment/.env and apply it without reconnecting."""
+        try:
+            changed = self.bot.reload_config()
+        except ConfigError as e:
+            await ctx.send("❌ Config not reloaded:\n" + "\n".join(f"- {p}" for p in e.problems))
+            return
+        await ctx.send(f"🔄 Config reloaded. Changed: {', '.join(changed) or 'nothing'}")
+
+    @commands.command(name="queuestats")
+    @commands.has_permissions(administrator=True)
+    async def queuestats(self, ctx):
+        """Show the outbound REST queue: depth, sends, failures and wait times per priority class."""
+        stats = outbound.stats()
+        lines = [f"**{name}**: {s['queued']} queued, {s['sent']} sent, {s['failed']} failed, "
+                 f"wait avg {s['avg_wait_ms']:.0f} ms / max {s['max_wait_ms']:.0f} ms"
+                 for name, s in stats.items() if isinstance(s, dict)]
+        lines.append(f"Superseded edits dropped: {stats['superseded']} • 429s: {stats['throttled']}")
+        await ctx.send("\n".join(lines))
+
+    @commands.command(name="diag")
+    @commands.has_permissions(administrator=True)
+    async def diag(self, ctx, number: int | None = None):
+        """Event loop lag and the longest stalls (BOT_STALL_THRESHOLD_MS); with a number, that stall's stack."""
+        if not stalls.running:
+            await ctx.send("🐢 The stall watchdog is off. Set BOT_STALL_THRESHOLD_MS (e.g. 100) and `!reloadconfig`.")
+            return
+        worst = stalls.worst()
+        if number is not None:
+            if not 1 <= number <= len(worst):
+                await ctx.send(f"❌ There are {len(worst)} stalls kept, pick one of 1-{len(worst)}.")
+                return
+            stall = worst[number - 1]
+            stack = "\n".join(stall.stack) or "(not sampled)"
+            await ctx.send(f"🐢 Stall {number}: {_ms(stall.seconds)}, task {stall.task or '?'}\n```\n{stack[-1800:]}\n```")
+            return
+        lag = metrics.LOOP_LAG_SECONDS
+        lines = [f"🐢 **Event loop** lag {_p50_p99(lag)} • {stalls.stalls} stalls over {_ms(stalls.threshold)}"]
+        for i, stall in enumerate(worst[:10], 1):
+            ago = _duration_ago(time.time() - stall.at)
+            blame = " / ".join(x for x in (stall.cog, stall.command and f"!{stall.command}") if x)
+            where = f"`{stall.where}`" if stall.where else "not sampled (too short)"
+            lines.append(f"{i}. {_ms(stall.seconds)} {ago} ago • {blame or stall.task or 'no task'} • {where}")
+        await ctx.send("\n".join(lines))
+
+    @commands.command(name="viewstats")
+    @commands.has_permissions(administrator=True)
+    async def viewstats(self, ctx):
+        """Live views: the polls' (one per poll message) and everything in discord.py's view store."""
+        from cogs.poll import poll_views
+
+        s = poll_views.stats()
+        await ctx.send(f"🧩 Poll views: {s['views']} live, ~{s['bytes'] / 1024:.1f} KiB\n"
+                       f"View store: {s['store_messages']} message views, {s['store_persistent']} persistent, "
+                       f"{s['store_items']} routed items")
+
+    @commands.command(name="stats")
+    @commands.has_permissions(administrator=True)
+    async def stats(self, ctx):
+        """Summary of the bot's metrics (the full set is on the METRICS_PORT endpoint)."""
+        lines = ["📈 **Bot stats**"]
+        latency = metrics.GATEWAY_LATENCY_SECONDS.get()
+        lines.append(f"Gateway latency: {_ms(latency)}")
+        ack = metrics.INTERACTION_ACK_SECONDS
+        for (component,) in sorted(ack.series):
+            lines.append(f"`{component}` clicks: {ack.count(component)} • ack {_p50_p99(ack, component)}")
+        lines.append(f"Poll edits: {metrics.POLL_EDIT_DELAY_SECONDS.count()} • click → edit {_p50_p99(metrics.POLL_EDIT_DELAY_SECONDS)}")
+        edits = metrics.MESSAGE_EDITS.values
+        lines.append(f"Edits sent/skipped/failed: {edits.get(('sent',), 0):g}/{edits.get(('skipped',), 0):g}/{edits.get(('failed',), 0):g}")
+        calls = metrics.REST_CALLS.values
+        ok = sum(v for k, v in calls.items() if k[2] == "ok")
+        failed = sum(v for k, v in calls.items() if k[2] != "ok")
+        lines.append(f"REST calls: {ok:g} ok, {failed:g} failed • {_p50_p99(metrics.REST_SECONDS)} • queued {outbound.depth()}")
+        commands_run = metrics.COMMAND_SECONDS
+        for (name,) in sorted(commands_run.series):
+            errors = metrics.COMMAND_ERRORS.values.get((name,), 0)
+            lines.append(f"`!{name}`: {commands_run.count(name)} runs, {errors:g} errors • {_p50_p99(commands_run, name)}")
+        watcher = metrics.WATCHER_EVENTS.values
+        if watcher:
+            lines.append("Watcher: " + ", ".join(f"{name} ×{n:g}" for (name,), n in watcher.items()))
+        roles = self.bot.get_cog("RolesCog")
+        if roles is not None:
+            r = roles.worker.stats()
+            lines.append(f"Role changes: {r['requests']} clicks → {r['edits_sent']} edits ({r['edits_skipped']} no-ops, {r['edits_failed']} failed, {r['pending']} pending)")
+        if metrics.SCHEDULER_LAG_SECONDS.count():
+            lines.append(f"Scheduler lag: {_p50_p99(metrics.SCHEDULER_LAG_SECONDS)}")
+        await ctx.send("\n".join(lines))
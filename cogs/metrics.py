@@ -0,0 +1,92 @@
+# discord-bot/cogs/metrics.py
+import time
+import asyncio
+from aiohttp import web
+from discord.ext import commands
+from utils.config import on_reload
+from utils.log import log
+from utils.metrics import registry, COMMAND_SECONDS, COMMAND_ERRORS, INTERACTIONS, GATEWAY_LATENCY_SECONDS
+
+
+class MetricsCog(commands.Cog):
+    """
+    Times every command, counts interactions and serves all metrics in Prometheus text
+    format on http://METRICS_HOST:METRICS_PORT/metrics (off when METRICS_PORT is 0).
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.runner: web.AppRunner | None = None
+        GATEWAY_LATENCY_SECONDS.set_function(lambda: bot.latency)
+        # a new port/host takes effect on a config reload
+        on_reload(self._on_reload)
+
+    async def cog_load(self):
+        await self.start_server()
+
+    async def cog_unload(self):
+        await self.stop_server()
+
+    def _on_reload(self, old, new):
+        if (old.metrics_port, old.metrics_host) != (new.metrics_port, new.metrics_host):
+            asyncio.get_running_loop().create_task(self.restart_server())
+
+    # ---- HTTP endpoint ------------------------------------------------------
+
+    async def start_server(self):
+        config = self.bot.config
+        if not config.metrics_port:
+            return
+        app = web.Application()
+        app.router.add_get("/metrics", self.handle_metrics)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        try:
+            await web.TCPSite(self.runner, config.metrics_host, config.metrics_port).start()
+        except OSError as e:
+            log.error("metrics.listen_failed", f"❌ Metrics endpoint could not listen on {config.metrics_host}:{config.metrics_port}: {e}")
+            await self.stop_server()
+            return
+        log.info("metrics.listening", f"📈 Metrics on http://{config.metrics_host}:{config.metrics_port}/metrics")
+
+    async def stop_server(self):
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    async def restart_server(self):
+        await self.stop_server()
+        await self.start_server()
+
+    async def handle_metrics(self, request):
+        return web.Response(text=registry.render(), content_type="text/plain", charset="utf-8")
+
+    # ---- instrumentation ----------------------------------------------------
+
+    @commands.Cog.listener()
+    async def on_command(self, ctx):
+        ctx.metrics_started = time.perf_counter()
+
+    @commands.Cog.listener()
+    async def on_command_completion(self, ctx):
+        started = getattr(ctx, "metrics_started", None)
+        if started is not None:
+            COMMAND_SECONDS.observe(time.perf_counter() - started, ctx.command.qualified_name)
+
+    @commands.Cog.listener()
+    async def on_command_error(self, ctx, error):
+        name = ctx.command.qualified_name if ctx.command else "unknown"
+        COMMAND_ERRORS.inc(name)
+        started = getattr(ctx, "metrics_started", None)
+        if started is not None:
+            COMMAND_SECONDS.observe(time.perf_counter() - started, name)
+        # discord.py stops printing command errors once anyone listens for them, so keep doing it here
+        if ctx.command and ctx.command.has_error_handler() or ctx.cog and ctx.cog.has_error_handler():
+            return
+        error = getattr(error, "original", error)
+        log.error("command.failed", f"Ignoring exception in command {name}", command=name,
+                  guild=ctx.guild.id if ctx.guild else None, user=ctx.author.id, exc=error)
+
+    @commands.Cog.listener()
+    async def on_interaction(self, interaction):
+        INTERACTIONS.inc(interaction.type.name)
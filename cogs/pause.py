@@ -1,9 +1,6 @@
 # discord-bot/cogs/pause.py
-import os
 from discord.ext import commands
 import cogs.poll as pollmod
-from utils.helpers import DummyContext
-from utils import helpers
 
 class PauseCog(commands.Cog):
     def __init__(self, bot):
@@ -11,50 +8,33 @@ class PauseCog(commands.Cog):
 
     @commands.command()
     async def pause(self, ctx):
-        global pollmod
-        pollmod.paused = True
-        await ctx.send("⏯️ You have paused the processes!")
-
-        channel = self.bot.get_channel(int(os.getenv("POLL_CHANNEL_ID", "0")))
+        channel = pollmod.resolve_poll_channel(ctx.channel)
         if channel is None:
             await ctx.send("❌ Poll channel not found! Check POLL_CHANNEL_ID")
             return
 
-        await channel.purge(limit=200, check=lambda m: m.author == self.bot.user)
-
-        if pollmod.poll_message:
-            view = pollmod.PollView(message_id=pollmod.poll_message.id)
-            for item in view.children:
-                if isinstance(item, discord.ui.Button):
-                    item.disabled = True
-            try:
-                await pollmod.poll_message.edit(content="⏯️ Processes are now paused! Will resume once !unpause is called", view=view)
-            except Exception:
-                pass
-        else:
-            await channel.send("⏯️ Processes are now paused! Will resume once !unpause is called")
+        await ctx.send("⏯️ You have paused the processes!")
+        await pollmod.poll_for_channel(channel).actor.ask(
+            "pause", channel, "⏯️ Processes are now paused! Will resume once !unpause is called")
 
     @commands.command()
     async def unpause(self, ctx):
-        global pollmod
-        pollmod.paused = False
-        await ctx.send("⏯️ You have unpaused the processes!")
-
-        channel = self.bot.get_channel(int(os.getenv("POLL_CHANNEL_ID", "0")))
+        channel = pollmod.resolve_poll_channel(ctx.channel)
         if channel is None:
             await ctx.send("❌ Poll channel not found! Check POLL_CHANNEL_ID")
             return
 
-        await channel.purge(limit=200, check=lambda m: m.author == self.bot.user)
-        poll_message_local = await pollmod.post_poll(channel)
-        if poll_message_local:
+        state = pollmod.poll_for_channel(channel)
+        if state.running_mode:
+            await ctx.send("ℹ️ The server is running, the poll comes back when it shuts down (or use !resetpoll).")
+            return
+        await ctx.send("⏯️ You have unpaused the processes!")
+
+        if await state.actor.ask("resume", channel):
             await ctx.send("✅ Poll has been reset for the next round!")
 
     @commands.command(name="editing")
     async def editing(self, ctx):
-        """Show whether editing mode is ON or OFF (helpers.EDITING flag)."""
-        state = getattr(helpers, "EDITING", None)
-        if state is None:
-            await ctx.send("✏️ Editing mode flag not found in utils.helpers.")
-            return
+        """Show whether editing mode is ON or OFF (EDITING_MODE setting)."""
+        state = self.bot.config.editing
         await ctx.send(f"✏️ Editing mode is currently **{'ON' if state else 'OFF'}**.")
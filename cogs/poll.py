@@ -1,96 +1,223 @@
 # discord-bot/cogs/poll.py
-import os
+import time
 import asyncio
 import discord
-from typing import Set, Dict
+from typing import Set, Dict, Tuple, List
 from bot_app import bot
 from discord.ext import commands
 from utils.helpers import notify_owner_thread
+from utils.notify import notifier
+from utils.edits import EditCoalescer
+from utils.storage import data_dir, data_path
+from utils.config import get_config, on_reload
+from utils.msgindex import MessageIndex
+from utils.tracked import SentRegistry
+from utils.votestore import VoteStore
+from utils.analytics import VoteAnalytics
+from utils.timers import timers
+from utils.actor import Actor
+from utils.snapshot import snapshot
+from utils.views import TimedView, ViewRegistry
+from utils.log import log
+from utils import outbound
+from utils.metrics import POLL_BATCH_SIZE, POLL_VIEWS
 
-VOTE_THRESHOLD = int(os.getenv("VOTE_THRESHOLD", "1"))
+# Votes survive restarts: memory is the source of truth, the store logs every change to disk
+vote_store = VoteStore(data_dir(), flush_interval=get_config().vote_flush_interval)
+log.info("votes.loaded", f"🗳️ Vote store loaded in {vote_store.load():.1f} ms")
+poll_votes: Dict[int, Set[int]] = vote_store.votes
+# Vote history for !pollstats, written to SQLite off the event loop
+analytics = VoteAnalytics(data_path("analytics.sqlite3"), timezone=get_config().poll_timezone,
+                          flush_interval=get_config().analytics_flush_interval,
+                          retention_days=get_config().analytics_retention_days)
+# Which message is the poll, so on_ready can fetch it directly after a restart
+message_index = MessageIndex(data_path("messages.json"))
+# IDs of everything the bot sent, so cleanup deletes exactly those without reading history
+sent_messages = SentRegistry(data_path("sent.json"))
 
-# Module-level state owned by this module (single source of truth)
-poll_message: discord.Message | None = None
-poll_votes: Dict[int, Set[int]] = {}
-running_mode = False
-paused = False
+# Every edit of the poll message goes through here so bursts of clicks collapse
+# into one edit and a later state is never overwritten by an older one.
+poll_edits = EditCoalescer(get_config().poll_edit_interval)
+# One live PollView per poll message: its button is switched on and off, never rebuilt
+poll_views = ViewRegistry(bot)
+POLL_VIEWS.set_function(lambda: len(poll_views))
 
 
-class PollView(discord.ui.View):
-    def __init__(self, message_id: int | None = None):
-        super().__init__(timeout=None)
-        self.message_id = message_id
+def _apply_config(old, new):
+    poll_edits.interval = new.poll_edit_interval
+    vote_store.flush_interval = new.vote_flush_interval
+    analytics.flush_interval = new.analytics_flush_interval
+    analytics.retention_days = new.analytics_retention_days
 
-    @discord.ui.button(label="Vote to start", style=discord.ButtonStyle.primary, custom_id="poll:vote_button")
-    async def vote_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        """
-        Button handler: toggles vote, updates poll message, and triggers notify+cooldown when threshold met.
-        """
-        global poll_message, poll_votes, running_mode, paused
 
-        if paused:
-            await interaction.response.send_message("Polls are paused right now.", ephemeral=True)
-            return
-        if running_mode:
-            await interaction.response.send_message("Server is already running.", ephemeral=True)
-            return
+on_reload(_apply_config)
 
-        user_id = interaction.user.id
 
-        if poll_message is None:
-            await interaction.response.send_message("Poll is not active at the moment.", ephemeral=True)
-            return
+def poll_channel_ids() -> List[int]:
+    """Channels that host a poll. POLL_CHANNEL_ID may list several (comma separated); the first is the default."""
+    return list(bot.config.poll_channel_ids)
+
+
+# What a poll is doing. Only its actor changes it (see handle() below).
+OPEN, COOLDOWN, RUNNING, PAUSED = "open", "cooldown", "running", "paused"
+PHASES = (OPEN, COOLDOWN, RUNNING, PAUSED)
+# while reopen() clears the channel; never saved (a restart mid-reset comes back OPEN)
+RESETTING = "resetting"
+ANY_PHASE = PHASES + (RESETTING,)
+
+
+class PollState:
+    """Everything one poll needs: its message and phase. One per (guild, channel)."""
+    __slots__ = ("guild_id", "channel_id", "message", "phase", "round_started", "actor")
+
+    def __init__(self, guild_id: int, channel_id: int):
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.message: discord.Message | None = None
+        self.phase = OPEN
+        # when the current round opened (None after a restart), for time-to-threshold
+        self.round_started: float | None = None
+        # every change to this poll (clicks, commands, timers) runs through here, one at a time
+        self.actor = Actor(f"poll:{guild_id}:{channel_id}", lambda command, batch: handle(self, command, batch),
+                           batched=("vote",))
+
+    @property
+    def running_mode(self) -> bool:
+        return self.phase == RUNNING
+
+    @property
+    def paused(self) -> bool:
+        return self.phase == PAUSED
+
+    @property
+    def analytics_key(self) -> str:
+        return f"{self.guild_id}:{self.channel_id}"
+
+    @property
+    def key(self) -> Tuple[int, int]:
+        return (self.guild_id, self.channel_id)
+
+    @property
+    def custom_id(self) -> str:
+        """custom_id of this poll's vote button; interactions are routed back to the state through it."""
+        return f"poll:vote:{self.guild_id}:{self.channel_id}"
+
+    @property
+    def cooldown_key(self) -> str:
+        return f"cooldown:{self.guild_id}:{self.channel_id}"
+
+    @property
+    def notify_key(self) -> str:
+        """Owner notifications are deduplicated per round of this poll."""
+        return f"notify:{self.guild_id}:{self.channel_id}"
+
+    @property
+    def on_cooldown(self) -> bool:
+        return self.phase == COOLDOWN
+
+    @property
+    def votes(self) -> Set[int]:
+        return vote_store.get(self.message.id) if self.message else set()
+
+
+# Registry of every poll this process runs, keyed by (guild_id, channel_id)
+polls: Dict[Tuple[int, int], PollState] = {}
+# Set by on_ready once existing poll messages are re-hooked (the scheduler waits for it)
+polls_restored = asyncio.Event()
+
+
+def get_poll(guild_id: int, channel_id: int) -> PollState:
+    """Return the poll state for a guild/channel, creating it on first use."""
+    state = polls.get((guild_id, channel_id))
+    if state is None:
+        state = polls[(guild_id, channel_id)] = PollState(guild_id, channel_id)
+    return state
+
+
+def poll_for_channel(channel) -> PollState:
+    return get_poll(channel.guild.id if channel.guild else 0, channel.id)
+
+
+def poll_from_custom_id(custom_id: str) -> PollState | None:
+    """Find the poll a vote button belongs to ("poll:vote:<guild>:<channel>")."""
+    parts = custom_id.split(":")
+    if len(parts) != 4 or parts[:2] != ["poll", "vote"]:
+        return None
+    return polls.get((int(parts[2]), int(parts[3])))
+
+
+def resolve_poll_channel(channel=None):
+    """
+    The poll channel a command refers to: the channel it was used in if that hosts a poll,
+    otherwise the default (first) POLL_CHANNEL_ID. Returns None if it can't be found.
+    """
+    ids = poll_channel_ids()
+    if channel is not None and channel.id in ids:
+        return channel
+    return bot.get_channel(ids[0]) if ids else None
+
+
+def index_poll(state: PollState, status: str | None = None):
+    """
+    Record the poll message (and what it shows) in the message index, or drop the
+    entry when there is no poll message. The status defaults to the phase.
+    """
+    name = f"poll:{state.guild_id}:{state.channel_id}"
+    if state.message is None:
+        message_index.remove(name)
+        return
+    if status is None:
+        status = state.phase
+    message_index.put(name, state.message.id, state.channel_id, status, state.custom_id)
+
+
+def poll_content(vote_count: int) -> str:
+    return f"Click the button to vote for server start!\n\nVotes: **{vote_count}** / {bot.config.vote_threshold}"
+
+
+async def ack(interaction: discord.Interaction, text: str, started: float):
+    """Answer a vote click (ephemeral). PollView is a TimedView, so the metric is recorded there."""
+    await interaction.response.send_message(text, ephemeral=True)
+    took = time.perf_counter() - started
+    # sampled and rate limited, see utils/log.py
+    log.debug("poll.ack", text, guild=interaction.guild_id, poll=interaction.channel_id, user=interaction.user.id,
+              latency_ms=round(took * 1000, 2))
+
 
-        votes = poll_votes.setdefault(poll_message.id, set())
-
-        if user_id in votes:
-            votes.remove(user_id)
-            await interaction.response.send_message("Your vote has been removed.", ephemeral=True)
-        else:
-            votes.add(user_id)
-            await interaction.response.send_message("Thanks — your vote has been counted!", ephemeral=True)
-
-        # Update poll message with vote count
-        try:
-            vote_count = len(votes)
-            content = f"Click the button to vote for server start!\n\nVotes: **{vote_count}** / {VOTE_THRESHOLD}"
-            await poll_message.edit(content=content, view=self)
-        except Exception as e:
-            print(f"Failed to update poll message with vote count: {e}")
-
-        # Threshold reached → notify owners
-        if len(votes) >= VOTE_THRESHOLD:
-            try:
-                # Disable the button and show a tiny processing UI
-                for child in self.children:
-                    if isinstance(child, discord.ui.Button):
-                        child.disabled = True
-                await poll_message.edit(content="Processing request... • • •", view=self)
-            except Exception as e:
-                print(f"Failed to show processing state: {e}")
-
-            whoAskedName = interaction.user.name
-            await notify_owner_thread(whoAskedName)
-
-            # update poll message to show owners notified (instead of sending new channel message)
-            try:
-                await poll_message.edit(content="✅ Owners have been notified! Poll will reset shortly...", view=self)
-            except Exception as e:
-                print(f"Failed to update poll message after notifying owners: {e}")
-
-            # Run cooldown/reset flow
-            await reset_and_wait_update_poll()
-
-            # After cooldown, restore poll (if not running)
-            if poll_message and not running_mode and not paused:
-                poll_votes[poll_message.id] = set()
-                # re-enable button(s)
-                view = PollView(message_id=poll_message.id)
-                bot.add_view(view, message_id=poll_message.id)
-                try:
-                    await poll_message.edit(content=f"Click the button to vote for server start!\n\nVotes: **0** / {VOTE_THRESHOLD}", view=view)
-                except Exception as e:
-                    print(f"Failed to restore poll after cooldown: {e}")
+def poll_view(state: PollState, enabled: bool = True) -> "PollView":
+    """The poll message's one view, with the button enabled or greyed out (cooldown, paused)."""
+    view = poll_views.get(state.message.id, lambda: PollView(state))
+    view.vote_button.disabled = not enabled
+    return view
+
+
+def forget_message(state: PollState):
+    """The poll message is gone (or replaced): drop everything kept for it."""
+    poll_edits.forget(state.message.id)
+    poll_views.drop(state.message.id)
+    vote_store.drop(state.message.id)
+    state.message = None
+
+
+class PollView(TimedView):
+    def __init__(self, state: PollState):
+        super().__init__(timeout=None)
+        self.state = state
+        self.vote_button.custom_id = state.custom_id
+
+    @discord.ui.button(label="Vote to start", style=discord.ButtonStyle.primary, custom_id="poll:vote")
+    async def vote_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        """
+        Button handler: hands the click to the poll's actor, which toggles the vote, updates
+        the poll message and runs the threshold transition, then answers with the outcome.
+        """
+        started = time.perf_counter()
+        state = poll_from_custom_id(interaction.data.get("custom_id", "")) or self.state
+        text = refusal(state)
+        if text is None:
+            text = await state.actor.ask("vote", interaction.user)
+        # else nothing to change: answer right away, even while the actor is busy with a slow transition
+        await ack(interaction, text, started)
 
 
 # Utility functions owned by this module
@@ -99,73 +226,306 @@ async def post_poll(channel: discord.TextChannel):
     Create a fresh poll message or edit the existing poll message to reset it.
     Returns the poll message object.
     """
-    global poll_message, poll_votes
     if channel is None:
-        print("❌ Poll channel not found! Check POLL_CHANNEL_ID")
+        log.error("poll.no_channel", "❌ Poll channel not found! Check POLL_CHANNEL_ID")
         return None
 
+    state = poll_for_channel(channel)
+    cancel_cooldown(state)
+    notifier.new_round(state.notify_key)
+    new_round(state)
     try:
-        if poll_message is not None:
+        if state.message is not None:
             # Reset votes and edit the existing poll message
-            poll_votes[poll_message.id] = set()
-            view = PollView(message_id=poll_message.id)
-            bot.add_view(view, message_id=poll_message.id)
-            await poll_message.edit(content=f"Click the button to vote for server start!\n\nVotes: **0** / {VOTE_THRESHOLD}", view=view)
-            print(f"✅ Poll message updated (ID {poll_message.id})")
-            return poll_message
-        else:
-            # Send a fresh poll message
-            view = PollView()
-            msg = await channel.send(f"Click the button to vote for server start!\n\nVotes: **0** / {VOTE_THRESHOLD}", view=view)
-            poll_message = msg
-            poll_votes[msg.id] = set()
-            bot.add_view(view, message_id=msg.id)
-            print(f"✅ Poll posted with ID {msg.id}")
-            return msg
+            vote_store.reset(state.message.id)
+            if await poll_edits.edit(state.message, poll_content(0), poll_view(state)):
+                log.info("poll.reset", f"✅ Poll message updated (ID {state.message.id})",
+                         guild=state.guild_id, poll=state.channel_id, message=state.message.id)
+                index_poll(state)
+                return state.message
+            # The old message is gone (deleted/purged) — fall through and post a fresh one
+            forget_message(state)
+
+        # Send a fresh poll message
+        view = PollView(state)
+        msg = await outbound.send(channel, poll_content(0), view=view)
+        sent_messages.track(msg)
+        state.message = msg
+        vote_store.reset(msg.id)
+        poll_views.put(msg.id, view)
+        log.info("poll.posted", f"✅ Poll posted with ID {msg.id}", guild=state.guild_id, poll=state.channel_id, message=msg.id)
+        index_poll(state)
+        return msg
     except Exception as e:
-        print(f"❌ Failed to post or update poll: {e}")
+        log.error("poll.post_failed", f"❌ Failed to post or update poll: {e}", guild=state.guild_id, poll=state.channel_id, exc=e)
         return None
 
 
-async def reset_and_wait_update_poll():
+async def purge_bot_messages(channel):
     """
-    Edits the existing poll message to show a cooldown and disables buttons,
-    waits the cooldown, then restores the poll message (or shows poll paused / running).
+    Delete the bot's own messages in channel using the sent-message registry.
+    If the poll message was among them it is forgotten, so post_poll() posts a new one.
+    Returns (messages deleted, REST calls made).
     """
-    global poll_message, poll_votes, running_mode, paused
-    if poll_message is None:
-        print("reset_and_wait_update_poll called but poll_message is None — nothing to update.")
+    deleted, calls, gone = await sent_messages.purge(channel)
+    state = polls.get((channel.guild.id if channel.guild else 0, channel.id))
+    # only a poll message that was deleted here: one the registry never tracked (or evicted) is still up
+    if state is not None and state.message is not None and state.message.id in gone:
+        forget_message(state)
+        index_poll(state)
+    log.info("poll.purged", f"🧹 Deleted {deleted} bot messages in #{getattr(channel, 'name', channel.id)} using {calls} REST calls",
+             poll=channel.id, deleted=deleted, rest_calls=calls)
+    return deleted, calls
+
+
+def new_round(state: PollState):
+    state.round_started = time.time()
+    analytics.record("round", state.analytics_key)
+
+
+def _duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes}m" if hours else f"{minutes}m {seconds}s" if minutes else f"{seconds}s"
+
+
+def cooldown_text() -> str:
+    minutes, seconds = divmod(int(bot.config.poll_cooldown_seconds), 60)
+    wait = f"{minutes} minutes" if not seconds else f"{minutes}m {seconds}s" if minutes else f"{seconds} seconds"
+    return f"⏳ Poll is on cooldown. Please wait {wait} before voting again."
+
+
+async def start_cooldown(state: PollState):
+    """
+    Edits the existing poll message to show a cooldown and disables buttons, then hands
+    the rest to a timer: it tells the actor "cooldown_elapsed" when it expires. Nothing
+    waits in the meantime.
+    """
+    if state.message is None:
+        log.warning("poll.cooldown_without_message", "start_cooldown called but the poll message is None — nothing to update.",
+                    guild=state.guild_id, poll=state.channel_id)
         return
 
-    # Disable buttons in a view to show cooldown state
-    view = PollView(message_id=poll_message.id)
-    for item in view.children:
-        if isinstance(item, discord.ui.Button):
-            item.disabled = True
+    arm_cooldown(state, bot.config.poll_cooldown_seconds)
+    # Disable buttons in a view to show cooldown state (queued: the actor doesn't wait for the edit)
+    poll_edits.request(state.message, cooldown_text(), poll_view(state, enabled=False))
+    index_poll(state, COOLDOWN)
+
+
+def arm_cooldown(state: PollState, delay: float):
+    """The cooldown ends in `delay` seconds: the timer tells the poll's actor."""
+    timers.schedule(state.cooldown_key, delay, state.actor.tell, "cooldown_elapsed")
+
+
+def cancel_cooldown(state: PollState):
+    """Drop a pending cooldown timer (the poll was reset, paused or the server started)."""
+    timers.cancel(state.cooldown_key)
+
+
+async def end_cooldown(state: PollState):
+    """COOLDOWN → OPEN when the cooldown timer expires: a new round on the same poll message."""
+    state.phase = OPEN
+    if state.message is None:
+        return
+
+    vote_store.reset(state.message.id)
+    notifier.new_round(state.notify_key)
+    new_round(state)
+    poll_edits.request(state.message, poll_content(0), poll_view(state))
+    index_poll(state)
+
+
+# ---- the poll's state machine ------------------------------------------------
+#
+# Everything that changes a poll is a command to its actor: vote clicks, !pause/!unpause,
+# !running, !resetpoll, the scheduler, the watcher and the cooldown timer. The actor runs
+# them one at a time, so a click never sees the poll change halfway through and two
+# clicks can't both cross the threshold.
+
+def refusal(state: PollState) -> str | None:
+    """Why a click can't vote right now, or None when it can."""
+    if state.phase == PAUSED:
+        return "Polls are paused right now."
+    if state.phase == RUNNING:
+        return "Server is already running."
+    if state.phase == RESETTING:
+        return "The poll is being reset, vote again in a moment."
+    if state.message is None:
+        return "Poll is not active at the moment."
+    if state.phase == COOLDOWN:
+        return "Poll is on cooldown, try again in a moment."
+    return None
+
+
+async def apply_votes(state: PollState, batch: List[tuple]) -> List[str]:
+    """
+    Clicks that queued up together, in order: toggle each vote, then edit the poll once.
+    The click that reaches the threshold moves the poll to COOLDOWN on the spot, so the
+    clicks after it (in this batch or the next) are turned away. Returns the answer for
+    each click.
+    """
+    POLL_BATCH_SIZE.observe(len(batch))
+    threshold = bot.config.vote_threshold
+    message = state.message
+    answers = []
+    changed = False
+    reached_by = None
+    for (user,) in batch:
+        text = refusal(state)
+        if text is None:
+            user_id = user.id
+            votes = vote_store.get(message.id)
+            if user_id in votes:
+                vote_store.remove(message.id, user_id)
+                analytics.record("unvote", state.analytics_key, user_id)
+                text = "Your vote has been removed."
+            else:
+                vote_store.add(message.id, user_id)
+                analytics.record("vote", state.analytics_key, user_id)
+                text = "Thanks — your vote has been counted!"
+            changed = True
+            if len(votes) >= threshold:
+                state.phase = COOLDOWN
+                reached_by = user
+        answers.append(text)
+
+    if reached_by is None:
+        if changed:
+            # Update poll message with vote count (coalesced with other clicks)
+            poll_edits.request(message, poll_content(len(vote_store.get(message.id))), poll_view(state))
+        return answers
+
+    # Threshold reached → notify owners; the notifier sends in the background
+    notify_owner_thread(reached_by.name, state.notify_key)
+    took = time.time() - state.round_started if state.round_started is not None else None
+    analytics.record("threshold", state.analytics_key, value=took)
+    # update poll message to show owners notified (instead of sending new channel message)
+    poll_edits.request(message, "✅ Owners have been notified! Poll will reset shortly...",
+                        poll_view(state, enabled=False))
+    # Start the cooldown; a timer reopens the poll when it ends
+    await start_cooldown(state)
+    return answers
+
+
+async def pause(state: PollState, channel, text: str, replace: bool = False):
+    """
+    Any phase → PAUSED. Clears the channel and shows `text` in the poll message (or posts
+    it when the poll message is gone, or always with replace=True).
+    """
+    state.phase = PAUSED
+    cancel_cooldown(state)
+    await purge_bot_messages(channel)
+    if replace and state.message:
+        # the old poll message stays up without ever voting again: drop its votes, view and edits
+        forget_message(state)
+    if state.message:
+        poll_edits.request(state.message, text, poll_view(state, enabled=False))
+    else:
+        sent_messages.track(await outbound.send(channel, text))
+    index_poll(state)
+
 
+async def reopen(state: PollState, channel):
+    """→ OPEN with a fresh round: clears the channel and resets (or reposts) the poll. Returns the poll message."""
+    # the purge and repost can take a while: set before the first await, so clicks are turned
+    # away by refusal() instead of queueing behind them in the actor
+    previous, state.phase = state.phase, RESETTING
+    reset = False
     try:
-        await poll_message.edit(content="⏳ Poll is on cooldown. Please wait 2 minutes before voting again.", view=view)
-    except Exception as e:
-        print(f"Failed to set cooldown message on poll: {e}")
-
-    # Wait cooldown (2 minutes)
-    await asyncio.sleep(120)
-
-    if not running_mode and not paused:
-        try:
-            poll_votes[poll_message.id] = set()
-            restored_view = PollView(message_id=poll_message.id)
-            bot.add_view(restored_view, message_id=poll_message.id)
-            await poll_message.edit(content=f"Click the button to vote for server start!\n\nVotes: **0** / {VOTE_THRESHOLD}", view=restored_view)
-        except Exception as e:
-            print(f"Failed to restore poll after cooldown: {e}")
+        await purge_bot_messages(channel)
+        message = await post_poll(channel)
+        reset = True
+    finally:
+        # never left in RESETTING: it turns every click away
+        state.phase = OPEN if reset else previous
+        index_poll(state)
+    return message
+
+
+async def running(state: PollState, text: str):
+    """
+    Any other phase → RUNNING: the poll message points to server chat, without a button.
+    Returns True (already RUNNING is a no-op, so only the first of several openings counts).
+    """
+    state.phase = RUNNING
+    cancel_cooldown(state)
+    if state.message:
+        poll_edits.request(state.message, text, None)
+        # no button until the poll is reset: its view has nothing left to route
+        poll_views.drop(state.message.id)
     else:
-        # If running or paused, leave disabled and indicate status
-        try:
-            status_text = "Server is running — poll paused." if running_mode else "Poll paused."
-            await poll_message.edit(content=f"⏯️ {status_text}", view=view)
-        except Exception as e:
-            print(f"Failed to update poll state after cooldown: {e}")
+        state.message = await outbound.send(bot.get_channel(state.channel_id), text)
+        sent_messages.track(state.message)
+    index_poll(state)
+    return True
+
+
+# command -> (phases it applies in, transition); in any other phase it is a no-op and returns None
+TRANSITIONS = {
+    "pause": (ANY_PHASE, pause),
+    "resume": ((OPEN, COOLDOWN, PAUSED), reopen),
+    "reset": (ANY_PHASE, reopen),
+    "running": ((OPEN, COOLDOWN, PAUSED, RESETTING), running),
+    "cooldown_elapsed": ((COOLDOWN,), end_cooldown),
+}
+
+
+async def handle(state: PollState, command: str, batch: List[tuple]):
+    """The actor's handler: clicks come in batches, every other command alone."""
+    if command == "vote":
+        return await apply_votes(state, batch)
+    phases, transition = TRANSITIONS[command]
+    if state.phase not in phases:
+        log.info("poll.ignored", f"ℹ️ {command} ignored, the poll is {state.phase}",
+                 guild=state.guild_id, poll=state.channel_id, command=command, phase=state.phase)
+        return [None]
+    return [await transition(state, *batch[0])]
+
+
+def restore_phase(state: PollState, status: str | None):
+    """Put a poll back into the phase the message index last saw (on startup, before any command)."""
+    state.phase = status if status in PHASES else OPEN
+    if state.phase == COOLDOWN:
+        # without a snapshot the cooldown's deadline is unknown: let it end now
+        arm_cooldown(state, 0)
+
+
+# ---- warm restart -------------------------------------------------------------
+
+def dump_polls() -> List[dict]:
+    """Every poll's phase, message and cooldown deadline, for the shutdown snapshot."""
+    now = time.time()
+    entries = []
+    for state in polls.values():
+        remaining = timers.remaining(state.cooldown_key)
+        entries.append({"guild": state.guild_id, "channel": state.channel_id, "phase": state.phase,
+                        "message": state.message.id if state.message else None, "round_started": state.round_started,
+                        "cooldown_until": now + remaining if remaining is not None else None})
+    return entries
+
+
+def load_polls(entries: List[dict]):
+    """
+    Put the polls back the way the snapshot left them, before the bot connects: the
+    buttons work from the first click and on_ready has nothing to fetch. A cooldown
+    carries on with the time it had left.
+    """
+    for entry in entries:
+        state = get_poll(entry["guild"], entry["channel"])
+        state.phase = entry["phase"] if entry["phase"] in PHASES else OPEN
+        state.round_started = entry["round_started"]
+        if entry["message"]:
+            channel = bot.get_partial_messageable(state.channel_id, guild_id=state.guild_id or None,
+                                                type=discord.ChannelType.text)
+            # edits and deletes only need the ID; nothing reads the content back
+            state.message = channel.get_partial_message(entry["message"])
+            if state.phase != RUNNING:
+                poll_view(state, enabled=state.phase == OPEN)
+        if state.phase == COOLDOWN:
+            arm_cooldown(state, max(0.0, (entry["cooldown_until"] or 0) - time.time()))
+
+
+snapshot.section("polls", dump_polls, load_polls)
 
 
 # Cog exposing resetpoll command as before
@@ -173,18 +533,55 @@ class PollCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
+    async def cog_unload(self):
+        for state in polls.values():
+            await state.actor.close()
+        # bot.close() removes cogs — write out any votes still buffered
+        vote_store.flush_now()
+        analytics.close()
+        await notifier.close()
+
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        # catches every bot message, including ctx.send replies, for later cleanup
+        if message.author == self.bot.user:
+            sent_messages.track(message)
+
     @commands.command()
     async def resetpoll(self, ctx):
-        global poll_message, running_mode, paused, poll_votes
-        channel = self.bot.get_channel(int(os.getenv("POLL_CHANNEL_ID", "0")))
+        channel = resolve_poll_channel(ctx.channel)
         if channel is None:
             await ctx.send("❌ Poll channel not found! Check POLL_CHANNEL_ID")
             return
 
-        running_mode = False
-        paused = False
-        await channel.purge(limit=200, check=lambda m: m.author == self.bot.user)
-        poll_message_local = await post_poll(channel)
-        if poll_message_local:
-            poll_votes[poll_message_local.id] = set()
+        if await poll_for_channel(channel).actor.ask("reset", channel):
             await ctx.send("✅ Poll has been reset for the next round!")
+
+    @commands.command(name="pollstats")
+    async def pollstats(self, ctx):
+        """Vote history of this channel's poll: totals, time to threshold, peak hours, last days, top voters."""
+        channel = resolve_poll_channel(ctx.channel)
+        if channel is None:
+            await ctx.send("❌ Poll channel not found! Check POLL_CHANNEL_ID")
+            return
+        stats = await analytics.summary(poll_for_channel(channel).analytics_key)
+        totals = stats["totals"]
+        if not totals:
+            await ctx.send(f"📊 No votes recorded in {channel.mention} yet.")
+            return
+
+        lines = [f"📊 **Poll stats for {channel.mention}**",
+                 f"Votes: {totals['votes']} ({totals['unvotes']} taken back) • last 24 h: {stats['votes_24h']}"]
+        reached = f"Rounds: {totals['rounds']} • threshold reached {totals['thresholds']} times"
+        if totals["timed_thresholds"]:
+            reached += (f" (avg {_duration(totals['threshold_seconds'] / totals['timed_thresholds'])},"
+                        f" fastest {_duration(totals['fastest_threshold'])})")
+        lines.append(reached)
+        if stats["peak_hours"]:
+            lines.append(f"Busiest hours ({bot.config.poll_timezone}): "
+                         + ", ".join(f"{hour:02d}:00 ({votes})" for hour, votes in stats["peak_hours"][:3]))
+        if stats["days"]:
+            lines.append("Last days: " + " • ".join(f"{d['day'][5:]} {d['votes']}🗳️ {d['thresholds']}✅" for d in stats["days"]))
+        if stats["top_voters"]:
+            lines.append("Top voters: " + ", ".join(f"<@{uid}> ({votes})" for uid, votes in stats["top_voters"]))
+        await ctx.send("\n".join(lines), allowed_mentions=discord.AllowedMentions.none())
@@ -1,46 +1,130 @@
 # discord-bot/cogs/roles.py
-import os
+import asyncio
+import discord
+from typing import List
 from discord.ext import commands
+from utils.rolesync import RoleWorker, failure_reason
+from utils.config import on_reload
+from utils import outbound
+from utils.views import TimedView
+from utils.log import log
+
+# follow-ups waiting for role edits, kept so they aren't garbage collected
+_followups: set = set()
+
+def role_custom_id(role_id: int) -> str:
+    return f"roles:toggle:{role_id}"
+
+
+class RoleButton(discord.ui.Button):
+    def __init__(self, worker: RoleWorker, role_id: int, label: str):
+        super().__init__(label=label, style=discord.ButtonStyle.secondary, custom_id=role_custom_id(role_id))
+        self.worker = worker
+        self.role_id = role_id
+
+    async def callback(self, interaction: discord.Interaction):
+        role = interaction.guild.get_role(self.role_id) if interaction.guild else None
+        if role is None or not isinstance(interaction.user, discord.Member):
+            await interaction.response.send_message("That role doesn't exist anymore.", ephemeral=True)
+            return
+        wanted, applied = self.worker.toggle(interaction.user, self.role_id)
+        if wanted:
+            await interaction.response.send_message(f"✅ You'll get {role.mention} in a moment.", ephemeral=True)
+        else:
+            await interaction.response.send_message(f"👋 {role.mention} will be removed in a moment.", ephemeral=True)
+        # the click is answered now; the edit runs after the debounce and is only reported if it fails
+        task = asyncio.create_task(self._report_failure(interaction, role, wanted, applied))
+        _followups.add(task)
+        task.add_done_callback(_followups.discard)
+
+    @staticmethod
+    async def _report_failure(interaction: discord.Interaction, role: discord.Role, wanted: bool, applied: asyncio.Future):
+        error = await applied
+        if error is None:
+            return
+        action = "give you" if wanted else "remove"
+        try:
+            await interaction.followup.send(f"❌ I couldn't {action} {role.mention}: {failure_reason(error)}", ephemeral=True)
+        except discord.HTTPException as e:
+            log.warning("roles.followup_failed", f"⚠️ Could not tell {interaction.user} their role change failed: {e}",
+                        user=interaction.user.id, error=str(e))
+
+
+class RoleMenuView(TimedView):
+    """One toggle button per subscribable role. Persistent: the custom_ids only depend on the role IDs."""
+
+    def __init__(self, worker: RoleWorker, roles: List[tuple]):
+        super().__init__(timeout=None)
+        for role_id, label in roles[:25]:
+            self.add_item(RoleButton(worker, role_id, label))
 
-GETNOTIFIED_ROLE_ID = int(os.getenv("GETNOTIFIED_ROLE_ID", "0"))
-GENERAL_CHANNEL_ID = int(os.getenv("GENERAL_CHANNEL_ID", "0"))
 
 class RolesCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # clicks and commands only record what members want; this applies it in merged edits
+        self.worker = RoleWorker(bot.config.role_debounce_seconds)
+        on_reload(self._on_reload)
+
+    def role_ids(self) -> List[int]:
+        """SUBSCRIBABLE_ROLE_IDS, or just GETNOTIFIED_ROLE_ID when that isn't set."""
+        config = self.bot.config
+        return list(config.subscribable_role_ids) or ([config.getnotified_role_id] if config.getnotified_role_id else [])
+
+    async def cog_load(self):
+        # buttons on menus posted before a restart keep working
+        self.bot.add_view(RoleMenuView(self.worker, [(rid, str(rid)) for rid in self.role_ids()]))
+
+    async def cog_unload(self):
+        await self.worker.flush()
+
+    def _on_reload(self, old, new):
+        self.worker.debounce = new.role_debounce_seconds
+        if old.subscribable_role_ids != new.subscribable_role_ids:
+            self.bot.add_view(RoleMenuView(self.worker, [(rid, str(rid)) for rid in self.role_ids()]))
+
+    @commands.command(name="rolemenu")
+    @commands.has_permissions(administrator=True)
+    async def rolemenu(self, ctx):
+        """Post the self-service role buttons in this channel."""
+        roles = [(rid, role.name) for rid in self.role_ids() if (role := ctx.guild.get_role(rid)) is not None]
+        if not roles:
+            await ctx.send("No subscribable roles found! Check SUBSCRIBABLE_ROLE_IDS / GETNOTIFIED_ROLE_ID")
+            return
+        await outbound.send(ctx.channel, "Pick the notifications you want — click again to stop them:",
+                            view=RoleMenuView(self.worker, roles))
 
     @commands.command()
     async def getnotified(self, ctx):
-        if ctx.channel.id != GENERAL_CHANNEL_ID:
+        if ctx.channel.id != self.bot.config.general_channel_id:
             return await ctx.send("Please use this command in the designated channel.")
 
-        role = ctx.guild.get_role(GETNOTIFIED_ROLE_ID)
+        role = ctx.guild.get_role(self.bot.config.getnotified_role_id)
         if not role:
             return await ctx.send("The role does not exist!")
 
-        if role in ctx.author.roles:
+        if self.worker.wanted(ctx.author, role.id):
             return await ctx.send(f"{ctx.author.mention}, you already have that role!")
 
-        try:
-            await ctx.author.add_roles(role)
-            await ctx.send(f"{ctx.author.mention}, you have been added to the role!")
-        except discord.Forbidden:
-            await ctx.send("I don't have permission to add roles.")
+        # confirm only once the debounced edit went through
+        error = await self.worker.request(ctx.author, role.id, True)
+        if error is not None:
+            return await ctx.send(f"{ctx.author.mention}, I couldn't add you to the role: {failure_reason(error)}")
+        await ctx.send(f"{ctx.author.mention}, you have been added to the role!")
 
     @commands.command()
     async def stopnotified(self, ctx):
-        if ctx.channel.id != GENERAL_CHANNEL_ID:
+        if ctx.channel.id != self.bot.config.general_channel_id:
             return await ctx.send("Please use this command in the designated channel.")
 
-        role = ctx.guild.get_role(GETNOTIFIED_ROLE_ID)
+        role = ctx.guild.get_role(self.bot.config.getnotified_role_id)
         if not role:
             return await ctx.send("The role does not exist!")
 
-        if role not in ctx.author.roles:
+        if not self.worker.wanted(ctx.author, role.id):
             return await ctx.send(f"{ctx.author.mention}, you don't have that role!")
 
-        try:
-            await ctx.author.remove_roles(role)
-            await ctx.send(f"{ctx.author.mention}, the role has been removed.")
-        except discord.Forbidden:
-            await ctx.send("I don't have permission to remove roles.")
+        error = await self.worker.request(ctx.author, role.id, False)
+        if error is not None:
+            return await ctx.send(f"{ctx.author.mention}, I couldn't remove the role: {failure_reason(error)}")
+        await ctx.send(f"{ctx.author.mention}, the role has been removed.")
@@ -1,58 +1,148 @@
 # discord-bot/cogs/scheduler.py
-import os
+import asyncio
 from datetime import datetime
-from zoneinfo import ZoneInfo
-from discord.ext import tasks, commands
+from discord.ext import commands
 import cogs.poll as pollmod
+from utils.timers import timers
+from utils.log import log
+from utils.metrics import SCHEDULER_LAG_SECONDS
+from utils.schedule import PollSchedule, PAUSED, OPEN
+from utils.storage import data_path, atomic_write_json, read_json
+from utils.snapshot import snapshot
+from utils.config import get_config, on_reload
 
-POLL_PAUSE_HOUR = int(os.getenv("POLL_PAUSE_HOUR", "21"))
-POLL_RESUME_HOUR = int(os.getenv("POLL_RESUME_HOUR", "8"))
-MT = ZoneInfo("America/Denver")
+
+def schedule_for(channel_id: int) -> PollSchedule:
+    """Pause windows of a poll: POLL_SCHEDULE_<channel id>, else POLL_SCHEDULE, else POLL_PAUSE_HOUR-POLL_RESUME_HOUR."""
+    config = get_config()
+    return PollSchedule.parse(config.schedule_for(channel_id), config.poll_timezone)
 
 
 class SchedulerCog(commands.Cog):
+    """
+    Pauses and resumes polls on their schedules. Instead of waking up every hour, each poll
+    has one timer in the shared timer service set to its next transition.
+    """
+
     def __init__(self, bot):
         self.bot = bot
-        # DO NOT start the task in __init__ — event loop not running here
+        self.schedules = {}
+        # last phase the scheduler applied per poll, so a restart can tell whether it missed one
+        self.applied_path = data_path("schedule.json")
+        self.applied = read_json(self.applied_path, {}) or {}
+        # schedule.json is written on every transition; the snapshot has the same, as of shutdown
+        snapshot.section("schedule", lambda: dict(self.applied), self.applied.update)
+        self._startup: asyncio.Task | None = None
+        # new windows/time zone take effect on a config reload
+        on_reload(lambda old, new: self.rearm_all())
 
     async def cog_load(self):
         """
         cog_load is called after the cog is added (and awaited) in setup_hook.
         Start the background scheduler here so there's a running event loop.
         """
-        if not self.poll_scheduler.is_running():
-            self.poll_scheduler.start()
+        self._startup = asyncio.create_task(self.start_schedules())
+
+    async def cog_unload(self):
+        for state in list(pollmod.polls.values()):
+            timers.cancel(self.timer_key(state))
+
+    @staticmethod
+    def timer_key(state) -> str:
+        return f"schedule:{state.guild_id}:{state.channel_id}"
+
+    def now(self) -> datetime:
+        # read time through the timer service clock so virtual time works too
+        return datetime.fromtimestamp(timers.clock.time()).astimezone()
 
-    @tasks.loop(hours=1)
-    async def poll_scheduler(self):
-        channel = self.bot.get_channel(int(os.getenv("POLL_CHANNEL_ID", "0")))
+    async def start_schedules(self):
+        await self.bot.wait_until_ready()
+        # don't post or purge before on_ready has found the existing poll messages
+        await pollmod.polls_restored.wait()
+        for channel_id in pollmod.poll_channel_ids():
+            # one poll's bad schedule or failed catch-up must not leave the others unscheduled
+            try:
+                await self.start_schedule(channel_id)
+            except Exception as e:
+                log.error("schedule.failed", f"❌ Could not start the schedule of poll {channel_id}: {e}", poll=channel_id, exc=e)
+
+    async def start_schedule(self, channel_id: int):
+        channel = self.bot.get_channel(channel_id)
         if channel is None:
             return
+        state = pollmod.poll_for_channel(channel)
+        self.schedules[state.key] = schedule_for(channel_id)
+        log.info("schedule.loaded", f"🗓️ Poll in #{channel.name} paused during {self.schedules[state.key].describe()}",
+                 guild=state.guild_id, poll=state.channel_id)
 
-        now = datetime.now(MT).time()
-
-        # Pause at POLL_PAUSE_HOUR
-        if now.hour == POLL_PAUSE_HOUR:
-            await channel.purge(limit=200, check=lambda m: m.author == self.bot.user)
-            pollmod.paused = True
-            pollmod.poll_message = None
-            await channel.send(f"⏸️ Poll paused until {POLL_RESUME_HOUR:02d}:00 MT.")
-            print("🌙 Poll paused for the night.")
-
-        # Resume at POLL_RESUME_HOUR
-        elif now.hour == POLL_RESUME_HOUR and not pollmod.running_mode:
-            await channel.purge(limit=200, check=lambda m: m.author == self.bot.user)
-            pollmod.poll_message = await pollmod.post_poll(channel)
-            pollmod.paused = False
-            if pollmod.poll_message:
-                print("🌅 Morning poll posted automatically.")
-
-    @poll_scheduler.before_loop
-    async def before_poll_scheduler(self):
-        await self.bot.wait_until_ready()
-        now = datetime.now(MT)
-        seconds_until_next_hour = (60 - now.minute) * 60 - now.second
-        if seconds_until_next_hour <= 0:
-            seconds_until_next_hour = 0
-        print(f"⏳ Waiting {seconds_until_next_hour} seconds to align scheduler to the hour.")
-        await asyncio.sleep(seconds_until_next_hour)
+        # Catch up on a transition that happened while the bot was offline
+        phase = self.schedules[state.key].phase_at(self.now())
+        last = self.applied.get(f"{state.guild_id}:{state.channel_id}")
+        if not self.schedules[state.key].windows:
+            pass
+        elif last is None and (phase == OPEN or state.paused):
+            # first run with this schedule and the poll already matches it
+            await self.remember(state, phase)
+        elif last != phase:
+            log.info("schedule.catch_up", f"⏩ Running missed {phase} transition for #{channel.name}",
+                     guild=state.guild_id, poll=state.channel_id, phase=phase)
+            await self.apply(channel, state, phase)
+        self.arm(state)
+
+    def rearm_all(self):
+        for key in list(self.schedules):
+            state = pollmod.polls.get(key)
+            if state is None:
+                continue
+            try:
+                self.schedules[key] = schedule_for(state.channel_id)
+            except Exception as e:
+                # config validation should have caught it; keep the schedule the poll had
+                log.error("schedule.failed", f"❌ Keeping the old schedule of poll {state.channel_id}: {e}",
+                          guild=state.guild_id, poll=state.channel_id, exc=e)
+            self.arm(state)
+
+    def arm(self, state):
+        """Set the poll's timer to its next transition."""
+        schedule = self.schedules.get(state.key)
+        nxt = schedule.next_transition(self.now()) if schedule else None
+        if nxt is None:
+            timers.cancel(self.timer_key(state))
+            return
+        at, phase = nxt
+        delay = (at - self.now()).total_seconds()
+        timers.schedule(self.timer_key(state), delay, self.on_transition, state, at, phase)
+
+    async def on_transition(self, state, due: datetime, phase: str):
+        lag = (self.now() - due).total_seconds()
+        if lag < 0:
+            # the monotonic timer ran ahead of the wall clock — wait out the difference
+            timers.schedule(self.timer_key(state), -lag, self.on_transition, state, due, phase)
+            return
+        SCHEDULER_LAG_SECONDS.observe(lag, phase)
+        try:
+            channel = self.bot.get_channel(state.channel_id)
+            if channel is not None:
+                log.info("schedule.transition", f"⏰ Scheduled {phase} for #{channel.name} ({lag * 1000:.0f} ms late)",
+                         guild=state.guild_id, poll=state.channel_id, phase=phase, lag_ms=round(lag * 1000, 1))
+                await self.apply(channel, state, phase)
+        finally:
+            self.arm(state)
+
+    async def remember(self, state, phase: str):
+        self.applied[f"{state.guild_id}:{state.channel_id}"] = phase
+        await asyncio.to_thread(atomic_write_json, self.applied_path, dict(self.applied))
+
+    async def apply(self, channel, state, phase: str):
+        await self.remember(state, phase)
+
+        if phase == PAUSED:
+            nxt = self.schedules[state.key].next_transition(self.now())
+            until = f" until {nxt[0].astimezone(self.schedules[state.key].tz):%H:%M %Z}" if nxt else ""
+            await state.actor.ask("pause", channel, f"⏸️ Poll paused{until}.", True)
+            log.info("schedule.paused", "🌙 Poll paused for the night.", guild=state.guild_id, poll=state.channel_id)
+
+        elif phase == OPEN:
+            # "resume" leaves a running server's poll alone
+            if await state.actor.ask("resume", channel):
+                log.info("schedule.opened", "🌅 Morning poll posted automatically.", guild=state.guild_id, poll=state.channel_id)
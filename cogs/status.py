@@ -0,0 +1,120 @@
+# discord-bot/cogs/status.py
+import time
+import asyncio
+from discord.ext import commands
+import cogs.poll as pollmod
+from utils.probe import StatusProber
+from utils.timers import timers
+from utils.log import log
+from utils.config import on_reload
+
+
+def make_prober(config) -> StatusProber | None:
+    address = config.probe_address
+    if address is None:
+        return None
+    host, java_port, bedrock_port = address
+    return StatusProber(host, java_port, bedrock_port, timeout=config.probe_timeout_seconds, ttl=config.probe_cache_seconds)
+
+
+class StatusCog(commands.Cog):
+    """
+    Asks the game server itself whether it is up, every PROBE_INTERVAL_SECONDS, and runs
+    the watcher's open/shutdown transitions when the probe sees the server come up or go
+    down. Only changes count: a server that stays up while the poll is paused or reset by
+    an admin is left alone. Works with or without the status bot's embeds; whichever
+    notices first wins: the poll's actor only moves it to RUNNING once, and the watcher
+    doesn't announce an opening the poll already had.
+    """
+    TIMER_KEY = "probe"
+    # failed probes in a row before the server counts as down (a lost UDP packet isn't a shutdown)
+    offline_after = 2
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.prober = make_prober(bot.config)
+        self.failures = 0
+        # only report a shutdown the prober saw happen, not a server that is still booting after !running
+        self.seen_online = False
+        self._startup: asyncio.Task | None = None
+        on_reload(self._on_reload)
+
+    async def cog_load(self):
+        self._startup = asyncio.create_task(self.start())
+
+    async def cog_unload(self):
+        timers.cancel(self.TIMER_KEY)
+        if self._startup is not None:
+            self._startup.cancel()
+
+    async def start(self):
+        await self.bot.wait_until_ready()
+        # the poll's running mode is only known once on_ready restored it
+        await pollmod.polls_restored.wait()
+        self.arm(0)
+
+    def arm(self, delay: float | None = None):
+        interval = self.bot.config.probe_interval_seconds
+        if interval <= 0 or self.prober is None:
+            timers.cancel(self.TIMER_KEY)
+            return
+        timers.schedule(self.TIMER_KEY, interval if delay is None else delay, self.tick)
+
+    def _on_reload(self, old, new):
+        if (old.probe_address, old.probe_timeout_seconds, old.probe_cache_seconds) != \
+                (new.probe_address, new.probe_timeout_seconds, new.probe_cache_seconds):
+            self.prober = make_prober(new)
+            self.failures = 0
+        if old.probe_interval_seconds != new.probe_interval_seconds or old.probe_address != new.probe_address:
+            self.arm(0 if self.bot.is_ready() else None)
+
+    async def tick(self):
+        try:
+            await self.reconcile(await self.prober.status(max_age=0))
+        except Exception as e:
+            log.error("probe.failed", f"❌ Server status probe failed: {e}", exc=e)
+        finally:
+            self.arm()
+
+    async def reconcile(self, status):
+        channel = pollmod.resolve_poll_channel()
+        watcher = self.bot.get_cog("WatcherCog")
+        if channel is None or watcher is None:
+            return
+        state = pollmod.poll_for_channel(channel)
+
+        if status.online:
+            self.failures = 0
+            if self.seen_online:
+                return
+            self.seen_online = True
+            log.info("probe.up", f"🟢 Probe: server is up ({status.edition}, {status.players}/{status.max_players} players)",
+                     edition=status.edition, players=status.players, latency_ms=round(status.latency_ms, 1))
+            if state.paused:
+                # a schedule or admin pause outranks the server coming up; !resume reopens the poll
+                log.info("probe.paused", "⏸️ Probe: the poll is paused, not announcing the server", channel=channel.id)
+            elif not state.running_mode:
+                await watcher.open_server(channel.guild, channel)
+            return
+
+        self.failures += 1
+        if self.seen_online and self.failures >= self.offline_after:
+            log.info("probe.down", f"🔴 Probe: server is down ({status.error})", error=status.error)
+            self.seen_online = False
+            if state.running_mode:
+                await watcher.close_server(channel)
+
+    @commands.command(name="serverstatus")
+    async def serverstatus(self, ctx):
+        """Show whether the game server answers (cached for PROBE_CACHE_SECONDS)."""
+        if self.prober is None:
+            await ctx.send("❌ No server address to check. Set LOGIN_CREDENTIALS or PROBE_HOST")
+            return
+        status = await self.prober.status()
+        age = time.time() - status.checked_at
+        if status.online:
+            text = (f"🟢 Server is online ({status.edition} {status.version}): "
+                    f"{status.players}/{status.max_players} players, {status.latency_ms:.0f} ms")
+        else:
+            text = "🔴 Server is not answering"
+        await ctx.send(f"{text} — checked {age:.0f}s ago")
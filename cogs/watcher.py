@@ -1,98 +1,129 @@
 # discord-bot/cogs/watcher.py
-import os
+import asyncio
 from discord.ext import commands
 import cogs.poll as pollmod
 from utils.helpers import DummyContext
+from utils.rules import RuleEngine
+from utils.config import on_reload
+from utils import outbound
+from utils.announce import announcer
+from utils.log import log
+from utils.metrics import WATCHER_EVENTS
+
+# What the status bot posts today. A rule in WATCH_RULES_FILE with the same name replaces one of these.
+DEFAULT_RULES = [
+    {"name": "server_opened", "author": "bot", "field": "description",
+     "contains": ["the server has opened", ":green_circle:"], "action": "server_open", "delete": True},
+    {"name": "server_shutdown", "author": "bot", "field": "description",
+     "contains": ["the server has shutdown", ":red_circle:"], "action": "server_shutdown", "delete": True},
+]
 
-WATCH_CHANNEL_ID = int(os.getenv("WATCH_CHANNEL_ID", "0"))
-SERVER_CHAT_CHANNEL_ID = int(os.getenv("SERVER_CHAT_CHANNEL_ID", "0"))
-GETNOTIFIED_ROLE_ID = int(os.getenv("GETNOTIFIED_ROLE_ID", "0"))
-POLL_CHANNEL_ID = int(os.getenv("POLL_CHANNEL_ID", "0"))
-MINECRAFT_SERVER_LOGIN = os.getenv("LOGIN_CREDENTIALS", "IP NOT FOUND, PORT NOT FOUND").split(",")
 
 class WatcherCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.actions = {
+            "server_open": self.server_open,
+            "server_shutdown": self.server_shutdown,
+            "announce": self.announce,
+        }
+        self.load_rules()
+        # rules file or watch channel may change on a config reload
+        on_reload(lambda old, new: self.load_rules())
+
+    def load_rules(self):
+        config = self.bot.config
+        self.rules = RuleEngine.load(DEFAULT_RULES, config.watch_rules_file, config.watch_channel_id)
+        for rule in self.rules.rules:
+            if rule.action not in self.actions:
+                log.error("watcher.unknown_action", f"❌ Watcher rule {rule.name!r} has unknown action {rule.action!r}",
+                          rule=rule.name, action=rule.action)
 
     @commands.Cog.listener()
     async def on_message(self, message):
-        # Only respond to bot messages posted in the WATCH_CHANNEL
-        if message.channel.id != WATCH_CHANNEL_ID or not message.author.bot:
+        # One dict lookup rejects messages from channels no rule watches
+        if message.channel.id not in self.rules.by_channel:
+            return
+
+        deleted = False
+        for rule, embed, match in self.rules.evaluate(message):
+            action = self.actions.get(rule.action)
+            if action is None:
+                continue
+            log.info("watcher.fired", f"Detected {rule.name} event!", rule=rule.name, guild=message.guild.id if message.guild else None,
+                     channel=message.channel.id, message=message.id)
+            WATCHER_EVENTS.inc(rule.name)
+            if rule.params.get("delete") and not deleted:
+                deleted = True
+                try:
+                    await outbound.delete(message)
+                except Exception:
+                    pass
+            await action(message, rule, match)
+
+    @commands.command(name="watchstats")
+    async def watchstats(self, ctx):
+        """Show how often each watcher rule was checked and fired."""
+        lines = [f"`{r['name']}` → {r['action']}: {r['hits']} hits / {r['evaluations']} checks, {r['avg_us']:.1f} µs avg"
+                 for r in self.rules.stats()]
+        await ctx.send("\n".join(lines) or "No watcher rules loaded.")
+
+    # ---- actions ------------------------------------------------------------
+
+    async def server_open(self, message, rule, match):
+        await self.open_server(message.guild, message.channel)
+
+    async def server_shutdown(self, message, rule, match):
+        await self.close_server(message.channel)
+
+    # ---- transitions (also used by the status prober) ------------------------
+
+    async def open_server(self, guild, fallback_channel):
+        """The game server came up: announce it with the credentials and point the poll to server chat."""
+        serverChat = self.bot.get_channel(self.bot.config.server_chat_channel_id)
+        pollChannel = pollmod.resolve_poll_channel()
+        # the probe and the status bot both report an opening: the poll's actor lets only the
+        # first one through, so the credentials go out once
+        if not await self._poll_running(pollChannel, serverChat):
+            log.info("watcher.already_open", "ℹ️ Server already marked running, not announcing again")
             return
+        await announcer.announce("server_open", guild, pollChannel)
+
+    async def _poll_running(self, pollChannel, serverChat) -> bool:
+        """Point the poll to server chat. False when it already did (nothing left to announce)."""
+        if not pollChannel:
+            return True
+        try:
+            # the poll edit itself is queued, so this doesn't hold up the announcement for long
+            return bool(await pollmod.poll_for_channel(pollChannel).actor.ask("running", f"✅ Server running — go to {serverChat.mention}"))
+        except Exception as e:
+            log.error("watcher.poll_update_failed", f"Failed to update poll message on server open: {e}", exc=e)
+            # announcing still beats staying silent
+            return True
 
-        for embed in message.embeds:
-            if embed.description:
-                desc = embed.description.lower()
-                serverChat = self.bot.get_channel(SERVER_CHAT_CHANNEL_ID)
-                pollChannel = self.bot.get_channel(POLL_CHANNEL_ID)
-
-                # SERVER OPENED
-                if "the server has opened" in desc and ":green_circle:" in desc:
-                    print("Detected server open event!")
-                    try:
-                        await message.delete()
-                    except Exception:
-                        pass
-
-                    # Send credentials to server-chat
-                    if serverChat:
-                        try:
-                            ip = MINECRAFT_SERVER_LOGIN[0] if len(MINECRAFT_SERVER_LOGIN) > 0 else "IP_NOT_SET"
-                            port = MINECRAFT_SERVER_LOGIN[1] if len(MINECRAFT_SERVER_LOGIN) > 1 else "PORT_NOT_SET"
-                            guild = message.guild
-                            role = guild.get_role(GETNOTIFIED_ROLE_ID) if guild else None
-                            role_mention = role.mention if role else f"<@&{GETNOTIFIED_ROLE_ID}>"
-
-                            await serverChat.send(
-                                "Server is running! ✅\n"
-                                f"Use this info to connect to the server:\n"
-                                f"IP: {ip}\n"
-                                f"Port: {port} (Bedrock users)\n\n"
-                                f"{role_mention} — run `!getnotified` in {pollChannel.mention} to be added to notifications."
-                            )
-                        except Exception as e:
-                            print(f"Failed sending server open credentials: {e}")
-
-                    # Update poll message to point to server-chat
-                    try:
-                        if pollmod.poll_message:
-                            await pollmod.poll_message.edit(content=f"✅ Server running — go to {serverChat.mention}", view=None)
-                        else:
-                            if pollChannel:
-                                pollmod.poll_message = await pollChannel.send(f"✅ Server running — go to {serverChat.mention}")
-                    except Exception as e:
-                        print(f"Failed to update poll message on server open: {e}")
-
-                    # Preserve previous behavior: call running command code path (optional)
-                    try:
-                        # Use DummyContext to call poll reset / running-style behavior if needed
-                        await self.bot.get_cog("ServerCog").running(DummyContext(pollChannel if pollChannel else message.channel))
-                    except Exception:
-                        pass
-
-                # SERVER SHUTDOWN
-                elif "the server has shutdown" in desc and ":red_circle:" in desc:
-                    print("Detected server shutdown event!")
-                    try:
-                        await message.delete()
-                    except Exception:
-                        pass
-
-                    # Notify server_chat
-                    if serverChat:
-                        try:
-                            await serverChat.send("❌ The server has been shutdown")
-                        except Exception as e:
-                            print(f"Failed to send shutdown notice to serverChat: {e}")
-
-                    # Restore poll
-                    try:
-                        # Use the PollCog's resetpoll command via DummyContext
-                        try:
-                            await self.bot.get_cog("PollCog").resetpoll(DummyContext(pollChannel if pollChannel else message.channel))
-                        except Exception:
-                            # Fallback: directly call post_poll
-                            if pollChannel:
-                                pollmod.poll_message = await pollmod.post_poll(pollChannel)
-                    except Exception as e:
-                        print(f"Failed to reset poll on server shutdown: {e}")
+    async def close_server(self, fallback_channel):
+        """The game server went down: announce it and put up a fresh poll."""
+        pollChannel = pollmod.resolve_poll_channel()
+        await asyncio.gather(announcer.announce("server_shutdown", fallback_channel.guild if fallback_channel else None, pollChannel),
+                             self._poll_reset(pollChannel if pollChannel else fallback_channel))
+
+    async def _poll_reset(self, channel):
+        # Restore poll
+        try:
+            # Use the PollCog's resetpoll command via DummyContext
+            await self.bot.get_cog("PollCog").resetpoll(DummyContext(channel))
+        except Exception as e:
+            log.error("watcher.poll_reset_failed", f"Failed to reset poll on server shutdown: {e}", exc=e)
+
+    async def announce(self, message, rule, match):
+        """Generic action for operator-defined events: post the rule's "text" to server chat (or target_channel_id)."""
+        config = self.bot.config
+        target = self.bot.get_channel(int(rule.params.get("target_channel_id") or config.server_chat_channel_id))
+        if target is None:
+            return
+        role_mention = f"<@&{config.getnotified_role_id}>"
+        try:
+            text = rule.params.get("text", "{match}").format(match=match.group(0), role=role_mention, **match.groupdict())
+            await outbound.send(target, text, priority=outbound.CREDENTIALS)
+        except Exception as e:
+            log.error("watcher.announce_failed", f"Failed to announce {rule.name}: {e}", rule=rule.name, exc=e)
@@ -1,9 +1,8 @@
 # discord-bot/main.py
 import os
 import sys
-from dotenv import load_dotenv
-from bot_app import bot
-import os
+import discord
+from utils.config import ConfigError, init_config
 
 #TODO Fix the posted info
 #TODO Purge channel after shutdown of server
@@ -14,56 +13,108 @@ THIS_FILE = os.path.abspath(__file__)
 REPO_ROOT = os.path.dirname(THIS_FILE)
 ALT_PROJECT_DIR = os.path.join(REPO_ROOT, "discord-bot")
 
-BOT_COMMANDS_CHANNEL_ID = int(os.getenv("BOT_COMMANDS_CHANNEL_ID", "0"))
-
 if REPO_ROOT not in sys.path:
     sys.path.insert(0, REPO_ROOT)
 if os.path.isdir(ALT_PROJECT_DIR) and ALT_PROJECT_DIR not in sys.path:
     sys.path.insert(0, ALT_PROJECT_DIR)
 
-# Load local .env only for dev; Railway env vars override process env.
-load_dotenv(override=False)
+# Load the config once: process env (Railway) wins over the local .env used for dev.
+# Anything missing or invalid is reported here instead of at the first command.
+try:
+    config = init_config(os.environ.get("BOT_ENV_FILE", ".env"))
+except ConfigError as e:
+    print("❌ Invalid configuration:")
+    for problem in e.problems:
+        print(f"   - {problem}")
+    sys.exit(1)
+
+from bot_app import bot
+from utils import outbound
+from utils.storage import data_path
+from utils.notify import notifier
+from utils.log import log
 
 # on_ready: re-hook any existing poll message so buttons keep working after restarts
 @bot.event
 async def on_ready():
     import cogs.poll as pollmod
 
-    print(f"✅ Logged in as {bot.user}")
+    log.info("bot.logged_in", f"✅ Logged in as {bot.user}", user=bot.user.id, guilds=len(bot.guilds))
 
-    poll_channel_id = int(os.getenv("POLL_CHANNEL_ID", "0"))
-    if poll_channel_id == 0:
-        print("❌ POLL_CHANNEL_ID not set")
+    poll_channel_ids = pollmod.poll_channel_ids()
+    if not poll_channel_ids:
+        log.error("poll.no_channel", "❌ POLL_CHANNEL_ID not set")
+        pollmod.polls_restored.set()
         return
 
-    channel = bot.get_channel(poll_channel_id)
-    if channel is None:
-        print("❌ Poll channel not found! Check POLL_CHANNEL_ID")
-        return
+    for poll_channel_id in poll_channel_ids:
+        channel = bot.get_channel(poll_channel_id)
+        if channel is None:
+            log.error("poll.no_channel", f"❌ Poll channel {poll_channel_id} not found! Check POLL_CHANNEL_ID", poll=poll_channel_id)
+            continue
+        if pollmod.poll_for_channel(channel).message is not None:
+            # already live: restored from the shutdown snapshot, or this is a reconnect
+            continue
+        await restore_poll(channel)
+    pollmod.polls_restored.set()
+    # notifications that were still pending when the bot stopped
+    notifier.resume()
+
+    log.info("bot.ready", "✅ All cogs loaded and ready.")
 
-    # Try to find an existing poll message and re-register its view
-    try:
-        async for msg in channel.history(limit=200):
-            content = (msg.content or "").lower()
-            if msg.author == bot.user and ("click the button to vote" in content or "votes:" in content or "server running" in content):
-                pollmod.poll_message = msg
-                pollmod.poll_votes[msg.id] = set()
-                view = pollmod.PollView(message_id=msg.id)
-                bot.add_view(view, message_id=msg.id)
-                print(f"ℹ️ Found existing poll message (ID {msg.id}) and re-registered view.")
-                break
-    except Exception as e:
-        print(f"Error while scanning channel history for poll message: {e}")
-
-    print("✅ All cogs loaded and ready.")
-
-    channel = bot.get_channel(BOT_COMMANDS_CHANNEL_ID)
+    channel = bot.get_channel(bot.config.bot_commands_channel_id)
     if channel:
-        await channel.send("🤖 Bot restarted.")
-
-# Run
-TOKEN = os.getenv("DISCORD_TOKEN")
-if TOKEN is None or TOKEN == "":
-    print("❌ DISCORD_TOKEN not set - cannot start bot.")
-else:
-    bot.run(TOKEN)
+        await outbound.send(channel, "🤖 Bot restarted.")
+
+
+async def restore_poll(channel):
+    """
+    Re-hook the poll message of one channel: fetch it straight from the message index,
+    only scan channel history when the index is missing or stale.
+    """
+    import cogs.poll as pollmod
+
+    state = pollmod.poll_for_channel(channel)
+    msg = None
+    entry = pollmod.message_index.get(f"poll:{state.guild_id}:{state.channel_id}")
+    if entry:
+        try:
+            msg = await channel.fetch_message(entry["message_id"])
+            # bring back the phase the poll was left in
+            pollmod.restore_phase(state, entry.get("state"))
+        except discord.NotFound:
+            log.info("poll.index_stale", f"ℹ️ Indexed poll message {entry['message_id']} is gone, scanning history instead.",
+                     poll=channel.id, message=entry["message_id"])
+        except Exception as e:
+            log.error("poll.restore_failed", f"Error while fetching indexed poll message: {e}", poll=channel.id, exc=e)
+
+    if msg is None:
+        try:
+            async for candidate in channel.history(limit=200):
+                content = (candidate.content or "").lower()
+                if candidate.author == bot.user and ("click the button to vote" in content or "votes:" in content or "server running" in content):
+                    msg = candidate
+                    if "server running" in content:
+                        # no index to say so, but the message shows the poll was in running mode
+                        pollmod.restore_phase(state, pollmod.RUNNING)
+                    break
+        except Exception as e:
+            log.error("poll.restore_failed", f"Error while scanning channel history for poll message: {e}", poll=channel.id, exc=e)
+
+    if msg is not None:
+        state.message = msg
+        # keep the votes restored from the vote store instead of wiping them
+        pollmod.vote_store.get(msg.id)
+        if not state.running_mode:
+            view = pollmod.poll_view(state, enabled=state.phase == pollmod.OPEN)
+            if (entry is None or entry.get("custom_id") != state.custom_id) and msg.components:
+                # posted by an older version with a different button custom_id — swap the button in place
+                pollmod.poll_edits.request(msg, msg.content, view)
+        pollmod.index_poll(state)
+        log.info("poll.restored", f"ℹ️ Found existing poll message (ID {msg.id}) and re-registered view.", poll=channel.id, message=msg.id)
+
+# Run (with BOT_WORKERS, REST calls are made by worker processes started from here)
+if config.workers > 0:
+    from utils.workers import WorkerPool
+    bot.workers = WorkerPool(config.workers, data_path("workers.sock"))
+bot.run(config.discord_token)
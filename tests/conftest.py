@@ -0,0 +1,19 @@
+# discord-bot/tests/conftest.py
+import os
+import sys
+import tempfile
+
+# The bot reads its config when its modules are imported: give it a scratch data directory
+# and the few required settings before any test imports them (a developer's .env is ignored).
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.update({
+    "DISCORD_TOKEN": "test",
+    "POLL_CHANNEL_ID": "1",
+    "BOT_DATA_DIR": tempfile.mkdtemp(prefix="bot-tests-"),
+    "LOG_FORMAT": "text",
+    "LOG_LEVEL": "error",
+})
+
+from utils.config import init_config  # noqa: E402
+
+init_config(None)
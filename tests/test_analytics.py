@@ -0,0 +1,26 @@
+# discord-bot/tests/test_analytics.py
+import asyncio
+import sqlite3
+from utils.analytics import VoteAnalytics
+
+POLL = "1:2"
+
+
+def test_voter_totals_match_a_recount_after_toggles(tmp_path):
+    path = str(tmp_path / "analytics.db")
+    analytics = VoteAnalytics(path)
+    # outside an event loop every record() is written on its own; the last toggles go in one batch
+    for kind, user in [("vote", 1), ("unvote", 1), ("vote", 1), ("unvote", 1), ("vote", 2), ("vote", 3), ("unvote", 3)]:
+        analytics.record(kind, POLL, user)
+    batch = [(1.0, POLL, kind, 1, None) for kind in ("vote", "unvote") * 50] + [(2.0, POLL, "vote", 1, None)]
+    analytics._executor.submit(analytics._write, batch).result()
+    top = asyncio.run(analytics.summary(POLL))["top_voters"]
+    analytics.close()
+
+    db = sqlite3.connect(path)
+    stored = dict(db.execute("SELECT user_id, votes FROM voters WHERE poll = ?", (POLL,)).fetchall())
+    recount = dict(db.execute("SELECT user_id, sum(kind = 'vote') - sum(kind = 'unvote') FROM events"
+                              " WHERE poll = ? GROUP BY user_id", (POLL,)).fetchall())
+    db.close()
+    assert stored == recount == {1: 1, 2: 1, 3: 0}
+    assert sorted(top) == [(1, 1), (2, 1)]
@@ -0,0 +1,65 @@
+# discord-bot/tests/test_config.py
+import pytest
+from utils import config
+from utils.config import ConfigError, load_config
+from utils.log import log
+
+BASE = {"DISCORD_TOKEN": "token", "POLL_CHANNEL_ID": "1,2"}
+
+
+def problems(**environ) -> list:
+    with pytest.raises(ConfigError) as e:
+        load_config(None, {**BASE, **environ})
+    return e.value.problems
+
+
+def test_defaults_load():
+    config = load_config(None, BASE)
+    assert config.poll_channel_ids == (1, 2)
+    assert config.vote_threshold == 1
+    assert config.default_poll_schedule == "21:00-08:00"
+
+
+def test_required_settings_are_reported_together():
+    with pytest.raises(ConfigError) as e:
+        load_config(None, {})
+    assert len(e.value.problems) == 2
+
+
+@pytest.mark.parametrize("key, value", [
+    ("VOTE_THRESHOLD", "0"),
+    ("POLL_PAUSE_HOUR", "24"),
+    ("POLL_RESUME_HOUR", "-1"),
+    ("POLL_TIMEZONE", "Mars/Base"),
+    ("POLL_SCHEDULE", "21:00-25:00"),
+    ("POLL_SCHEDULE", "21:00-08:00@Bad/Zone"),
+    ("POLL_SCHEDULE_2", "nine to five"),
+    ("NOTIFY_TARGETS", "pigeon"),
+    ("NOTIFY_CONCURRENCY", "0"),
+    ("NOTIFY_MAX_ATTEMPTS", "0"),
+    ("ANNOUNCE_CONCURRENCY", "-2"),
+    ("LOG_QUEUE_SIZE", "0"),
+    ("BOT_WORKERS", "-1"),
+    ("BOT_PROFILE", "tiny"),
+])
+def test_bad_values_are_reported_at_load(key, value):
+    [problem] = problems(**{key: value})
+    assert problem.startswith(f"{key}=")
+
+
+def test_per_poll_schedules_and_unknown_keys():
+    config = load_config(None, {**BASE, "POLL_SCHEDULE_2": "13:00-14:00@UTC", "POLL_SHEDULE": "typo"})
+    assert config.schedule_for(2) == "13:00-14:00@UTC"
+    assert config.schedule_for(1) == config.default_poll_schedule
+    assert "POLL_SHEDULE is not a known setting (typo?)" in config.warnings
+
+
+def test_failing_reload_listener_is_logged(monkeypatch):
+    def broken(old, new):
+        raise KeyError("boom")
+
+    calls = []
+    monkeypatch.setattr(config, "_reload_listeners", [broken, lambda old, new: calls.append("next")])
+    monkeypatch.setattr(log, "error", lambda event, message, **fields: calls.append(event))
+    config.reload_config()
+    assert calls == ["config.reload_listener_failed", "next"]
@@ -0,0 +1,77 @@
+# discord-bot/tests/test_edits.py
+import asyncio
+from utils.edits import EditCoalescer
+
+
+class Message:
+    def __init__(self, message_id: int = 1, fail: bool = False):
+        self.id = message_id
+        self.channel = self
+        self.fail = fail
+        self.edits = []
+
+    async def edit(self, content=None, view=None):
+        if self.fail:
+            raise RuntimeError("gone")
+        self.edits.append(content)
+
+
+def test_burst_is_one_edit_with_the_newest_content():
+    async def scenario():
+        edits = EditCoalescer(interval=0.05)
+        message = Message()
+        for votes in range(10):
+            edits.request(message, f"votes {votes}")
+        await edits.flush()
+        return message.edits
+
+    assert asyncio.run(scenario()) == ["votes 9"]
+
+
+def test_edits_are_spaced_by_the_interval():
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        edits = EditCoalescer(interval=0.1)
+        message = Message()
+        start = loop.time()
+        await edits.edit(message, "a")
+        edits.request(message, "b")
+        edits.request(message, "c")
+        await edits.flush()
+        return message.edits, loop.time() - start
+
+    written, took = asyncio.run(scenario())
+    assert written == ["a", "c"]
+    assert took >= 0.09
+
+
+def test_unchanged_state_is_skipped():
+    async def scenario():
+        edits = EditCoalescer(interval=0)
+        message = Message()
+        await edits.edit(message, "same")
+        await edits.edit(message, "same")
+        return message.edits, edits.edits_skipped
+
+    assert asyncio.run(scenario()) == (["same"], 1)
+
+
+def test_failed_edit_is_reported():
+    async def scenario():
+        edits = EditCoalescer(interval=0)
+        return await edits.edit(Message(fail=True), "x")
+
+    assert asyncio.run(scenario()) is False
+
+
+def test_forgotten_message_is_not_written():
+    async def scenario():
+        edits = EditCoalescer(interval=0.05)
+        message = Message()
+        await edits.edit(message, "a")
+        edits.request(message, "b")
+        edits.forget(message.id)
+        await edits.flush()
+        return message.edits
+
+    assert asyncio.run(scenario()) == ["a"]
@@ -0,0 +1,101 @@
+# discord-bot/tests/test_outbound.py
+import time
+import asyncio
+import pytest
+from utils.outbound import Bucket, OutboundQueue, NOTIFY, CREDENTIALS, POLL, CLEANUP
+
+
+def recorder(order: list, name: str, delay: float = 0.0):
+    async def call():
+        if delay:
+            await asyncio.sleep(delay)
+        order.append(name)
+        return name
+    return call
+
+
+def test_most_urgent_priority_goes_first():
+    async def scenario():
+        queue = OutboundQueue(max_in_flight=1, default_limit=100)
+        order = []
+        first = queue.submit("a", POLL, recorder(order, "busy", 0.05))
+        await asyncio.sleep(0.01)  # "busy" holds the only slot while the rest queue up
+        rest = [queue.submit("a", CLEANUP, recorder(order, "cleanup")),
+                queue.submit("a", POLL, recorder(order, "poll")),
+                queue.submit("a", CREDENTIALS, recorder(order, "credentials")),
+                queue.submit("a", NOTIFY, recorder(order, "notify"))]
+        await asyncio.gather(first, *rest)
+        return order
+
+    assert asyncio.run(scenario()) == ["busy", "notify", "credentials", "poll", "cleanup"]
+
+
+def test_full_bucket_waits_without_blocking_other_routes():
+    async def scenario():
+        queue = OutboundQueue(default_limit=2, default_per=0.2)
+        order = []
+        start = time.monotonic()
+        calls = [queue.submit("busy", POLL, recorder(order, f"busy{i}")) for i in range(3)]
+        calls.append(queue.submit("quiet", CLEANUP, recorder(order, "quiet")))
+        await asyncio.gather(*calls)
+        return order, time.monotonic() - start
+
+    order, took = asyncio.run(scenario())
+    # the third call on "busy" waits for its bucket; "quiet" (even at a lower priority) does not
+    assert order.index("quiet") < order.index("busy2")
+    assert took >= 0.18
+
+
+def test_same_key_supersedes_the_queued_action():
+    async def scenario():
+        queue = OutboundQueue(max_in_flight=1, default_limit=100)
+        order = []
+        busy = queue.submit("a", POLL, recorder(order, "busy", 0.05))
+        await asyncio.sleep(0.01)
+        old = queue.submit("a", POLL, recorder(order, "old"), key=("edit", 1))
+        new = queue.submit("a", POLL, recorder(order, "new"), key=("edit", 1))
+        return await asyncio.gather(busy, old, new), order, queue.superseded
+
+    results, order, superseded = asyncio.run(scenario())
+    assert results == ["busy", None, "new"]
+    assert order == ["busy", "new"] and superseded == 1
+
+
+def test_errors_reach_the_caller():
+    async def scenario():
+        queue = OutboundQueue()
+
+        async def boom():
+            raise ValueError("nope")
+
+        with pytest.raises(ValueError):
+            await queue.call("a", POLL, boom)
+        return queue.failed[POLL]
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_clear_cancels_what_is_queued():
+    async def scenario():
+        queue = OutboundQueue(max_in_flight=1, default_limit=100)
+        busy = queue.submit("a", POLL, recorder([], "busy", 0.05))
+        await asyncio.sleep(0.01)
+        queued = [queue.submit("a", CLEANUP, recorder([], "x")) for _ in range(3)]
+        dropped = queue.clear()
+        await busy
+        await queue.drain()
+        return dropped, [f.cancelled() for f in queued]
+
+    assert asyncio.run(scenario()) == (3, [True, True, True])
+
+
+def test_bucket_adopts_discords_headers():
+    bucket = Bucket(limit=5, per=5.0, now=0.0)
+    bucket.update({"X-RateLimit-Limit": "10", "X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": "2.5"}, now=1.0)
+    assert (bucket.limit, bucket.remaining) == (10, 0)
+    assert bucket.wait_time(2.0) == pytest.approx(1.5)
+    assert bucket.wait_time(3.5) == 0.0
+
+    bucket = Bucket(limit=5, per=5.0, now=0.0)
+    bucket.update({"Retry-After": "3"}, now=1.0)
+    assert bucket.wait_time(1.0) == pytest.approx(3.0)
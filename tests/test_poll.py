@@ -0,0 +1,111 @@
+# discord-bot/tests/test_poll.py
+import asyncio
+import pytest
+import cogs.poll as pollmod
+from bench.fakes import FakeChannel, FakeGuild, FakeHTTP
+from utils import tracked
+from utils.outbound import OutboundQueue
+from utils.tracked import SentRegistry
+
+
+@pytest.fixture
+def state():
+    return pollmod.PollState(1, 2)
+
+
+def test_failed_reset_leaves_the_resetting_phase(state, monkeypatch):
+    purges = []
+
+    async def purge(channel):
+        purges.append(channel)
+        if len(purges) == 1:
+            raise RuntimeError("sent.json is broken")
+        return 0, 0
+
+    async def post_poll(channel):
+        assert state.phase == pollmod.RESETTING
+        return "poll message"
+
+    monkeypatch.setattr(pollmod, "purge_bot_messages", purge)
+    monkeypatch.setattr(pollmod, "post_poll", post_poll)
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await state.actor.ask("reset", "channel")
+        phase_after_failure = state.phase
+        answer = pollmod.refusal(state)
+        result = await state.actor.ask("reset", "channel")
+        await state.actor.close()
+        return phase_after_failure, answer, result
+
+    phase_after_failure, answer, result = asyncio.run(scenario())
+    assert phase_after_failure == pollmod.OPEN
+    assert answer != "The poll is being reset, vote again in a moment."
+    assert result == "poll message"
+    assert state.phase == pollmod.OPEN
+
+
+@pytest.mark.parametrize("command", ["reset", "running", "pause"])
+def test_commands_still_apply_while_resetting(command):
+    phases, _ = pollmod.TRANSITIONS[command]
+    assert pollmod.RESETTING in phases
+
+
+@pytest.fixture
+def purge_setup(tmp_path, monkeypatch):
+    registry = SentRegistry(str(tmp_path / "sent.json"))
+    monkeypatch.setattr(pollmod, "sent_messages", registry)
+    monkeypatch.setattr(tracked, "outbound", OutboundQueue(default_limit=100))
+    channel = FakeChannel(2, FakeGuild(1), FakeHTTP())
+    state = pollmod.PollState(1, 2)
+    monkeypatch.setitem(pollmod.polls, state.key, state)
+    return registry, channel, state
+
+
+def test_purge_keeps_a_poll_message_it_did_not_delete(purge_setup):
+    registry, channel, state = purge_setup
+
+    async def scenario():
+        # restored from the snapshot, or evicted from sent.json: never tracked
+        state.message = await channel.send("poll")
+        for text in ("reply", "notice"):
+            registry.track(await channel.send(text))
+        return await pollmod.purge_bot_messages(channel)
+
+    assert asyncio.run(scenario()) == (2, 1)
+    assert state.message is not None and not state.message.deleted
+
+
+def test_purge_forgets_a_deleted_poll_message(purge_setup):
+    registry, channel, state = purge_setup
+
+    async def scenario():
+        state.message = await channel.send("poll")
+        registry.track(state.message)
+        registry.track(await channel.send("reply"))
+        await pollmod.purge_bot_messages(channel)
+
+    asyncio.run(scenario())
+    assert state.message is None
+
+
+def test_replacing_pause_forgets_the_old_poll_message(purge_setup, monkeypatch):
+    registry, channel, state = purge_setup
+
+    async def send(channel, text, **kwargs):
+        return await channel.send(text)
+
+    monkeypatch.setattr(pollmod.outbound, "send", send)
+
+    async def scenario():
+        state.message = old = await channel.send("poll")
+        pollmod.vote_store.add(old.id, 7)
+        pollmod.poll_edits._written[old.id] = ("Votes: 1", None)
+        await pollmod.pause(state, channel, "paused", replace=True)
+        return old
+
+    old = asyncio.run(scenario())
+    assert state.phase == pollmod.PAUSED
+    assert state.message is None
+    assert old.id not in pollmod.vote_store.votes
+    assert old.id not in pollmod.poll_edits._written
@@ -0,0 +1,71 @@
+# discord-bot/tests/test_rolesync.py
+import asyncio
+from types import SimpleNamespace
+import discord
+import pytest
+from bench.fakes import FakeGuild, FakeRole, FakeUser
+from utils import rolesync
+from utils.outbound import OutboundQueue
+from utils.rolesync import RoleWorker, failure_reason
+
+
+@pytest.fixture(autouse=True)
+def fresh_queue(monkeypatch):
+    # every test runs its own event loop; the bot-wide queue belongs to none of them
+    monkeypatch.setattr(rolesync, "outbound", OutboundQueue(default_limit=100))
+
+
+def member_of(guild: FakeGuild, user_id: int = 10) -> FakeUser:
+    member = FakeUser(user_id, "someone", guild=guild)
+    guild.members[user_id] = member
+    return member
+
+
+def test_request_resolves_after_the_edit():
+    async def scenario():
+        guild = FakeGuild(1)
+        member = member_of(guild)
+        worker = RoleWorker(debounce=0.01)
+        applied = worker.request(member, 5, True)
+        assert not applied.done()
+        return await applied, member.roles, worker.stats()
+
+    error, roles, stats = asyncio.run(scenario())
+    assert error is None
+    assert roles == [FakeRole(5)]
+    assert stats["edits_sent"] == 1
+
+
+def test_merged_clicks_share_one_edit_and_its_outcome():
+    async def scenario():
+        guild = FakeGuild(1)
+        member = member_of(guild)
+        worker = RoleWorker(debounce=0.01)
+        first = worker.request(member, 5, True)
+        wanted, second = worker.toggle(member, 5)
+        return wanted, await asyncio.gather(first, second), member.roles, worker.stats()
+
+    wanted, errors, roles, stats = asyncio.run(scenario())
+    assert wanted is False
+    assert errors == [None, None]
+    assert roles == []
+    assert stats["edits_sent"] == 0 and stats["edits_skipped"] == 1
+
+
+def test_refused_edit_resolves_to_the_error():
+    forbidden = discord.Forbidden(SimpleNamespace(status=403, reason="Forbidden"), "Missing Permissions")
+
+    async def refuse(**kwargs):
+        raise forbidden
+
+    async def scenario():
+        guild = FakeGuild(1)
+        member = member_of(guild)
+        member.edit = refuse
+        worker = RoleWorker(debounce=0.01)
+        return await worker.request(member, 5, True), worker.stats()
+
+    error, stats = asyncio.run(scenario())
+    assert error is forbidden
+    assert stats["edits_failed"] == 1
+    assert "not allowed" in failure_reason(error)
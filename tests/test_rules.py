@@ -0,0 +1,85 @@
+# discord-bot/tests/test_rules.py
+import json
+import time
+from types import SimpleNamespace
+import discord
+from utils.rules import Rule, RuleEngine
+
+CHANNEL = 42
+BOT = SimpleNamespace(id=1, bot=True)
+HUMAN = SimpleNamespace(id=2, bot=False)
+
+
+def message(description: str = "", content: str = "", author=BOT, channel_id: int = CHANNEL):
+    embeds = [discord.Embed(description=description)] if description else []
+    return SimpleNamespace(content=content, author=author, embeds=embeds, channel=SimpleNamespace(id=channel_id))
+
+
+def engine(*specs) -> RuleEngine:
+    return RuleEngine([Rule.compile(spec, CHANNEL) for spec in specs])
+
+
+OPENED = {"name": "opened", "contains": ["the server has opened", ":green_circle:"], "action": "server_open"}
+
+
+def test_contains_needs_every_part_in_any_order_and_case():
+    rules = engine(OPENED)
+    assert [r.name for r, _, _ in rules.evaluate(message(":green_circle: The Server Has OPENED"))] == ["opened"]
+    assert rules.evaluate(message("the server has opened")) == []
+
+
+def test_contains_is_linear_on_long_text_that_does_not_match():
+    rules = engine(OPENED)
+    text = "x" * 50_000 + " the server has opened"
+    start = time.perf_counter()
+    for _ in range(10):
+        assert rules.evaluate(message(text)) == []
+    assert time.perf_counter() - start < 0.1
+
+
+def test_pattern_groups_and_author_filter():
+    rules = engine({"name": "joined", "author": "any", "pattern": r"(?P<player>\w+) joined the (game|server)", "action": "announce"},
+                   {"name": "bots_only", "pattern": "crashed", "action": "announce"})
+    [(rule, _, match)] = rules.evaluate(message("Steve joined the game", author=HUMAN))
+    assert rule.name == "joined" and match.group("player") == "Steve"
+    assert rules.evaluate(message("server crashed", author=HUMAN)) == []
+
+
+def test_author_can_be_a_user_id():
+    rules = engine({"name": "from_steve", "author": "2", "pattern": "hello", "action": "announce"})
+    assert [r.name for r, _, _ in rules.evaluate(message("hello", author=HUMAN))] == ["from_steve"]
+    assert rules.evaluate(message("hello", author=BOT)) == []
+
+
+def test_content_rules_and_channel_index():
+    rules = engine({"name": "chat", "field": "content", "pattern": "^!start", "action": "announce"})
+    assert len(rules.evaluate(message(content="!start please"))) == 1
+    assert rules.evaluate(message(content="!start please", channel_id=7)) == []
+
+
+def test_one_rule_per_embed():
+    rules = engine({"name": "first", "pattern": "server", "action": "a"}, {"name": "second", "pattern": "server", "action": "b"})
+    assert [r.name for r, _, _ in rules.evaluate(message("server"))] == ["first"]
+
+
+def test_bad_rules_are_skipped_not_fatal(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps([
+        {"name": "no_action", "pattern": "x"},
+        {"name": "bad_regex", "pattern": "(", "action": "announce"},
+        {"name": "bad_contains", "contains": "not a list", "action": "announce"},
+        {"name": "bad_author", "author": "somebody", "pattern": "x", "action": "announce"},
+        {"name": "bad_field", "field": "body", "pattern": "x", "action": "announce"},
+        {"pattern": "nameless", "action": "announce"},
+        {"name": "opened", "pattern": "replaced", "action": "announce"},
+        {"name": "good", "pattern": "fine", "action": "announce"},
+    ]))
+    rules = RuleEngine.load([OPENED], str(path), CHANNEL)
+    assert sorted(r.name for r in rules.rules) == ["good", "opened"]
+    assert next(r for r in rules.rules if r.name == "opened").pattern.pattern == "replaced"
+
+
+def test_rules_file_that_is_not_a_list_is_ignored(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"name": "oops"}))
+    assert [r.name for r in RuleEngine.load([OPENED], str(path), CHANNEL).rules] == ["opened"]
@@ -0,0 +1,59 @@
+# discord-bot/tests/test_schedule.py
+from datetime import datetime
+from zoneinfo import ZoneInfo
+import pytest
+from utils.schedule import PollSchedule, PAUSED, OPEN
+
+BERLIN = ZoneInfo("Europe/Berlin")
+
+
+def at(hour: int, minute: int = 0, day: int = 10, month: int = 6) -> datetime:
+    return datetime(2026, month, day, hour, minute, tzinfo=BERLIN)
+
+
+def test_parse_windows_and_time_zone():
+    schedule = PollSchedule.parse("21:00-08:00, 13:00-13:30@Europe/Berlin")
+    assert schedule.windows == [(21 * 60, 8 * 60), (13 * 60, 13 * 60 + 30)]
+    assert schedule.tz.key == "Europe/Berlin"
+    assert schedule.describe() == "21:00-08:00, 13:00-13:30 (Europe/Berlin)"
+
+
+def test_parse_uses_the_default_time_zone_and_allows_never():
+    schedule = PollSchedule.parse("", default_tz="UTC")
+    assert schedule.windows == [] and schedule.tz.key == "UTC"
+    assert schedule.next_transition(at(12)) is None
+
+
+@pytest.mark.parametrize("text", ["25:00-08:00", "21:00-8:60", "nine-ten", "21:00-08:00@Mars/Base"])
+def test_parse_rejects_bad_schedules(text):
+    with pytest.raises(Exception):
+        PollSchedule.parse(text)
+
+
+def test_phase_of_a_window_past_midnight():
+    schedule = PollSchedule.parse("21:00-08:00@Europe/Berlin")
+    assert schedule.phase_at(at(20, 59)) == OPEN
+    assert schedule.phase_at(at(21)) == PAUSED
+    assert schedule.phase_at(at(3)) == PAUSED
+    assert schedule.phase_at(at(8)) == OPEN
+
+
+def test_phase_is_read_in_the_schedule_time_zone():
+    schedule = PollSchedule.parse("21:00-08:00@Europe/Berlin")
+    # 20:30 UTC is 22:30 in Berlin in summer
+    assert schedule.phase_at(datetime(2026, 6, 10, 20, 30, tzinfo=ZoneInfo("UTC"))) == PAUSED
+
+
+def test_next_transition():
+    schedule = PollSchedule.parse("21:00-08:00,13:00-13:30@Europe/Berlin")
+    assert schedule.next_transition(at(12)) == (at(13), PAUSED)
+    assert schedule.next_transition(at(13, 10)) == (at(13, 30), OPEN)
+    assert schedule.next_transition(at(22)) == (at(8, day=11), OPEN)
+
+
+def test_next_transition_across_a_dst_change():
+    # clocks go back on 25 October 2026 in Berlin: that night is an hour longer
+    schedule = PollSchedule.parse("21:00-08:00@Europe/Berlin")
+    when, phase = schedule.next_transition(at(22, month=10, day=24))
+    assert (when, phase) == (at(8, month=10, day=25), OPEN)
+    assert when.timestamp() - at(22, month=10, day=24).timestamp() == 11 * 3600
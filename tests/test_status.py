@@ -0,0 +1,123 @@
+# discord-bot/tests/test_status.py
+import asyncio
+from types import SimpleNamespace
+import pytest
+import cogs.poll as pollmod
+import cogs.watcher as watchermod
+from cogs.status import StatusCog
+from cogs.watcher import WatcherCog
+
+UP = SimpleNamespace(online=True, edition="java", players=0, max_players=20, latency_ms=1.0)
+DOWN = SimpleNamespace(online=False, error="timed out")
+
+
+class FakePoll:
+    def __init__(self):
+        self.phase = pollmod.OPEN
+
+    running_mode = pollmod.PollState.running_mode
+    paused = pollmod.PollState.paused
+
+
+class FakeWatcher:
+    def __init__(self):
+        self.calls = []
+
+    async def open_server(self, guild, channel):
+        self.calls.append("open")
+
+    async def close_server(self, channel):
+        self.calls.append("close")
+
+
+@pytest.fixture
+def setup(monkeypatch):
+    channel = SimpleNamespace(id=1, guild=SimpleNamespace(id=2))
+    state = FakePoll()
+    watcher = FakeWatcher()
+    monkeypatch.setattr(pollmod, "resolve_poll_channel", lambda: channel)
+    monkeypatch.setattr(pollmod, "poll_for_channel", lambda _: state)
+    cog = StatusCog.__new__(StatusCog)
+    cog.bot = SimpleNamespace(get_cog=lambda name: watcher)
+    cog.failures = 0
+    cog.seen_online = False
+    return cog, state, watcher
+
+
+def probe(cog, *statuses):
+    async def scenario():
+        for status in statuses:
+            await cog.reconcile(status)
+    asyncio.run(scenario())
+
+
+def test_opens_once_when_the_server_comes_up(setup):
+    cog, state, watcher = setup
+    probe(cog, UP)
+    assert watcher.calls == ["open"]
+    # an admin resets the poll while the server keeps running: nothing to redo
+    state.phase = pollmod.OPEN
+    probe(cog, UP, UP)
+    assert watcher.calls == ["open"]
+
+
+def test_pause_is_left_alone(setup):
+    cog, state, watcher = setup
+    state.phase = pollmod.PAUSED
+    probe(cog, UP, UP)
+    assert watcher.calls == []
+
+
+def test_closes_after_repeated_failures_then_reopens(setup):
+    cog, state, watcher = setup
+    probe(cog, UP)
+    state.phase = pollmod.RUNNING
+    probe(cog, DOWN)
+    assert watcher.calls == ["open"]  # one lost packet isn't a shutdown
+    probe(cog, DOWN)
+    assert watcher.calls == ["open", "close"]
+    state.phase = pollmod.OPEN
+    probe(cog, UP)
+    assert watcher.calls == ["open", "close", "open"]
+
+
+def test_down_while_not_running_still_counts_as_a_transition(setup):
+    cog, state, watcher = setup
+    state.phase = pollmod.PAUSED
+    probe(cog, UP, DOWN, DOWN)
+    state.phase = pollmod.OPEN
+    probe(cog, UP)
+    assert watcher.calls == ["open"]
+
+
+def test_status_bot_after_the_probe_announces_nothing(monkeypatch):
+    channel = SimpleNamespace(id=1, guild=SimpleNamespace(id=2))
+    state = pollmod.PollState(2, 1)
+    state.message = SimpleNamespace(id=3)
+    announced = []
+
+    async def announce(event, guild, poll_channel):
+        announced.append(event)
+        return {}
+
+    monkeypatch.setattr(pollmod, "resolve_poll_channel", lambda *a: channel)
+    monkeypatch.setattr(pollmod, "poll_for_channel", lambda _: state)
+    monkeypatch.setattr(pollmod, "poll_edits", SimpleNamespace(request=lambda *a: None))
+    monkeypatch.setattr(watchermod.announcer, "announce", announce)
+    watcher = WatcherCog.__new__(WatcherCog)
+    watcher.bot = SimpleNamespace(config=SimpleNamespace(server_chat_channel_id=5),
+                                  get_channel=lambda _: SimpleNamespace(mention="#server-chat"))
+    cog = StatusCog.__new__(StatusCog)
+    cog.bot = SimpleNamespace(get_cog=lambda name: watcher)
+    cog.failures = 0
+    cog.seen_online = False
+
+    async def scenario():
+        await cog.reconcile(UP)
+        # the status bot's "server has opened" embed arrives later, through the rule path
+        await watcher.server_open(SimpleNamespace(guild=channel.guild, channel=channel), None, None)
+        await state.actor.close()
+
+    asyncio.run(scenario())
+    assert announced == ["server_open"]
+    assert state.phase == pollmod.RUNNING
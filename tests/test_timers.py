@@ -0,0 +1,94 @@
+# discord-bot/tests/test_timers.py
+import asyncio
+import pytest
+from utils.timers import TimerService, VirtualClock
+
+
+def virtual() -> TimerService:
+    return TimerService(VirtualClock(start=0))
+
+
+def test_timers_fire_in_deadline_order_at_their_deadline():
+    async def scenario():
+        timers = virtual()
+        fired = []
+        timers.schedule("b", 20, lambda: fired.append(("b", timers.clock.monotonic())))
+        timers.schedule("a", 10, lambda: fired.append(("a", timers.clock.monotonic())))
+        count = await timers.advance(30)
+        return fired, count, timers.clock.monotonic()
+
+    assert asyncio.run(scenario()) == ([("a", 10), ("b", 20)], 2, 30)
+
+
+def test_same_key_replaces_and_cancel_removes():
+    async def scenario():
+        timers = virtual()
+        fired = []
+        timers.schedule("cooldown", 10, fired.append, "old")
+        timers.schedule("cooldown", 5, fired.append, "new")
+        timers.schedule("pause", 5, fired.append, "pause")
+        assert timers.cancel("pause")
+        assert not timers.cancel("pause")
+        await timers.advance(60)
+        return fired, timers.pending()
+
+    assert asyncio.run(scenario()) == (["new"], 0)
+
+
+def test_remaining_and_reschedule():
+    async def scenario():
+        timers = virtual()
+        timers.schedule("t", 10, lambda: None)
+        await timers.advance(4)
+        before = timers.remaining("t")
+        assert timers.reschedule("t", 30)
+        assert not timers.reschedule("missing", 1)
+        return before, timers.remaining("t"), timers.remaining("missing")
+
+    assert asyncio.run(scenario()) == (6, 30, None)
+
+
+def test_async_callbacks_are_awaited_and_can_schedule_more():
+    async def scenario():
+        timers = virtual()
+        fired = []
+
+        async def tick(n):
+            fired.append((n, timers.clock.monotonic()))
+            if n < 3:
+                timers.schedule("tick", 10, tick, n + 1)
+
+        timers.schedule("tick", 10, tick, 1)
+        await timers.advance(100)
+        return fired
+
+    assert asyncio.run(scenario()) == [(1, 10), (2, 20), (3, 30)]
+
+
+def test_cancelled_timers_do_not_pile_up():
+    timers = virtual()
+    for i in range(1000):
+        timers.schedule("t", 10, lambda: None)
+    assert timers.pending() == 1
+    assert len(timers._heap) < 200
+
+
+def test_advance_needs_a_virtual_clock():
+    with pytest.raises(RuntimeError):
+        asyncio.run(TimerService().advance(1))
+
+
+def test_real_time_runner_fires_and_survives_a_failing_callback():
+    async def scenario():
+        timers = TimerService()
+        fired = asyncio.Event()
+
+        def boom():
+            raise ValueError("boom")
+
+        timers.schedule("bad", 0.01, boom)
+        timers.schedule("good", 0.02, fired.set)
+        await asyncio.wait_for(fired.wait(), 1)
+        return timers.pending()
+
+    assert asyncio.run(scenario()) == 0
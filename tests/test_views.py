@@ -0,0 +1,39 @@
+# discord-bot/tests/test_views.py
+import asyncio
+from types import SimpleNamespace
+import discord
+from utils.metrics import INTERACTION_ACK_SECONDS
+from utils.views import TimedView, component_label
+
+
+def test_component_label_is_the_custom_id_prefix():
+    assert component_label("poll:vote:1:2") == "poll:vote"
+    assert component_label("roles:toggle:42") == "roles:toggle"
+    assert component_label("") == "unknown"
+
+
+def test_timed_view_records_every_callback_even_failing_ones():
+    class Menu(TimedView):
+        async def on_error(self, interaction, error, item):
+            pass
+
+    async def ok(interaction):
+        await asyncio.sleep(0.01)
+
+    async def boom(interaction):
+        raise RuntimeError("handler failed")
+
+    async def scenario():
+        view = Menu(timeout=None)
+        for custom_id, callback in (("test:ok:1", ok), ("test:boom:1", boom)):
+            button = discord.ui.Button(custom_id=custom_id)
+            button.callback = callback
+            view.add_item(button)
+            interaction = SimpleNamespace(data={"custom_id": custom_id, "component_type": 2})
+            await view._scheduled_task(button, interaction)
+
+    before = INTERACTION_ACK_SECONDS.count("test:ok"), INTERACTION_ACK_SECONDS.count("test:boom")
+    asyncio.run(scenario())
+    assert INTERACTION_ACK_SECONDS.count("test:ok") == before[0] + 1
+    assert INTERACTION_ACK_SECONDS.count("test:boom") == before[1] + 1
+    assert INTERACTION_ACK_SECONDS.quantile(0.5, "test:ok") >= 0.005
@@ -0,0 +1,78 @@
+# discord-bot/tests/test_votestore.py
+import time
+import asyncio
+import threading
+from utils.votestore import VoteStore
+
+
+def reloaded(directory) -> VoteStore:
+    store = VoteStore(str(directory))
+    store.load()
+    return store
+
+
+def test_log_is_replayed_over_the_snapshot(tmp_path):
+    store = VoteStore(str(tmp_path), compact_every=3)
+    store.add(1, 10)
+    store.add(1, 11)
+    store.add(2, 20)  # third entry: compacted into the snapshot
+    store.remove(1, 10)
+    store.reset(2)
+    store.add(3, 30)
+    store.drop(3)
+
+    assert reloaded(tmp_path).votes == {1: {11}, 2: set()}
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    store = VoteStore(str(tmp_path))
+    store.add(1, 10)
+    with open(store.log_path, "a", encoding="utf-8") as f:
+        f.write('{"op":"add","m":1,')
+
+    assert reloaded(tmp_path).votes == {1: {10}}
+
+
+def test_failed_snapshot_keeps_the_votes(tmp_path):
+    async def scenario():
+        store = VoteStore(str(tmp_path), flush_interval=0.01, compact_every=2)
+        write_snapshot = store._write_snapshot
+        failures = []
+
+        def flaky(snapshot):
+            if not failures:
+                failures.append(snapshot)
+                raise OSError("disk full")
+            write_snapshot(snapshot)
+
+        store._write_snapshot = flaky
+        store.add(1, 10)
+        store.add(1, 11)
+        await asyncio.sleep(0.1)
+        store.flush_now()
+        return failures
+
+    assert asyncio.run(scenario())
+    assert reloaded(tmp_path).votes == {1: {10, 11}}
+
+
+def test_flush_now_waits_for_the_write_in_flight(tmp_path):
+    async def scenario():
+        store = VoteStore(str(tmp_path), flush_interval=0.01)
+        append_lines = store._append_lines
+
+        def slow(lines):
+            # only the background write is slow; flush_now() writes on this thread
+            if threading.current_thread() is not threading.main_thread():
+                time.sleep(0.2)
+            append_lines(lines)
+
+        store._append_lines = slow
+        store.add(1, 10)
+        await asyncio.sleep(0.05)  # the add is now being written
+        store.remove(1, 10)
+        store.flush_now()
+
+    asyncio.run(scenario())
+    # the remove must land after the add, not before it
+    assert reloaded(tmp_path).votes == {1: set()}
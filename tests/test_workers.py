@@ -0,0 +1,69 @@
+# discord-bot/tests/test_workers.py
+import asyncio
+import discord
+import pytest
+from utils.outbound import Action, POLL
+from utils.workers import WorkerBackend, WorkerGone, http_error
+
+
+@pytest.mark.parametrize("status, cls", [
+    (403, discord.Forbidden),
+    (404, discord.NotFound),
+    (500, discord.DiscordServerError),
+    (503, discord.DiscordServerError),
+    (400, discord.HTTPException),
+])
+def test_http_error_rebuilds_the_exception(status, cls):
+    e = http_error({"status": status, "reason": "nope", "code": 50013, "text": "Missing Permissions",
+                    "headers": {"X-RateLimit-Remaining": "0"}})
+    assert type(e) is cls
+    assert e.status == status
+    assert e.code == 50013
+    assert e.text == "Missing Permissions"
+    assert e.ratelimit_headers == {"X-RateLimit-Remaining": "0"}
+
+
+def test_http_error_without_status_is_a_runtime_error():
+    e = http_error({"status": None, "message": "ValueError: unknown job 'x'"})
+    assert isinstance(e, RuntimeError)
+    assert str(e) == "ValueError: unknown job 'x'"
+
+
+class GonePool:
+    connected = 1
+
+    def __init__(self, error: WorkerGone):
+        self.error = error
+
+    async def run(self, job):
+        raise self.error
+
+
+def perform(error: WorkerGone, job: tuple):
+    """Run one action through a WorkerBackend whose worker fails with error; returns (result, in-process calls)."""
+    calls = []
+
+    async def factory():
+        calls.append(job[0])
+        return "here"
+
+    async def scenario():
+        action = Action(POLL, "channel:1", None, factory, asyncio.get_running_loop().create_future(), 0.0, job)
+        result, _ = await WorkerBackend(GonePool(error)).perform(action)
+        return result
+
+    return asyncio.run(scenario()), calls
+
+
+@pytest.mark.parametrize("job", [("edit", 1, 2, {}), ("delete", 1, 2), ("bulk_delete", 1, [2, 3])])
+def test_idempotent_jobs_are_made_again_here(job):
+    assert perform(WorkerGone("died", maybe_made=True), job) == ("here", [job[0]])
+
+
+def test_send_is_not_repeated_after_the_worker_died():
+    with pytest.raises(WorkerGone):
+        perform(WorkerGone("died", maybe_made=True), ("send", 1, {"content": "hi"}))
+
+
+def test_send_falls_back_when_no_worker_got_it():
+    assert perform(WorkerGone("no worker connected"), ("send", 1, {"content": "hi"})) == ("here", ["send"])
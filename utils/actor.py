@@ -0,0 +1,84 @@
+# discord-bot/utils/actor.py
+import asyncio
+from typing import Any, Awaitable, Callable, List, Tuple
+from utils.log import log
+
+
+class Actor:
+    """
+    One task that owns some state and changes it one command at a time, in the order the
+    commands arrived. Nothing else writes that state, so a command never sees it change
+    halfway through, however many awaits it contains.
+
+    Commands named in `batched` (like vote clicks) are handed over together: every such
+    command waiting back to back in the queue goes to the handler in one call.
+
+    handler(command, [args, ...]) is awaited for each command (or batch) and returns a
+    list with one result per item; ask() returns the one for its command.
+    """
+
+    def __init__(self, name: str, handler: Callable[[str, List[Tuple]], Awaitable[Any]],
+                 batched: Tuple[str, ...] = (), max_batch: int = 500):
+        self.name = name
+        self.handler = handler
+        self.batched = frozenset(batched)
+        self.max_batch = max_batch
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self._held: Tuple | None = None
+
+    def tell(self, command: str, *args):
+        """Queue a command without waiting for it."""
+        self._put(command, args, None)
+
+    async def ask(self, command: str, *args):
+        """Queue a command and wait until it ran. Never call this from inside the handler (it would wait for itself)."""
+        future = asyncio.get_running_loop().create_future()
+        self._put(command, args, future)
+        return await future
+
+    def _put(self, command: str, args: Tuple, future: asyncio.Future | None):
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.get_running_loop().create_task(self._run(), name=f"actor:{self.name}")
+        self._queue.put_nowait((command, args, future))
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def close(self):
+        """Stop the task; commands still queued are dropped."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._held = None
+
+    async def _run(self):
+        while True:
+            command, args, future = self._held or await self._queue.get()
+            self._held = None
+            items = [(args, future)]
+            if command in self.batched:
+                while len(items) < self.max_batch and not self._queue.empty():
+                    nxt = self._queue.get_nowait()
+                    if nxt[0] != command:
+                        # a different command ends the batch; it runs next, in order
+                        self._held = nxt
+                        break
+                    items.append((nxt[1], nxt[2]))
+            try:
+                results = await self.handler(command, [a for a, _ in items])
+            except Exception as e:
+                log.error("actor.failed", f"❌ {self.name}: {command} failed: {e}", actor=self.name, command=command, exc=e)
+                for _, f in items:
+                    if f is not None and not f.done():
+                        f.set_exception(e)
+                continue
+            for (_, f), result in zip(items, results):
+                if f is not None and not f.done():
+                    f.set_result(result)
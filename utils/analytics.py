@@ -0,0 +1,227 @@
+# discord-bot/utils/analytics.py
+import time
+import sqlite3
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Tuple
+from zoneinfo import ZoneInfo
+from utils.log import log
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (at REAL NOT NULL, poll TEXT NOT NULL, kind TEXT NOT NULL, user_id INTEGER, value REAL);
+CREATE INDEX IF NOT EXISTS events_at ON events (at);
+CREATE TABLE IF NOT EXISTS totals (
+    poll TEXT PRIMARY KEY, votes INTEGER NOT NULL DEFAULT 0, unvotes INTEGER NOT NULL DEFAULT 0,
+    rounds INTEGER NOT NULL DEFAULT 0, thresholds INTEGER NOT NULL DEFAULT 0,
+    timed_thresholds INTEGER NOT NULL DEFAULT 0, threshold_seconds REAL NOT NULL DEFAULT 0,
+    fastest_threshold REAL, first_at REAL, last_at REAL);
+CREATE TABLE IF NOT EXISTS hourly (
+    poll TEXT NOT NULL, hour INTEGER NOT NULL, votes INTEGER NOT NULL DEFAULT 0,
+    unvotes INTEGER NOT NULL DEFAULT 0, thresholds INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (poll, hour));
+CREATE TABLE IF NOT EXISTS daily (
+    poll TEXT NOT NULL, day TEXT NOT NULL, votes INTEGER NOT NULL DEFAULT 0, unvotes INTEGER NOT NULL DEFAULT 0,
+    rounds INTEGER NOT NULL DEFAULT 0, thresholds INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (poll, day));
+CREATE TABLE IF NOT EXISTS hour_of_day (
+    poll TEXT NOT NULL, hod INTEGER NOT NULL, votes INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (poll, hod));
+CREATE TABLE IF NOT EXISTS voters (
+    poll TEXT NOT NULL, user_id INTEGER NOT NULL, votes INTEGER NOT NULL DEFAULT 0, last_at REAL,
+    PRIMARY KEY (poll, user_id));
+CREATE INDEX IF NOT EXISTS voters_top ON voters (poll, votes DESC);
+"""
+
+def _add(counts: Dict, key, column: str, amount: float = 1):
+    row = counts.setdefault(key, {})
+    row[column] = row.get(column, 0) + amount
+
+
+class VoteAnalytics:
+    """
+    Vote history in SQLite for !pollstats.
+
+    record() only appends to an in-memory queue, so the poll's click handler never waits.
+    A background task hands the queue to one writer thread every flush_interval seconds,
+    which inserts the raw events and folds them into the per-hour, per-day, hour-of-day,
+    per-voter and total tables in the same transaction. Reading stats is a handful of
+    primary-key lookups however much history there is. Raw events older than
+    retention_days (and hourly rows older than hourly_days) are pruned as it goes.
+    """
+
+    def __init__(self, path: str, timezone: str = "UTC", flush_interval: float = 2.0,
+                 retention_days: int = 90, hourly_days: int = 30, max_queue: int = 100_000):
+        self.path = path
+        self.tz = ZoneInfo(timezone)
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+        self.hourly_days = hourly_days
+        self.max_queue = max_queue
+        self._queue: deque = deque()
+        self.dropped = 0
+        self.written = 0
+        # sqlite connections belong to one thread: every DB call runs on this one
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="analytics")
+        self._db: sqlite3.Connection | None = None
+        self._flusher: asyncio.Task | None = None
+        self._last_prune = 0.0
+
+    # ---- hot path -----------------------------------------------------------
+
+    def record(self, kind: str, poll: str, user_id: int | None = None, value: float | None = None):
+        """Queue one event (vote, unvote, round, threshold). Never blocks; drops if the writer fell far behind."""
+        if len(self._queue) >= self.max_queue:
+            self.dropped += 1
+            return
+        self._queue.append((time.time(), poll, kind, user_id, value))
+        if self._flusher is None or self._flusher.done():
+            try:
+                self._flusher = asyncio.get_running_loop().create_task(self._flush_later())
+            except RuntimeError:
+                self.flush_now()
+
+    # ---- reading ------------------------------------------------------------
+
+    async def summary(self, poll: str, days: int = 7, top: int = 5) -> dict:
+        """Aggregates for !pollstats, read on the writer thread after writing anything still queued."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._summary, self._take(), poll, days, top)
+
+    def _summary(self, batch: List[Tuple], poll: str, days: int, top: int) -> dict:
+        if batch:
+            self._write(batch)
+        db = self._connect()
+        db.row_factory = sqlite3.Row
+        try:
+            totals = db.execute("SELECT * FROM totals WHERE poll = ?", (poll,)).fetchone()
+            hours = db.execute("SELECT hod, votes FROM hour_of_day WHERE poll = ? ORDER BY votes DESC", (poll,)).fetchall()
+            recent = db.execute("SELECT day, votes, unvotes, rounds, thresholds FROM daily WHERE poll = ? ORDER BY day DESC LIMIT ?",
+                                (poll, days)).fetchall()
+            voters = db.execute("SELECT user_id, votes FROM voters WHERE poll = ? AND votes > 0 ORDER BY votes DESC LIMIT ?",
+                                (poll, top)).fetchall()
+            last_day = db.execute("SELECT coalesce(sum(votes), 0) FROM hourly WHERE poll = ? AND hour > ?",
+                                  (poll, int(time.time() // 3600) - 24)).fetchone()[0]
+        finally:
+            db.row_factory = None
+        return {
+            "totals": dict(totals) if totals else None,
+            "peak_hours": [(r["hod"], r["votes"]) for r in hours],
+            "days": [dict(r) for r in reversed(recent)],
+            "top_voters": [(r["user_id"], r["votes"]) for r in voters],
+            "votes_24h": last_day,
+        }
+
+    # ---- writing ------------------------------------------------------------
+
+    async def _flush_later(self):
+        # keep going while events arrive during the write, so nothing stays queued
+        while self._queue:
+            await asyncio.sleep(self.flush_interval)
+            batch = self._take()
+            try:
+                await asyncio.get_running_loop().run_in_executor(self._executor, self._write, batch)
+            except sqlite3.Error as e:
+                log.error("analytics.write_failed", f"❌ Failed to write vote analytics: {e}", events=len(batch), exc=e)
+
+    def _take(self) -> List[Tuple]:
+        batch = list(self._queue)
+        self._queue.clear()
+        return batch
+
+    def flush_now(self):
+        """Write whatever is queued and wait for it (used on shutdown)."""
+        if self._flusher is not None and not self._flusher.done():
+            self._flusher.cancel()
+        batch = self._take()
+        if batch:
+            self._executor.submit(self._write, batch).result()
+
+    def close(self):
+        self.flush_now()
+        self._executor.submit(self._close).result()
+
+    def _close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(SCHEMA)
+        return self._db
+
+    def _write(self, batch: List[Tuple]):
+        """Insert a batch and update every aggregate it touches, in one transaction."""
+        totals, hourly, daily, hod, voters = {}, {}, {}, {}, {}
+        for at, poll, kind, user_id, value in batch:
+            local = datetime.fromtimestamp(at, self.tz)
+            hour, day = int(at // 3600), local.strftime("%Y-%m-%d")
+            t = totals.setdefault(poll, {"first_at": at, "last_at": at})
+            t["last_at"] = at
+            if kind == "vote":
+                _add(totals, poll, "votes")
+                _add(hourly, (poll, hour), "votes")
+                _add(daily, (poll, day), "votes")
+                _add(hod, (poll, local.hour), "votes")
+                _add(voters, (poll, user_id), "votes")
+                voters[(poll, user_id)]["last_at"] = at
+            elif kind == "unvote":
+                _add(totals, poll, "unvotes")
+                _add(hourly, (poll, hour), "unvotes")
+                _add(daily, (poll, day), "unvotes")
+                # a voter's count is the votes they didn't take back, so toggling doesn't climb the ranking
+                _add(voters, (poll, user_id), "votes", -1)
+            elif kind == "round":
+                _add(totals, poll, "rounds")
+                _add(daily, (poll, day), "rounds")
+            elif kind == "threshold":
+                _add(totals, poll, "thresholds")
+                _add(hourly, (poll, hour), "thresholds")
+                _add(daily, (poll, day), "thresholds")
+                if value is not None:
+                    _add(totals, poll, "timed_thresholds")
+                    _add(totals, poll, "threshold_seconds", value)
+                    t["fastest_threshold"] = min(value, t.get("fastest_threshold", value))
+
+        db = self._connect()
+        with db:
+            db.executemany("INSERT INTO events (at, poll, kind, user_id, value) VALUES (?, ?, ?, ?, ?)", batch)
+            db.executemany(
+                "INSERT INTO totals (poll, votes, unvotes, rounds, thresholds, timed_thresholds, threshold_seconds,"
+                " fastest_threshold, first_at, last_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (poll) DO UPDATE SET votes = votes + excluded.votes, unvotes = unvotes + excluded.unvotes,"
+                " rounds = rounds + excluded.rounds, thresholds = thresholds + excluded.thresholds,"
+                " timed_thresholds = timed_thresholds + excluded.timed_thresholds,"
+                " threshold_seconds = threshold_seconds + excluded.threshold_seconds,"
+                " fastest_threshold = min(coalesce(fastest_threshold, excluded.fastest_threshold),"
+                " coalesce(excluded.fastest_threshold, fastest_threshold)), last_at = excluded.last_at",
+                [(poll, r.get("votes", 0), r.get("unvotes", 0), r.get("rounds", 0), r.get("thresholds", 0),
+                  r.get("timed_thresholds", 0), r.get("threshold_seconds", 0), r.get("fastest_threshold"),
+                  r["first_at"], r["last_at"]) for poll, r in totals.items()])
+            db.executemany(
+                "INSERT INTO hourly (poll, hour, votes, unvotes, thresholds) VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT (poll, hour) DO UPDATE SET votes = votes + excluded.votes,"
+                " unvotes = unvotes + excluded.unvotes, thresholds = thresholds + excluded.thresholds",
+                [(p, h, r.get("votes", 0), r.get("unvotes", 0), r.get("thresholds", 0)) for (p, h), r in hourly.items()])
+            db.executemany(
+                "INSERT INTO daily (poll, day, votes, unvotes, rounds, thresholds) VALUES (?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (poll, day) DO UPDATE SET votes = votes + excluded.votes, unvotes = unvotes + excluded.unvotes,"
+                " rounds = rounds + excluded.rounds, thresholds = thresholds + excluded.thresholds",
+                [(p, d, r.get("votes", 0), r.get("unvotes", 0), r.get("rounds", 0), r.get("thresholds", 0))
+                 for (p, d), r in daily.items()])
+            db.executemany(
+                "INSERT INTO hour_of_day (poll, hod, votes) VALUES (?, ?, ?)"
+                " ON CONFLICT (poll, hod) DO UPDATE SET votes = votes + excluded.votes",
+                [(p, h, r["votes"]) for (p, h), r in hod.items()])
+            db.executemany(
+                "INSERT INTO voters (poll, user_id, votes, last_at) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT (poll, user_id) DO UPDATE SET votes = votes + excluded.votes,"
+                " last_at = coalesce(excluded.last_at, last_at)",
+                [(p, u, r["votes"], r.get("last_at")) for (p, u), r in voters.items()])
+            now = time.time()
+            if now - self._last_prune > 3600:
+                self._last_prune = now
+                db.execute("DELETE FROM events WHERE at < ?", (now - self.retention_days * 86400,))
+                db.execute("DELETE FROM hourly WHERE hour < ?", (int((now - self.hourly_days * 86400) // 3600),))
+        self.written += len(batch)
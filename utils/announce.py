@@ -0,0 +1,149 @@
+# discord-bot/utils/announce.py
+import time
+import asyncio
+from typing import Dict, Tuple
+import aiohttp
+import discord
+from bot_app import bot
+from utils import outbound
+from utils.metrics import ANNOUNCEMENTS, ANNOUNCE_SECONDS
+from utils.config import get_config, on_reload
+from utils.log import log
+
+TEMPLATES = {
+    "server_open": (
+        "Server is running! ✅\n"
+        "Use this info to connect to the server:\n"
+        "IP: {ip}\n"
+        "Port: {port} (Bedrock users)\n\n"
+        "{role} — run `!getnotified` in {poll_channel} to be added to notifications."
+    ),
+    "server_shutdown": "❌ The server has been shutdown",
+}
+
+
+class Announcer:
+    """
+    Server open/shutdown announcements, sent to every target configured for the event
+    (ANNOUNCE_OPEN_TARGETS / ANNOUNCE_SHUTDOWN_TARGETS) at the same time, at most
+    `concurrency` at once.
+
+    The text is rendered once per event. Targets that turn out to be the same channel or
+    webhook (e.g. `server_chat` and `channel:<its id>`) get it once. A channel in another
+    guild is a mirror: it gets the same text without pinging anyone. Webhook clients are
+    kept for the next event.
+    """
+
+    def __init__(self, concurrency: int = 4):
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._webhooks: Dict[str, discord.Webhook] = {}
+        self._http: aiohttp.ClientSession | None = None
+
+    @staticmethod
+    def targets(event: str) -> Tuple[str, ...]:
+        config = bot.config
+        return config.announce_open_targets if event == "server_open" else config.announce_shutdown_targets
+
+    @staticmethod
+    def render(event: str, guild=None, poll_channel=None) -> str:
+        config = bot.config
+        ip, port = config.login
+        role = guild.get_role(config.getnotified_role_id) if guild else None
+        return TEMPLATES[event].format(
+            ip=ip, port=port,
+            role=role.mention if role else f"<@&{config.getnotified_role_id}>",
+            poll_channel=poll_channel.mention if poll_channel else "the poll channel",
+        )
+
+    async def announce(self, event: str, guild=None, poll_channel=None) -> Dict[str, float | None]:
+        """
+        Post the event's announcement to all of its targets. Returns the seconds each target
+        took from the event to delivery, None for the ones that failed.
+        """
+        started = time.perf_counter()
+        text = self.render(event, guild, poll_channel)
+        targets = self.targets(event)
+        destinations = await asyncio.gather(*(self._destination(target) for target in targets), return_exceptions=True)
+
+        report: Dict[str, float | None] = {}
+        sends = []
+        seen = set()
+        for target, destination in zip(targets, destinations):
+            if isinstance(destination, Exception):
+                log.error("announce.failed", f"❌ Can't announce {event} to {target}: {destination}",
+                          announcement=event, target=target, exc=destination)
+                ANNOUNCEMENTS.inc(event, target.partition(":")[0], "failed")
+                report[target] = None
+                continue
+            key, destination = destination
+            if key in seen:
+                continue
+            seen.add(key)
+            sends.append((target, destination))
+
+        results = await asyncio.gather(*(self._deliver(event, target, destination, text, guild, started)
+                                         for target, destination in sends))
+        report.update(zip((target for target, _ in sends), results))
+        delivered = sum(1 for took in report.values() if took is not None)
+        log.info("announce.sent", f"📣 Announced {event} to {delivered}/{len(report)} targets in "
+                 f"{(time.perf_counter() - started) * 1000:.0f} ms", announcement=event,
+                 latency_ms={target: round(took * 1000, 1) if took is not None else None for target, took in report.items()})
+        return report
+
+    async def close(self):
+        self._webhooks.clear()
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+
+    # ---- delivery -----------------------------------------------------------
+
+    async def _destination(self, target: str):
+        """(what identifies it, channel or webhook) for a target."""
+        kind, _, arg = target.partition(":")
+        if kind == "webhook":
+            webhook = self._webhooks.get(arg)
+            if webhook is None:
+                if self._http is None:
+                    self._http = aiohttp.ClientSession()
+                webhook = self._webhooks[arg] = discord.Webhook.from_url(arg, session=self._http)
+            return f"webhook:{webhook.id}", webhook
+        channel_id = bot.config.server_chat_channel_id if kind == "server_chat" else int(arg)
+        if not channel_id:
+            raise LookupError("SERVER_CHAT_CHANNEL_ID is not set")
+        # threads and channels in other guilds the bot is in are fetched when not cached
+        channel = bot.get_channel(channel_id) or await outbound.outbound.call(
+            outbound.channel_route(channel_id), outbound.CREDENTIALS, lambda: bot.fetch_channel(channel_id))
+        return f"channel:{channel.id}", channel
+
+    async def _deliver(self, event: str, target: str, destination, text: str, guild, started: float) -> float | None:
+        kind = target.partition(":")[0]
+        async with self._semaphore:
+            try:
+                if isinstance(destination, discord.Webhook):
+                    await outbound.outbound.call(f"webhook:{destination.id}", outbound.CREDENTIALS, lambda: destination.send(text))
+                elif guild is not None and getattr(destination, "guild", None) not in (None, guild):
+                    await outbound.send(destination, text, priority=outbound.CREDENTIALS,
+                                        allowed_mentions=discord.AllowedMentions.none())
+                else:
+                    await outbound.send(destination, text, priority=outbound.CREDENTIALS)
+            except Exception as e:
+                log.error("announce.failed", f"❌ Announcing {event} to {target} failed: {e}", announcement=event, target=target, exc=e)
+                ANNOUNCEMENTS.inc(event, kind, "failed")
+                return None
+        took = time.perf_counter() - started
+        ANNOUNCEMENTS.inc(event, kind, "sent")
+        ANNOUNCE_SECONDS.observe(took, event, kind)
+        return took
+
+
+# single announcer for the whole bot
+announcer = Announcer(concurrency=get_config().announce_concurrency)
+
+
+def _apply_config(old, new):
+    if new.announce_concurrency != old.announce_concurrency:
+        announcer._semaphore = asyncio.Semaphore(new.announce_concurrency)
+
+
+on_reload(_apply_config)
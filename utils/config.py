@@ -0,0 +1,353 @@
+# discord-bot/utils/config.py
+import os
+import re
+import types
+from dataclasses import dataclass, fields
+from typing import Callable, List, Mapping, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from dotenv import dotenv_values
+from utils.schedule import PollSchedule
+
+
+class ConfigError(Exception):
+    """Raised when the configuration is missing required keys or has bad values."""
+
+    def __init__(self, problems: List[str]):
+        super().__init__("; ".join(problems))
+        self.problems = problems
+
+
+def _int(value: str) -> int:
+    return int(value.strip())
+
+
+def _int_between(low: int, high: int | None = None) -> Callable[[str], int]:
+    def parse(value: str) -> int:
+        number = int(value.strip())
+        if number < low or (high is not None and number > high):
+            raise ValueError(f"must be {low} or more" if high is None else f"must be between {low} and {high}")
+        return number
+    return parse
+
+
+def _timezone(value: str) -> str:
+    name = value.strip()
+    try:
+        ZoneInfo(name)
+    except (ValueError, ZoneInfoNotFoundError):
+        raise ValueError(f"unknown time zone {name!r}") from None
+    return name
+
+
+def _ids(value: str) -> Tuple[int, ...]:
+    return tuple(int(x) for x in value.split(",") if x.strip() and int(x) != 0)
+
+
+def _bool(value: str) -> bool:
+    if value.strip().lower() in ("1", "true", "yes", "on"):
+        return True
+    if value.strip().lower() in ("0", "false", "no", "off", ""):
+        return False
+    raise ValueError(f"not a boolean: {value!r}")
+
+
+def _one_of(*choices: str) -> Callable[[str], str]:
+    def parse(value: str) -> str:
+        value = value.strip().lower()
+        if value not in choices:
+            raise ValueError(f"{value!r} is not one of {', '.join(choices)}")
+        return value
+    return parse
+
+
+def _optional_int(value: str) -> int | None:
+    return int(value.strip()) if value.strip() else None
+
+
+def _targets(value: str) -> Tuple[str, ...]:
+    """Notification targets: thread, dm:<user id>, webhook:<url>."""
+    targets = []
+    for target in (t.strip() for t in value.split(",")):
+        kind, _, arg = target.partition(":")
+        if kind == "thread" and not arg:
+            targets.append(target)
+        elif kind == "dm" and arg.isdigit():
+            targets.append(target)
+        elif kind == "webhook" and arg.startswith("https://"):
+            targets.append(target)
+        elif target:
+            raise ValueError(f"unknown target {target!r} (use thread, dm:<user id> or webhook:<url>)")
+    return tuple(targets)
+
+
+def _announce_targets(value: str) -> Tuple[str, ...]:
+    """Announcement targets: server_chat, channel:<channel or thread id>, webhook:<url>."""
+    targets = []
+    for target in (t.strip() for t in value.split(",")):
+        kind, _, arg = target.partition(":")
+        if kind == "server_chat" and not arg:
+            targets.append(target)
+        elif kind == "channel" and arg.isdigit():
+            targets.append(target)
+        elif kind == "webhook" and arg.startswith("https://"):
+            targets.append(target)
+        elif target:
+            raise ValueError(f"unknown target {target!r} (use server_chat, channel:<id> or webhook:<url>)")
+    return tuple(targets)
+
+
+# env key -> (attribute, parser, default, required). A default of None with required=False means "warn if missing".
+KEYS = {
+    "DISCORD_TOKEN": ("discord_token", str, None, True),
+    "POLL_CHANNEL_ID": ("poll_channel_ids", _ids, None, True),
+    "BOT_COMMANDS_CHANNEL_ID": ("bot_commands_channel_id", _int, "0", False),
+    "VOTE_THRESHOLD": ("vote_threshold", _int_between(1), "1", False),
+    "POLL_EDIT_INTERVAL": ("poll_edit_interval", float, "1.0", False),
+    "POLL_COOLDOWN_SECONDS": ("poll_cooldown_seconds", float, "120", False),
+    "VOTE_FLUSH_INTERVAL": ("vote_flush_interval", float, "0.5", False),
+    "WATCH_CHANNEL_ID": ("watch_channel_id", _int, None, False),
+    "SERVER_CHAT_CHANNEL_ID": ("server_chat_channel_id", _int, None, False),
+    "GETNOTIFIED_ROLE_ID": ("getnotified_role_id", _int, None, False),
+    "GENERAL_CHANNEL_ID": ("general_channel_id", _int, None, False),
+    "NOTIFY_THREAD_ID": ("notify_thread_id", _int, None, False),
+    "NOTIFY_ROLE_ID": ("notify_role_id", _int, None, False),
+    "NOTIFY_TARGETS": ("notify_targets", _targets, "thread", False),
+    "NOTIFY_DEDUPE_SECONDS": ("notify_dedupe_seconds", float, "600", False),
+    "NOTIFY_MAX_ATTEMPTS": ("notify_max_attempts", _int_between(1), "8", False),
+    "NOTIFY_CONCURRENCY": ("notify_concurrency", _int_between(1), "4", False),
+    "ANNOUNCE_OPEN_TARGETS": ("announce_open_targets", _announce_targets, "server_chat", False),
+    "ANNOUNCE_SHUTDOWN_TARGETS": ("announce_shutdown_targets", _announce_targets, "server_chat", False),
+    "ANNOUNCE_CONCURRENCY": ("announce_concurrency", _int_between(1), "4", False),
+    "EDITING_MODE": ("editing", _bool, "false", False),
+    "LOGIN_CREDENTIALS": ("login_credentials", str, "IP NOT FOUND, PORT NOT FOUND", False),
+    "WATCH_RULES_FILE": ("watch_rules_file", str, "watch_rules.json", False),
+    "POLL_PAUSE_HOUR": ("poll_pause_hour", _int_between(0, 23), "21", False),
+    "POLL_RESUME_HOUR": ("poll_resume_hour", _int_between(0, 23), "8", False),
+    "POLL_TIMEZONE": ("poll_timezone", _timezone, "America/Denver", False),
+    "POLL_SCHEDULE": ("poll_schedule", str, "", False),
+    "BOT_DATA_DIR": ("data_dir", str, "data", False),
+    "SUBSCRIBABLE_ROLE_IDS": ("subscribable_role_ids", _ids, "", False),
+    "ROLE_DEBOUNCE_SECONDS": ("role_debounce_seconds", float, "2.0", False),
+    "BOT_RECORD_FILE": ("record_file", str, "", False),
+    "METRICS_PORT": ("metrics_port", _int, "0", False),
+    "METRICS_HOST": ("metrics_host", str, "127.0.0.1", False),
+    "BOT_PROFILE": ("profile", _one_of("full", "lean"), "full", False),
+    "BOT_MAX_MESSAGES": ("max_messages", _optional_int, "", False),
+    "BOT_SHUTDOWN_SECONDS": ("shutdown_seconds", float, "5", False),
+    "BOT_STALL_THRESHOLD_MS": ("stall_threshold_ms", float, "0", False),
+    "BOT_STALL_HISTORY": ("stall_history", _int, "20", False),
+    "BOT_WORKERS": ("workers", _int_between(0), "0", False),
+    "ANALYTICS_FLUSH_INTERVAL": ("analytics_flush_interval", float, "2.0", False),
+    "ANALYTICS_RETENTION_DAYS": ("analytics_retention_days", _int, "90", False),
+    "LOG_LEVEL": ("log_level", _one_of("debug", "info", "warning", "error"), "info", False),
+    "LOG_FORMAT": ("log_format", _one_of("json", "text"), "json", False),
+    "LOG_QUEUE_SIZE": ("log_queue_size", _int_between(1), "10000", False),
+    "PROBE_INTERVAL_SECONDS": ("probe_interval_seconds", float, "0", False),
+    "PROBE_TIMEOUT_SECONDS": ("probe_timeout_seconds", float, "3", False),
+    "PROBE_CACHE_SECONDS": ("probe_cache_seconds", float, "15", False),
+    "PROBE_HOST": ("probe_host", str, "", False),
+    "PROBE_JAVA_PORT": ("probe_java_port", _int, "25565", False),
+    "PROBE_BEDROCK_PORT": ("probe_bedrock_port", _optional_int, "", False),
+}
+# keys made of a known prefix plus an ID
+PATTERN_KEYS = [re.compile(r"^POLL_SCHEDULE_(\d+)$")]
+# env vars with these prefixes are ours; an unknown one is most likely a typo
+OUR_PREFIXES = ("POLL_", "VOTE_", "WATCH_", "NOTIFY_", "BOT_", "GETNOTIFIED_", "SERVER_CHAT_", "GENERAL_CHANNEL", "METRICS_",
+                "SUBSCRIBABLE_", "ROLE_", "PROBE_", "ANALYTICS_", "LOG_", "ANNOUNCE_")
+
+
+@dataclass(frozen=True)
+class Config:
+    """Validated, read-only settings. Build with load_config(); replace (never mutate) to reload."""
+    discord_token: str
+    poll_channel_ids: Tuple[int, ...]
+    bot_commands_channel_id: int
+    vote_threshold: int
+    poll_edit_interval: float
+    poll_cooldown_seconds: float
+    vote_flush_interval: float
+    watch_channel_id: int
+    server_chat_channel_id: int
+    getnotified_role_id: int
+    general_channel_id: int
+    notify_thread_id: int
+    notify_role_id: int
+    notify_targets: Tuple[str, ...]
+    notify_dedupe_seconds: float
+    notify_max_attempts: int
+    notify_concurrency: int
+    announce_open_targets: Tuple[str, ...]
+    announce_shutdown_targets: Tuple[str, ...]
+    announce_concurrency: int
+    editing: bool
+    login_credentials: str
+    watch_rules_file: str
+    poll_pause_hour: int
+    poll_resume_hour: int
+    poll_timezone: str
+    poll_schedule: str
+    data_dir: str
+    subscribable_role_ids: Tuple[int, ...]
+    role_debounce_seconds: float
+    record_file: str
+    metrics_port: int
+    metrics_host: str
+    profile: str
+    max_messages: int | None
+    shutdown_seconds: float
+    stall_threshold_ms: float
+    stall_history: int
+    workers: int
+    log_level: str
+    log_format: str
+    log_queue_size: int
+    analytics_flush_interval: float
+    analytics_retention_days: int
+    probe_interval_seconds: float
+    probe_timeout_seconds: float
+    probe_cache_seconds: float
+    probe_host: str
+    probe_java_port: int
+    probe_bedrock_port: int | None
+    poll_schedule_overrides: Mapping[int, str]
+    warnings: Tuple[str, ...] = ()
+
+    @property
+    def login(self) -> Tuple[str, str]:
+        """(ip, port) from LOGIN_CREDENTIALS ("ip,port")."""
+        parts = [p.strip() for p in self.login_credentials.split(",")]
+        ip = parts[0] if len(parts) > 0 and parts[0] else "IP_NOT_SET"
+        port = parts[1] if len(parts) > 1 and parts[1] else "PORT_NOT_SET"
+        return ip, port
+
+    @property
+    def probe_address(self) -> Tuple[str, int, int] | None:
+        """
+        (host, java port, bedrock port) the status prober checks: PROBE_HOST / PROBE_*_PORT,
+        else the IP and (Bedrock) port of LOGIN_CREDENTIALS. None if there is no host.
+        """
+        ip, port = self.login
+        host = self.probe_host or ("" if ip in ("IP_NOT_SET", "IP NOT FOUND") else ip)
+        if not host:
+            return None
+        bedrock = self.probe_bedrock_port if self.probe_bedrock_port is not None else (int(port) if port.isdigit() else 19132)
+        return host, self.probe_java_port, bedrock
+
+    @property
+    def default_poll_schedule(self) -> str:
+        return self.poll_schedule or f"{self.poll_pause_hour:02d}:00-{self.poll_resume_hour:02d}:00"
+
+    def schedule_for(self, channel_id: int) -> str:
+        return self.poll_schedule_overrides.get(channel_id, self.default_poll_schedule)
+
+    def diff(self, other: "Config") -> List[str]:
+        """Names of the settings that differ between two configs (secrets not shown)."""
+        return [f.name for f in fields(self) if f.name != "warnings" and getattr(self, f.name) != getattr(other, f.name)]
+
+
+def load_config(env_file: str | None = ".env", environ: Mapping[str, str] | None = None) -> Config:
+    """
+    Build a Config from the process environment, falling back to env_file (process env wins,
+    like load_dotenv(override=False)). Raises ConfigError listing every problem at once.
+    """
+    environ = os.environ if environ is None else environ
+    file_values = {k: v for k, v in (dotenv_values(env_file) if env_file and os.path.exists(env_file) else {}).items() if v is not None}
+    merged = {**file_values, **{k: v for k, v in environ.items() if k in KEYS or k.startswith(OUR_PREFIXES)}}
+
+    problems: List[str] = []
+    warnings: List[str] = []
+    values = {}
+    for key, (attr, parser, default, required) in KEYS.items():
+        raw = merged.get(key)
+        if raw is None or raw == "":
+            if required:
+                problems.append(f"{key} is required but not set")
+                continue
+            if default is None:
+                warnings.append(f"{key} is not set")
+                raw = "0"
+            else:
+                raw = default
+        try:
+            values[attr] = parser(raw)
+        except ValueError as e:
+            problems.append(f"{key}={raw!r} is invalid ({e})")
+
+    overrides = {}
+    for key in list(file_values) + [k for k in environ if k.startswith(OUR_PREFIXES)]:
+        if key in KEYS or key == "BOT_ENV_FILE":
+            continue
+        for pattern in PATTERN_KEYS:
+            m = pattern.match(key)
+            if m:
+                overrides[int(m.group(1))] = merged[key]
+                break
+        else:
+            warnings.append(f"{key} is not a known setting (typo?)")
+
+    if "poll_channel_ids" in values and not values["poll_channel_ids"]:
+        problems.append("POLL_CHANNEL_ID must name at least one channel")
+    # schedules are parsed here so a typo stops the bot now rather than the scheduler later
+    if {"poll_timezone", "poll_pause_hour", "poll_resume_hour"} <= values.keys():
+        schedules = {"POLL_SCHEDULE": values.get("poll_schedule") or f"{values['poll_pause_hour']:02d}:00-{values['poll_resume_hour']:02d}:00"}
+        schedules.update((f"POLL_SCHEDULE_{channel_id}", text) for channel_id, text in overrides.items())
+        for key, text in schedules.items():
+            try:
+                PollSchedule.parse(text, values["poll_timezone"])
+            except (ValueError, KeyError) as e:
+                problems.append(f"{key}={text!r} is invalid ({e})")
+    if problems:
+        raise ConfigError(problems)
+
+    return Config(**values, poll_schedule_overrides=types.MappingProxyType(overrides), warnings=tuple(dict.fromkeys(warnings)))
+
+
+# ---- the one live config ----------------------------------------------------
+
+_current: Config | None = None
+_env_file = ".env"
+_reload_listeners: List[Callable[[Config, Config], None]] = []
+
+
+def init_config(env_file: str = ".env") -> Config:
+    """Load the config once at startup and print what is missing/unknown."""
+    global _current, _env_file
+    _env_file = env_file
+    _current = load_config(env_file)
+    for warning in _current.warnings:
+        # plain print: the structured log takes its settings from this config, so it can't exist yet
+        print(f"⚠️ Config: {warning}")
+    return _current
+
+
+def get_config() -> Config:
+    """The current config (loaded on first use if init_config() wasn't called)."""
+    if _current is None:
+        return init_config(_env_file)
+    return _current
+
+
+def on_reload(listener: Callable[[Config, Config], None]):
+    """Register listener(old, new), called after a successful reload."""
+    _reload_listeners.append(listener)
+
+
+def reload_config() -> List[str]:
+    """
+    Re-read env + .env and swap in the new config in one assignment. On error the old
+    config stays active and ConfigError is raised. Returns the names of changed settings.
+    """
+    global _current
+    # utils.log reads its settings from here, so it is imported when first needed
+    from utils.log import log
+
+    old = get_config()
+    new = load_config(_env_file)
+    _current = new
+    for listener in _reload_listeners:
+        try:
+            listener(old, new)
+        except Exception as e:
+            log.error("config.reload_listener_failed", f"❌ Config reload listener failed: {e}",
+                      listener=getattr(listener, "__qualname__", repr(listener)), exc=e)
+    return old.diff(new)
@@ -0,0 +1,107 @@
+# discord-bot/utils/edits.py
+import json
+import time
+import asyncio
+from typing import Any, Dict, Tuple
+from utils import outbound
+from utils.metrics import MESSAGE_EDITS, POLL_EDIT_DELAY_SECONDS
+from utils.log import log
+
+
+def view_signature(view) -> str | None:
+    """Stable text form of a view's components, used to compare what is on a message."""
+    if view is None:
+        return None
+    return json.dumps(view.to_components(), sort_keys=True)
+
+
+class EditCoalescer:
+    """
+    Collapses bursts of edits to the same message into at most one edit per interval.
+
+    Callers hand over the latest (content, view) with request(); one flusher task per
+    message writes whatever is newest when the interval allows. The last requested
+    state is always written, and edits that match what is already on the message are skipped.
+    """
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self._pending: Dict[int, Tuple[Any, str, Any]] = {}
+        self._written: Dict[int, Tuple[str, str | None]] = {}
+        self._last_edit: Dict[int, float] = {}
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._failed: set = set()
+        # when the oldest change not yet on the message was requested, for the edit delay metric
+        self._since: Dict[int, float] = {}
+        self.edits_sent = 0
+        self.edits_skipped = 0
+
+    def request(self, message, content: str, view=None):
+        """Queue the newest state for a message. Returns immediately."""
+        self._pending[message.id] = (message, content, view)
+        self._since.setdefault(message.id, time.monotonic())
+        if message.id not in self._tasks:
+            self._tasks[message.id] = asyncio.create_task(self._flusher(message.id))
+
+    async def edit(self, message, content: str, view=None) -> bool:
+        """
+        Queue the newest state and wait until it (or something newer) has been written.
+        Returns False if the last write attempt for the message failed.
+        """
+        self.request(message, content, view)
+        await self.flush(message.id)
+        return message.id not in self._failed
+
+    async def flush(self, message_id: int | None = None):
+        """Wait for pending edits of one message (or all messages) to be written."""
+        if message_id is None:
+            tasks = list(self._tasks.values())
+        else:
+            tasks = [self._tasks[message_id]] if message_id in self._tasks else []
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def forget(self, message_id: int):
+        """Drop everything known about a message (e.g. after it was deleted)."""
+        self._pending.pop(message_id, None)
+        self._written.pop(message_id, None)
+        self._last_edit.pop(message_id, None)
+        self._failed.discard(message_id)
+        self._since.pop(message_id, None)
+
+    async def _flusher(self, message_id: int):
+        try:
+            while message_id in self._pending:
+                wait = self._last_edit.get(message_id, 0.0) + self.interval - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                    # the message may have been forgotten while we slept
+                    if message_id not in self._pending:
+                        break
+                message, content, view = self._pending.pop(message_id)
+                await self._write(message, content, view)
+        finally:
+            self._tasks.pop(message_id, None)
+
+    async def _write(self, message, content: str, view):
+        signature = (content, view_signature(view))
+        if self._written.get(message.id) == signature:
+            self.edits_skipped += 1
+            MESSAGE_EDITS.inc("skipped")
+            self._since.pop(message.id, None)
+            return
+        try:
+            await outbound.edit(message, content=content, view=view)
+            self._written[message.id] = signature
+            self._failed.discard(message.id)
+            self.edits_sent += 1
+            MESSAGE_EDITS.inc("sent")
+            since = self._since.pop(message.id, None)
+            if since is not None:
+                POLL_EDIT_DELAY_SECONDS.observe(time.monotonic() - since)
+        except Exception as e:
+            self._failed.add(message.id)
+            MESSAGE_EDITS.inc("failed")
+            log.warning("edits.failed", f"Failed to edit message {message.id}: {e}", message=message.id, error=str(e))
+        finally:
+            self._last_edit[message.id] = time.monotonic()
@@ -1,26 +1,18 @@
 # discord-bot/utils/helpers.py
-import os
 from bot_app import bot
+from utils.notify import notifier
 
-NOTIFY_THREAD_ID = int(os.getenv("NOTIFY_THREAD_ID", "0"))
-NOTIFY_ROLE_ID = int(os.getenv("NOTIFY_ROLE_ID", "0"))
-EDITING = os.getenv("EDITING_MODE", "false").lower() == "true"
 
-async def notify_owner_thread(whoAskedName: str):
+def notify_owner_thread(whoAskedName: str, round_key: str = "poll") -> bool:
     """
-    Sends the owner notification into the configured thread.
+    Queues the owner notification for the NOTIFY_TARGETS (the thread by default).
+    Only the first call per poll round (round_key) is sent; returns False for the others.
     Does NOT send any confirmation into the poll channel (poll message will be edited instead).
     """
-    thread = bot.get_channel(NOTIFY_THREAD_ID)
-    role_mention = f"<@&{NOTIFY_ROLE_ID}>" if not EDITING else "[Editing Mode - No Role Mention]"
-    if thread is None:
-        print("❌ Notify thread not found! Check NOTIFY_THREAD_ID")
-        return
-    try:
-        await thread.send(f"{role_mention} {whoAskedName} has requested to start the server. Please start it when you can. Thank you!")
-        print("📧 Notification sent in Discord thread!")
-    except Exception as e:
-        print(f"❌ Failed to send notification in thread: {e}")
+    config = bot.config
+    role_mention = f"<@&{config.notify_role_id}>" if not config.editing else "[Editing Mode - No Role Mention]"
+    return notifier.notify(round_key, f"{whoAskedName} has requested to start the server. Please start it when you can. Thank you!",
+                           mention=role_mention)
 
 
 class DummyContext:
@@ -0,0 +1,196 @@
+# discord-bot/utils/log.py
+import sys
+import json
+import time
+import queue
+import atexit
+import random
+import threading
+import traceback
+from datetime import datetime, timezone
+from typing import Dict
+from utils.config import get_config, on_reload
+from utils.metrics import LOG_RECORDS
+
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+
+# Noisy events: event -> (share of records kept, records per second at most). Everything else is kept.
+POLICIES: Dict[str, tuple] = {
+    "poll.vote": (0.05, 10),
+    "poll.ack": (0.05, 10),
+    "notify.retry": (1.0, 2),
+    "edits.failed": (1.0, 2),
+    "outbound.throttled": (1.0, 1),
+    "roles.failed": (1.0, 2),
+}
+
+
+class _Bucket:
+    """Token bucket for one event; counts what it turned away until a record gets through."""
+    __slots__ = ("rate", "tokens", "updated", "suppressed")
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.suppressed = 0
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        self.suppressed += 1
+        return False
+
+
+class StructuredLog:
+    """
+    Log records as one JSON object per line (or the plain message with LOG_FORMAT=text).
+
+    Calling info()/warning()/... only builds a dict and puts it on a bounded queue; a
+    background thread serializes and writes it, so a slow stdout pipe never stalls the
+    event loop. When the queue is full the record is dropped and counted instead of
+    waiting. Noisy events are sampled and rate limited per POLICIES; the next record
+    that gets through carries how many were suppressed.
+    """
+
+    def __init__(self, level: str = "info", fmt: str = "json", queue_size: int = 10_000):
+        self.level = LEVELS[level]
+        self.fmt = fmt
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._buckets: Dict[str, _Bucket] = {}
+        self.dropped = 0
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def configure(self, level: str, fmt: str):
+        self.level = LEVELS[level]
+        self.fmt = fmt
+
+    # ---- producing (any thread, usually the event loop) -----------------------
+
+    def debug(self, event: str, msg: str = "", **fields):
+        self._log(10, "debug", event, msg, fields)
+
+    def info(self, event: str, msg: str = "", **fields):
+        self._log(20, "info", event, msg, fields)
+
+    def warning(self, event: str, msg: str = "", **fields):
+        self._log(30, "warning", event, msg, fields)
+
+    def error(self, event: str, msg: str = "", **fields):
+        """An `exc=` field is written with its traceback."""
+        self._log(40, "error", event, msg, fields)
+
+    def _log(self, levelno: int, level: str, event: str, msg: str, fields: dict):
+        if levelno < self.level:
+            return
+        policy = POLICIES.get(event)
+        if policy is not None and levelno < 40:
+            sample, rate = policy
+            if sample < 1.0 and random.random() >= sample:
+                LOG_RECORDS.inc("sampled_out")
+                return
+            bucket = self._buckets.get(event)
+            if bucket is None:
+                bucket = self._buckets[event] = _Bucket(rate)
+            if not bucket.take():
+                LOG_RECORDS.inc("rate_limited")
+                return
+            if bucket.suppressed:
+                fields["suppressed"] = bucket.suppressed
+                bucket.suppressed = 0
+        record = {"ts": time.time(), "level": level, "event": event, "msg": msg, **fields}
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            LOG_RECORDS.inc("dropped")
+            return
+        if self._thread is None:
+            self._start()
+
+    # ---- writing (background thread) ----------------------------------------
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._writer, name="log-writer", daemon=True)
+                self._thread.start()
+
+    def _writer(self):
+        while True:
+            batch = [self._queue.get()]
+            # write whatever else is waiting in one go
+            while len(batch) < 512:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            lines, done, stop = [], [], False
+            for item in batch:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    done.append(item)
+                else:
+                    lines.append(self._format(item))
+            if lines:
+                try:
+                    stream = sys.stdout
+                    stream.write("\n".join(lines) + "\n")
+                    stream.flush()
+                    LOG_RECORDS.inc("written", amount=len(lines))
+                except Exception:
+                    LOG_RECORDS.inc("dropped", amount=len(lines))
+            for event in done:
+                event.set()
+            if stop:
+                return
+
+    def _format(self, record: dict) -> str:
+        exc = record.pop("exc", None)
+        if isinstance(exc, BaseException):
+            record["error"] = f"{type(exc).__name__}: {exc}"
+            record["traceback"] = "".join(traceback.format_exception(type(exc), exc, exc.__traceback__))
+        elif exc is not None:
+            record["error"] = str(exc)
+        if self.fmt == "text":
+            extra = f" ({record['error']})" if "error" in record and record["error"] not in record["msg"] else ""
+            text = (record["msg"] or record["event"]) + extra
+            return text + ("\n" + record["traceback"].rstrip() if "traceback" in record else "")
+        record["ts"] = datetime.fromtimestamp(record["ts"], timezone.utc).isoformat(timespec="milliseconds")
+        return json.dumps(record, ensure_ascii=False, default=str)
+
+    # ---- shutdown -----------------------------------------------------------
+
+    def flush(self, timeout: float = 2.0) -> bool:
+        """Wait until everything logged so far is written. Returns False on timeout."""
+        if self._thread is None or not self._thread.is_alive():
+            return True
+        written = threading.Event()
+        try:
+            self._queue.put(written, timeout=timeout)
+        except queue.Full:
+            return False
+        return written.wait(timeout)
+
+    def close(self, timeout: float = 2.0):
+        """Write out what is queued and stop the writer thread."""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+        self._thread = None
+
+
+# the one log of the process
+log = StructuredLog(get_config().log_level, get_config().log_format, get_config().log_queue_size)
+on_reload(lambda old, new: log.configure(new.log_level, new.log_format))
+atexit.register(log.close)
@@ -0,0 +1,211 @@
+# discord-bot/utils/metrics.py
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Tuple
+
+# Latency buckets in seconds, from a fast dict update up to a slow REST call
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label_text(names: Tuple[str, ...], values: Tuple) -> str:
+    if not names:
+        return ""
+    parts = []
+    for name, value in zip(names, values):
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{name}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+class Counter:
+    """A number that only goes up, one per label combination."""
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values: Dict[Tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1.0):
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def total(self) -> float:
+        return sum(self.values.values())
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{_label_text(self.labels, k)} {v:g}" for k, v in self.values.items()]
+
+
+class Gauge:
+    """A value that is set (or read through a callback when scraped)."""
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values: Dict[Tuple, float] = {}
+        self.callback: Callable[[], float] | None = None
+
+    def set(self, value: float, *labels):
+        self.values[labels] = value
+
+    def set_function(self, callback: Callable[[], float]):
+        """Read the (unlabelled) value from callback() whenever it is looked at."""
+        self.callback = callback
+
+    def get(self, *labels) -> float | None:
+        if self.callback is not None and not labels:
+            try:
+                value = float(self.callback())
+            except Exception:
+                return None
+            return None if value != value else value  # NaN, e.g. latency before the first heartbeat
+        return self.values.get(labels)
+
+    def render(self) -> List[str]:
+        if self.callback is not None:
+            value = self.get()
+            return [] if value is None else [f"{self.name} {value:g}"]
+        return [f"{self.name}{_label_text(self.labels, k)} {v:g}" for k, v in self.values.items()]
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram: observe() is one bisect and two additions, so it is cheap
+    enough to run on every command and click. Quantiles are estimated from the buckets.
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (+ one overflow), sum, count]
+        self.series: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, *labels):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def time(self, *labels) -> "_Timed":
+        """with histogram.time("label"): ... observes how long the block took."""
+        return _Timed(self, labels)
+
+    def count(self, *labels) -> int:
+        if labels:
+            return self.series[labels][2] if labels in self.series else 0
+        return sum(s[2] for s in self.series.values())
+
+    def quantile(self, q: float, *labels) -> float | None:
+        """Estimated q-quantile (0..1) of one series, or of all series when no labels are given."""
+        if labels:
+            counts = self.series[labels][0] if labels in self.series else None
+        else:
+            counts = [sum(c) for c in zip(*(s[0] for s in self.series.values()))] if self.series else None
+        if not counts or not sum(counts):
+            return None
+        rank = q * sum(counts)
+        seen = 0
+        for i, n in enumerate(counts):
+            if n and seen + n >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * ((rank - seen) / n)
+            seen += n
+        return self.buckets[-1]
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, (counts, total, n) in self.series.items():
+            cumulative = 0
+            for bound, c in zip(self.buckets, counts):
+                cumulative += c
+                lines.append(f"{self.name}_bucket{_label_text(self.labels + ('le',), key + (f'{bound:g}',))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_label_text(self.labels + ('le',), key + ('+Inf',))} {n}")
+            lines.append(f"{self.name}_sum{_label_text(self.labels, key)} {total:g}")
+            lines.append(f"{self.name}_count{_label_text(self.labels, key)} {n}")
+        return lines
+
+
+class _Timed:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: Histogram, labels: Tuple):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+        return False
+
+
+class Registry:
+    """All metrics of the process, rendered together in Prometheus text format."""
+
+    def __init__(self):
+        self.metrics: Dict[str, Counter | Gauge | Histogram] = {}
+
+    def _add(self, metric):
+        existing = self.metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: Tuple[str, ...] = ()) -> Counter:
+        return self._add(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Tuple[str, ...] = ()) -> Gauge:
+        return self._add(Gauge(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# the one registry, and the metrics the bot records
+registry = Registry()
+
+COMMAND_SECONDS = registry.histogram("bot_command_seconds", "Time from command invoke to completion", ("command",))
+COMMAND_ERRORS = registry.counter("bot_command_errors_total", "Commands that raised an error", ("command",))
+INTERACTIONS = registry.counter("bot_interactions_total", "Interactions received", ("type",))
+POLL_BATCH_SIZE = registry.histogram("bot_poll_vote_batch_size", "Vote clicks a poll handled together",
+                                     buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500))
+INTERACTION_ACK_SECONDS = registry.histogram("bot_interaction_ack_seconds", "Time from a component click reaching the bot to its handler having answered it, by custom_id prefix", ("component",))
+POLL_EDIT_DELAY_SECONDS = registry.histogram("bot_poll_edit_delay_seconds", "Time from the first requested change of a message to the edit being written")
+MESSAGE_EDITS = registry.counter("bot_message_edits_total", "Coalesced message edits by result", ("result",))
+REST_CALLS = registry.counter("bot_rest_calls_total", "REST calls made through the outbound queue", ("route", "priority", "result"))
+REST_SECONDS = registry.histogram("bot_rest_seconds", "Duration of REST calls made through the outbound queue", ("priority",))
+POLL_VIEWS = registry.gauge("bot_poll_views", "Live poll views (one per poll message with a button)")
+OUTBOUND_DEPTH = registry.gauge("bot_outbound_queue_depth", "Actions waiting in the outbound queue")
+NOTIFICATIONS = registry.counter("bot_notifications_total", "Owner notification deliveries by target kind and result", ("target", "result"))
+ANNOUNCEMENTS = registry.counter("bot_announcements_total", "Server open/shutdown announcements by event, target kind and result",
+                                 ("event", "target", "result"))
+ANNOUNCE_SECONDS = registry.histogram("bot_announce_seconds", "Time from a server open/shutdown event to its announcement reaching a target",
+                                      ("event", "target"))
+WATCHER_EVENTS = registry.counter("bot_watcher_events_total", "Watcher rules that fired", ("rule",))
+SCHEDULER_LAG_SECONDS = registry.histogram("bot_scheduler_lag_seconds", "How late scheduled pause/resume transitions ran", ("phase",))
+PROBE_SECONDS = registry.histogram("bot_probe_seconds", "Game server status probes by edition and whether it answered", ("edition", "result"))
+LOG_RECORDS = registry.counter("bot_log_records_total", "Log records by what happened to them (written, dropped, sampled_out, rate_limited)", ("result",))
+LOOP_LAG_SECONDS = registry.histogram("bot_event_loop_lag_seconds", "How late the stall watchdog's callback ran on the event loop",
+                                      buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+LOOP_STALLS = registry.counter("bot_event_loop_stalls_total", "Times the event loop was blocked for longer than BOT_STALL_THRESHOLD_MS")
+GATEWAY_LATENCY_SECONDS = registry.gauge("bot_gateway_latency_seconds", "Heartbeat latency to the Discord gateway")
@@ -0,0 +1,51 @@
+# discord-bot/utils/msgindex.py
+import asyncio
+from typing import Dict
+from utils.storage import atomic_write_json, read_json
+
+
+class MessageIndex:
+    """
+    Small persisted index of the messages the bot owns (e.g. the poll message).
+
+    Each entry remembers the message and channel ID, the state the message was left in
+    and the custom_id of its view, so a restart can fetch the one message it needs
+    instead of scanning channel history.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, dict] = read_json(path, {}) or {}
+        self._save_task: asyncio.Task | None = None
+        self._dirty = False
+
+    def get(self, name: str) -> dict | None:
+        return self.entries.get(name)
+
+    def put(self, name: str, message_id: int, channel_id: int, state: str, custom_id: str | None = None):
+        entry = {"message_id": message_id, "channel_id": channel_id, "state": state, "custom_id": custom_id}
+        if self.entries.get(name) != entry:
+            self.entries[name] = entry
+            self._save()
+
+    def remove(self, name: str):
+        if self.entries.pop(name, None) is not None:
+            self._save()
+
+    def _save(self):
+        self._dirty = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._dirty = False
+            atomic_write_json(self.path, dict(self.entries))
+            return
+        # one writer at a time, so an older copy never lands after a newer one
+        if self._save_task is None or self._save_task.done():
+            self._save_task = loop.create_task(self._save_later())
+
+    async def _save_later(self):
+        while self._dirty:
+            self._dirty = False
+            # don't fsync on the event loop
+            await asyncio.to_thread(atomic_write_json, self.path, dict(self.entries))
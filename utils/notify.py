@@ -0,0 +1,200 @@
+# discord-bot/utils/notify.py
+import time
+import uuid
+import random
+import asyncio
+from typing import Dict, List
+import aiohttp
+import discord
+from bot_app import bot
+from utils import outbound
+from utils.storage import data_path, atomic_write_json, read_json
+from utils.timers import timers
+from utils.metrics import NOTIFICATIONS
+from utils.config import get_config, on_reload
+from utils.log import log
+
+
+class TargetUnavailable(Exception):
+    """A target that can't be reached right now (e.g. the thread isn't cached yet); worth retrying."""
+
+
+def is_transient(e: Exception) -> bool:
+    """Errors that may go away if we try again later."""
+    if isinstance(e, TargetUnavailable):
+        return True
+    if isinstance(e, discord.HTTPException):
+        return e.status == 429 or e.status >= 500
+    return isinstance(e, (aiohttp.ClientError, asyncio.TimeoutError, OSError))
+
+
+class Notifier:
+    """
+    Owner notifications with at-most-once per poll round, retries and a durable outbox.
+
+    notify() drops a notification whose key (the poll round) was already notified within
+    dedupe_window, otherwise puts it in the outbox, which is saved to disk until every
+    target got it, so a restart picks up what is still pending. The targets (thread, DMs,
+    webhooks) are delivered concurrently, at most `concurrency` at a time; targets that
+    fail with a transient error are retried with exponential backoff and jitter until
+    max_attempts.
+    """
+
+    def __init__(self, path: str, dedupe_window: float = 600, max_attempts: int = 8, concurrency: int = 4,
+                 base_delay: float = 1.0, max_delay: float = 300.0):
+        self.path = path
+        self.dedupe_window = dedupe_window
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._semaphore = asyncio.Semaphore(concurrency)
+        # pending deliveries: id -> {"key", "text", "mention", "targets", "attempts", "next_at", "created"}
+        self.outbox: Dict[str, dict] = read_json(path, {}) or {}
+        # round key -> when it was last notified (wall clock)
+        self._notified: Dict[str, float] = {}
+        self._http: aiohttp.ClientSession | None = None
+        self._save_task: asyncio.Task | None = None
+        self._dirty = False
+        self._resumed = False
+
+    # ---- public API ---------------------------------------------------------
+
+    def notify(self, key: str, text: str, mention: str = "", targets: List[str] | None = None) -> bool:
+        """
+        Queue a notification for the poll round `key`. Returns False if that round was
+        already notified (a duplicate), True if it was queued.
+        """
+        now = time.time()
+        last = self._notified.get(key)
+        if last is not None and now - last < self.dedupe_window:
+            NOTIFICATIONS.inc("any", "duplicate")
+            return False
+        self._notified[key] = now
+        entry_id = uuid.uuid4().hex[:12]
+        self.outbox[entry_id] = {
+            "key": key, "text": text, "mention": mention,
+            "targets": list(targets or bot.config.notify_targets),
+            "attempts": 0, "next_at": now, "created": now,
+        }
+        self._save()
+        timers.schedule(self.timer_key(entry_id), 0, self._deliver_entry, entry_id)
+        return True
+
+    def new_round(self, key: str):
+        """The poll reopened: the next threshold crossing is a new notification."""
+        self._notified.pop(key, None)
+
+    def resume(self):
+        """Re-schedule whatever was still in the outbox when the bot stopped (once per process)."""
+        if self._resumed:
+            return
+        self._resumed = True
+        for entry_id, entry in self.outbox.items():
+            self._notified.setdefault(entry["key"], entry["created"])
+            timers.schedule(self.timer_key(entry_id), max(0.0, entry["next_at"] - time.time()), self._deliver_entry, entry_id)
+        if self.outbox:
+            log.info("notify.resumed", f"📬 Resuming {len(self.outbox)} pending notification(s)", pending=len(self.outbox))
+
+    async def close(self):
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+        if self._dirty:
+            atomic_write_json(self.path, dict(self.outbox))
+
+    @staticmethod
+    def timer_key(entry_id: str) -> str:
+        return f"notify:{entry_id}"
+
+    # ---- delivery -----------------------------------------------------------
+
+    async def _deliver_entry(self, entry_id: str):
+        entry = self.outbox.get(entry_id)
+        if entry is None:
+            return
+        entry["attempts"] += 1
+        results = await asyncio.gather(*(self._deliver_target(entry, target) for target in entry["targets"]))
+        entry["targets"] = [target for target, keep in zip(entry["targets"], results) if keep]
+
+        if not entry["targets"]:
+            del self.outbox[entry_id]
+        elif entry["attempts"] >= self.max_attempts:
+            log.error("notify.gave_up", f"❌ Giving up on notification for {entry['key']} after {entry['attempts']} attempts: "
+                      f"{', '.join(entry['targets'])}", round=entry["key"], attempts=entry["attempts"], targets=entry["targets"])
+            for target in entry["targets"]:
+                NOTIFICATIONS.inc(target.partition(":")[0], "gave_up")
+            del self.outbox[entry_id]
+        else:
+            # exponential backoff with full jitter, so retries from a hiccup don't line up
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (entry["attempts"] - 1)))
+            entry["next_at"] = time.time() + delay
+            timers.schedule(self.timer_key(entry_id), delay, self._deliver_entry, entry_id)
+        self._save()
+
+    async def _deliver_target(self, entry: dict, target: str) -> bool:
+        """Send to one target. Returns True if it should be tried again."""
+        kind = target.partition(":")[0]
+        async with self._semaphore:
+            try:
+                await self._send(target, entry)
+            except Exception as e:
+                if is_transient(e):
+                    log.warning("notify.retry", f"⚠️ Notification to {kind} failed (attempt {entry['attempts']}), will retry: {e}",
+                                round=entry["key"], target=kind, attempt=entry["attempts"], error=str(e))
+                    NOTIFICATIONS.inc(kind, "retry")
+                    return True
+                log.error("notify.failed", f"❌ Notification to {kind} failed for good: {e}", round=entry["key"], target=kind, exc=e)
+                NOTIFICATIONS.inc(kind, "failed")
+                return False
+        NOTIFICATIONS.inc(kind, "sent")
+        log.info("notify.sent", f"📧 Notification sent ({kind})", round=entry["key"], target=kind, attempt=entry["attempts"],
+                 latency_ms=round((time.time() - entry["created"]) * 1000, 1))
+        return False
+
+    async def _send(self, target: str, entry: dict):
+        kind, _, arg = target.partition(":")
+        text = f"{entry['mention']} {entry['text']}".strip()
+        if kind == "thread":
+            thread = bot.get_channel(bot.config.notify_thread_id)
+            if thread is None:
+                raise TargetUnavailable("Notify thread not found! Check NOTIFY_THREAD_ID")
+            await outbound.send(thread, text, priority=outbound.NOTIFY)
+        elif kind == "dm":
+            user = bot.get_user(int(arg)) or await bot.fetch_user(int(arg))
+            # a role ping means nothing in a DM
+            await outbound.outbound.call(f"dm:{user.id}", outbound.NOTIFY, lambda: user.send(entry["text"]))
+        elif kind == "webhook":
+            if self._http is None:
+                self._http = aiohttp.ClientSession()
+            webhook = discord.Webhook.from_url(arg, session=self._http)
+            await outbound.outbound.call(f"webhook:{webhook.id}", outbound.NOTIFY, lambda: webhook.send(text))
+        else:
+            raise ValueError(f"unknown notification target {target!r}")
+
+    # ---- persistence --------------------------------------------------------
+
+    def _save(self):
+        self._dirty = True
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.get_running_loop().create_task(self._save_later())
+
+    async def _save_later(self):
+        # one writer at a time, so an older outbox never lands after a newer one
+        while self._dirty:
+            self._dirty = False
+            await asyncio.to_thread(atomic_write_json, self.path, dict(self.outbox))
+
+
+# single notifier for the whole bot
+notifier = Notifier(data_path("outbox.json"), dedupe_window=get_config().notify_dedupe_seconds,
+                    max_attempts=get_config().notify_max_attempts, concurrency=get_config().notify_concurrency)
+
+
+def _apply_config(old, new):
+    notifier.dedupe_window = new.notify_dedupe_seconds
+    notifier.max_attempts = new.notify_max_attempts
+    if new.notify_concurrency != old.notify_concurrency:
+        notifier._semaphore = asyncio.Semaphore(new.notify_concurrency)
+
+
+on_reload(_apply_config)
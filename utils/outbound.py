@@ -0,0 +1,364 @@
+# discord-bot/utils/outbound.py
+import time
+import asyncio
+import itertools
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Tuple
+import discord
+from utils.metrics import REST_CALLS, REST_SECONDS, OUTBOUND_DEPTH
+
+# Priority classes, most urgent first
+NOTIFY = 0       # owner notifications
+CREDENTIALS = 1  # server credentials / status announcements
+POLL = 2         # poll edits and other cosmetic messages
+ROLES = 3        # role subscription changes
+CLEANUP = 4      # deleting old bot messages
+PRIORITY_NAMES = {NOTIFY: "notify", CREDENTIALS: "credentials", POLL: "poll", ROLES: "roles", CLEANUP: "cleanup"}
+
+
+class Bucket:
+    """What we know about one rate-limit bucket: how many calls are left until reset_at (monotonic)."""
+    __slots__ = ("limit", "remaining", "reset_at")
+
+    def __init__(self, limit: int, per: float, now: float):
+        self.limit = limit
+        self.remaining = limit
+        self.reset_at = now + per
+
+    def wait_time(self, now: float) -> float:
+        if now >= self.reset_at or self.remaining > 0:
+            return 0.0
+        return self.reset_at - now
+
+    def take(self, now: float, per: float):
+        if now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = now + per
+        self.remaining -= 1
+
+    def update(self, headers: Mapping[str, str], now: float):
+        """Adopt Discord's numbers from X-RateLimit-* response headers."""
+        try:
+            if "X-RateLimit-Limit" in headers:
+                self.limit = int(headers["X-RateLimit-Limit"])
+            if "X-RateLimit-Remaining" in headers:
+                self.remaining = int(headers["X-RateLimit-Remaining"])
+            if "X-RateLimit-Reset-After" in headers:
+                self.reset_at = now + float(headers["X-RateLimit-Reset-After"])
+            elif "Retry-After" in headers:
+                self.remaining = 0
+                self.reset_at = now + float(headers["Retry-After"])
+        except ValueError:
+            pass
+
+
+class Action:
+    __slots__ = ("priority", "route", "key", "factory", "future", "enqueued_at", "job", "finish")
+
+    def __init__(self, priority: int, route: str, key, factory: Callable[[], Awaitable[Any]], future: asyncio.Future, now: float,
+                 job: tuple | None = None, finish: Callable[[Any], Any] | None = None):
+        self.priority = priority
+        self.route = route
+        self.key = key
+        self.factory = factory
+        self.future = future
+        self.enqueued_at = now
+        # the same call as plain data (see utils/workers.py), for a worker process to make instead
+        self.job = job
+        self.finish = finish
+
+
+class DiscordBackend:
+    """
+    Runs the action against Discord through discord.py. discord.py doesn't hand back the
+    headers of successful calls, so only errors (429s) feed bucket numbers back; the rest
+    of the time the queue counts calls against its local per-route limits.
+    """
+
+    async def perform(self, action: Action) -> Tuple[Any, Mapping[str, str] | None]:
+        try:
+            return await action.factory(), None
+        except discord.HTTPException as e:
+            response = getattr(e, "response", None)
+            e.ratelimit_headers = dict(getattr(response, "headers", {}) or {})
+            raise
+
+
+class FakeBackend:
+    """
+    Offline stand-in for Discord: each route allows `limit` calls per `per` seconds, answers
+    with X-RateLimit-* headers and counts the calls that would have been 429'd. Actions are
+    still run, so pass factories that don't touch the network.
+    """
+
+    def __init__(self, limit: int = 5, per: float = 5.0, latency: float = 0.0):
+        self.limit = limit
+        self.per = per
+        self.latency = latency
+        self.windows: Dict[str, Tuple[float, int]] = {}
+        self.calls: List[Tuple[str, int]] = []
+        self.throttled = 0
+
+    async def perform(self, action: Action):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        now = time.monotonic()
+        start, used = self.windows.get(action.route, (now, 0))
+        if now - start >= self.per:
+            start, used = now, 0
+        used += 1
+        self.windows[action.route] = (start, used)
+        self.calls.append((action.route, action.priority))
+        if used > self.limit:
+            self.throttled += 1
+        result = await action.factory()
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(max(0, self.limit - used)),
+            "X-RateLimit-Reset-After": f"{max(0.0, self.per - (now - start)):.3f}",
+        }
+        return result, headers
+
+
+class OutboundQueue:
+    """
+    Every send/edit/delete the bot makes goes through here. Actions wait in per-priority
+    queues; the dispatcher always starts the most urgent action whose route bucket has room,
+    so an owner notification overtakes cosmetic poll edits when Discord is throttling us.
+    Submitting an action with the same key as a pending one replaces it (superseded edits).
+    """
+
+    def __init__(self, backend=None, default_limit: int = 5, default_per: float = 5.0, max_in_flight: int = 4):
+        self.backend = backend or DiscordBackend()
+        self.default_limit = default_limit
+        self.default_per = default_per
+        self._queues: Dict[int, List[Action]] = {p: [] for p in PRIORITY_NAMES}
+        self._by_key: Dict[Any, Action] = {}
+        self._buckets: Dict[str, Bucket] = {}
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._wakeup: asyncio.Event | None = None
+        self._dispatcher: asyncio.Task | None = None
+        self._tasks: set = set()
+        # metrics
+        self.sent = {p: 0 for p in PRIORITY_NAMES}
+        self.failed = {p: 0 for p in PRIORITY_NAMES}
+        self.superseded = 0
+        self.throttled = 0
+        self.wait_total = {p: 0.0 for p in PRIORITY_NAMES}
+        self.wait_max = {p: 0.0 for p in PRIORITY_NAMES}
+
+    def submit(self, route: str, priority: int, factory: Callable[[], Awaitable[Any]], key=None,
+               job: tuple | None = None, finish: Callable[[Any], Any] | None = None) -> asyncio.Future:
+        """
+        Queue factory() (a zero-arg callable returning a coroutine) on route. Returns a future
+        with its result; a superseded action's future resolves to None.
+
+        job/finish optionally describe the same call as data, so a WorkerBackend can hand it
+        to a worker process: finish(raw result) turns the worker's answer into what factory()
+        would have returned.
+        """
+        loop = asyncio.get_running_loop()
+        action = Action(priority, route, key, factory, loop.create_future(), time.monotonic(), job, finish)
+        if key is not None:
+            old = self._by_key.pop(key, None)
+            if old is not None and not old.future.done():
+                self._queues[old.priority].remove(old)
+                old.future.set_result(None)
+                self.superseded += 1
+            self._by_key[key] = action
+        self._queues[priority].append(action)
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = loop.create_task(self._dispatch())
+        self._wakeup.set()
+        return action.future
+
+    async def call(self, route: str, priority: int, factory: Callable[[], Awaitable[Any]], key=None,
+                   job: tuple | None = None, finish: Callable[[Any], Any] | None = None):
+        """submit() and wait for the result (exceptions are re-raised here)."""
+        return await self.submit(route, priority, factory, key, job, finish)
+
+    async def drain(self):
+        """Wait until nothing is queued or in flight."""
+        while self.depth() or self._tasks:
+            await asyncio.sleep(0.05)
+
+    def clear(self) -> int:
+        """Cancel everything still queued (in-flight calls finish). Returns how many were dropped."""
+        dropped = 0
+        for queue in self._queues.values():
+            for action in queue:
+                action.future.cancel()
+                dropped += 1
+            queue.clear()
+        self._by_key.clear()
+        return dropped
+
+    def depth(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    def stats(self) -> dict:
+        return {
+            PRIORITY_NAMES[p]: {
+                "queued": len(self._queues[p]),
+                "sent": self.sent[p],
+                "failed": self.failed[p],
+                "avg_wait_ms": (self.wait_total[p] / self.sent[p] * 1000) if self.sent[p] else 0.0,
+                "max_wait_ms": self.wait_max[p] * 1000,
+            } for p in PRIORITY_NAMES
+        } | {"superseded": self.superseded, "throttled": self.throttled}
+
+    # ---- dispatcher ---------------------------------------------------------
+
+    def _bucket(self, route: str, now: float) -> Bucket:
+        bucket = self._buckets.get(route)
+        if bucket is None:
+            bucket = self._buckets[route] = Bucket(self.default_limit, self.default_per, now)
+        return bucket
+
+    def _next_ready(self, now: float) -> Tuple[Action | None, float]:
+        """Most urgent action whose bucket has room, else how long until one will."""
+        soonest = float("inf")
+        for priority in sorted(self._queues):
+            for action in self._queues[priority]:
+                wait = self._bucket(action.route, now).wait_time(now)
+                if wait == 0.0:
+                    return action, 0.0
+                soonest = min(soonest, wait)
+        return None, soonest
+
+    async def _dispatch(self):
+        while self.depth():
+            self._wakeup.clear()
+            now = time.monotonic()
+            action, wait = self._next_ready(now)
+            if action is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._slots.acquire()
+            # it may have been superseded while we waited for a slot
+            if action not in self._queues[action.priority]:
+                self._slots.release()
+                continue
+            self._queues[action.priority].remove(action)
+            if action.key is not None and self._by_key.get(action.key) is action:
+                del self._by_key[action.key]
+            self._bucket(action.route, now).take(now, self.default_per)
+            waited = now - action.enqueued_at
+            self.wait_total[action.priority] += waited
+            self.wait_max[action.priority] = max(self.wait_max[action.priority], waited)
+            task = asyncio.create_task(self._run(action))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, action: Action):
+        started = time.perf_counter()
+        priority = PRIORITY_NAMES[action.priority]
+        try:
+            result, headers = await self.backend.perform(action)
+            if headers:
+                self._bucket(action.route, time.monotonic()).update(headers, time.monotonic())
+            self.sent[action.priority] += 1
+            REST_CALLS.inc(action.route, priority, "ok")
+            if not action.future.done():
+                action.future.set_result(result)
+        except Exception as e:
+            headers = getattr(e, "ratelimit_headers", None)
+            if headers:
+                self._bucket(action.route, time.monotonic()).update(headers, time.monotonic())
+            throttled = isinstance(e, discord.HTTPException) and e.status == 429
+            if throttled:
+                self.throttled += 1
+            self.failed[action.priority] += 1
+            REST_CALLS.inc(action.route, priority, "throttled" if throttled else "error")
+            if not action.future.done():
+                action.future.set_exception(e)
+        finally:
+            REST_SECONDS.observe(time.perf_counter() - started, priority)
+            self._slots.release()
+            if self._wakeup is not None:
+                self._wakeup.set()
+
+
+# single outbound queue for the whole bot
+outbound = OutboundQueue()
+OUTBOUND_DEPTH.set_function(outbound.depth)
+
+
+def channel_route(channel_id: int) -> str:
+    # Discord's message limits are per channel, so that is the bucket we account against
+    return f"channel:{channel_id}"
+
+
+def member_route(guild_id: int) -> str:
+    # member edits share one bucket per guild
+    return f"members:{guild_id}"
+
+
+# ---- jobs: calls a worker process can make (BOT_WORKERS) ------------------------
+
+def message_payload(kwargs: dict) -> dict | None:
+    """
+    The JSON body Discord gets for send()/edit() with these arguments, or None when one of
+    them (files, embeds, ...) isn't covered; such calls always run in this process.
+    """
+    if not set(kwargs) <= {"content", "view", "allowed_mentions"}:
+        return None
+    payload = {}
+    if "content" in kwargs:
+        payload["content"] = kwargs["content"]
+    if "view" in kwargs:
+        view = kwargs["view"]
+        payload["components"] = view.to_components() if view is not None else []
+    if kwargs.get("allowed_mentions") is not None:
+        payload["allowed_mentions"] = kwargs["allowed_mentions"].to_dict()
+    return payload
+
+
+def state_of(obj):
+    """discord.py's connection state behind a channel or message; None for anything else (fakes)."""
+    state = getattr(obj, "_state", None)
+    return state if isinstance(state, discord.state.ConnectionState) else None
+
+
+def _keep_view(state, view, message_id: int):
+    # what discord.py does after send/edit, so the buttons on the message keep working
+    if view is not None and not view.is_finished():
+        state.store_view(view, message_id)
+
+
+def _sent(channel, view, data: dict) -> discord.Message:
+    message = discord.Message(state=channel._state, channel=channel, data=data)
+    _keep_view(channel._state, view, message.id)
+    return message
+
+
+def _edited(message, view, data: dict) -> discord.Message:
+    _keep_view(message._state, view, message.id)
+    return discord.Message(state=message._state, channel=message.channel, data=data)
+
+
+async def send(channel, content=None, priority: int = POLL, **kwargs):
+    """channel.send() through the outbound queue."""
+    payload = message_payload({"content": content, **kwargs}) if state_of(channel) else None
+    return await outbound.call(channel_route(channel.id), priority, lambda: channel.send(content, **kwargs),
+                               job=("send", channel.id, payload) if payload is not None else None,
+                               finish=lambda data: _sent(channel, kwargs.get("view"), data))
+
+
+async def delete(message, priority: int = CLEANUP):
+    """message.delete() through the outbound queue."""
+    return await outbound.call(channel_route(message.channel.id), priority, message.delete,
+                               job=("delete", message.channel.id, message.id) if state_of(message) else None)
+
+
+async def edit(message, priority: int = POLL, **kwargs):
+    """message.edit() through the outbound queue; a newer edit of the same message replaces a queued one."""
+    payload = message_payload(kwargs) if state_of(message) else None
+    return await outbound.call(channel_route(message.channel.id), priority, lambda: message.edit(**kwargs),
+                               key=("edit", message.id),
+                               job=("edit", message.channel.id, message.id, payload) if payload is not None else None,
+                               finish=lambda data: _edited(message, kwargs.get("view"), data))
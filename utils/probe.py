@@ -0,0 +1,202 @@
+# discord-bot/utils/probe.py
+import os
+import json
+import time
+import struct
+import asyncio
+from dataclasses import dataclass
+from utils.metrics import PROBE_SECONDS
+
+# RakNet "offline message" marker every unconnected ping/pong carries
+RAKNET_MAGIC = bytes.fromhex("00ffff00fefefefefdfdfdfd12345678")
+UNCONNECTED_PING = 0x01
+UNCONNECTED_PONG = 0x1C
+# protocol version sent in the Java handshake; servers answer a status request for any version
+JAVA_PROTOCOL = 47
+
+
+@dataclass(frozen=True)
+class ServerStatus:
+    """One probe result. `edition` says which protocol answered ("java", "bedrock" or "" when offline)."""
+    online: bool
+    edition: str = ""
+    players: int = 0
+    max_players: int = 0
+    latency_ms: float = 0.0
+    version: str = ""
+    motd: str = ""
+    checked_at: float = 0.0
+    error: str = ""
+
+
+class ProbeError(Exception):
+    """The server answered with something that isn't a status response."""
+
+
+# ---- Java edition: server list ping over TCP -----------------------------------------
+
+def _varint(value: int) -> bytes:
+    value &= 0xFFFFFFFF
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+async def _read_varint(reader: asyncio.StreamReader) -> int:
+    value = 0
+    for shift in range(0, 35, 7):
+        byte = (await reader.readexactly(1))[0]
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value
+    raise ProbeError("varint too long")
+
+
+def _packet(packet_id: int, payload: bytes = b"") -> bytes:
+    body = _varint(packet_id) + payload
+    return _varint(len(body)) + body
+
+
+def _text(component) -> str:
+    """Plain text of a chat component (the motd may be a string or nested dicts)."""
+    if isinstance(component, str):
+        return component
+    if isinstance(component, dict):
+        return component.get("text", "") + "".join(_text(c) for c in component.get("extra", []))
+    if isinstance(component, list):
+        return "".join(_text(c) for c in component)
+    return ""
+
+
+async def java_status(host: str, port: int, timeout: float = 3.0) -> ServerStatus:
+    """Handshake + status request; the latency is the status round trip."""
+    async def exchange():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            address = host.encode()
+            handshake = _varint(JAVA_PROTOCOL) + _varint(len(address)) + address + struct.pack(">H", port) + _varint(1)
+            started = time.perf_counter()
+            writer.write(_packet(0x00, handshake) + _packet(0x00))
+            await writer.drain()
+            await _read_varint(reader)  # packet length
+            if await _read_varint(reader) != 0x00:
+                raise ProbeError("unexpected packet id")
+            data = await reader.readexactly(await _read_varint(reader))
+            return json.loads(data.decode("utf-8")), (time.perf_counter() - started) * 1000
+        finally:
+            writer.close()
+
+    data, latency = await asyncio.wait_for(exchange(), timeout)
+    players = data.get("players") or {}
+    return ServerStatus(
+        online=True, edition="java", players=int(players.get("online", 0)), max_players=int(players.get("max", 0)),
+        latency_ms=latency, version=str((data.get("version") or {}).get("name", "")),
+        motd=_text(data.get("description", "")), checked_at=time.time(),
+    )
+
+
+# ---- Bedrock edition: RakNet unconnected ping over UDP -------------------------------
+
+class _PongProtocol(asyncio.DatagramProtocol):
+    def __init__(self):
+        self.answer = asyncio.get_running_loop().create_future()
+
+    def datagram_received(self, data, addr):
+        if not self.answer.done() and data[:1] == bytes([UNCONNECTED_PONG]):
+            self.answer.set_result(data)
+
+    def error_received(self, exc):
+        if not self.answer.done():
+            self.answer.set_exception(exc)
+
+
+async def bedrock_status(host: str, port: int, timeout: float = 3.0) -> ServerStatus:
+    """
+    One unconnected ping. The pong carries "MCPE;motd;protocol;version;players;max;..."
+    after the magic. UDP has no connection, so an offline server shows up as a timeout.
+    """
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(_PongProtocol, remote_addr=(host, port))
+    try:
+        started = time.perf_counter()
+        ping = struct.pack(">Bq", UNCONNECTED_PING, int(time.monotonic() * 1000)) + RAKNET_MAGIC + os.urandom(8)
+        transport.sendto(ping)
+        data = await asyncio.wait_for(protocol.answer, timeout)
+        latency = (time.perf_counter() - started) * 1000
+    finally:
+        transport.close()
+
+    # id (1) + ping time (8) + server guid (8) + magic (16) + string length (2)
+    offset = 1 + 8 + 8 + len(RAKNET_MAGIC)
+    if data[17:offset] != RAKNET_MAGIC or len(data) < offset + 2:
+        raise ProbeError("malformed pong")
+    (length,) = struct.unpack_from(">H", data, offset)
+    fields = data[offset + 2:offset + 2 + length].decode("utf-8", "replace").split(";")
+    if len(fields) < 6:
+        raise ProbeError("short server id string")
+    return ServerStatus(
+        online=True, edition="bedrock", players=int(fields[4]), max_players=int(fields[5]),
+        latency_ms=latency, version=fields[3], motd=fields[1], checked_at=time.time(),
+    )
+
+
+# ---- both, cached ---------------------------------------------------------------------
+
+class StatusProber:
+    """
+    Probes the Java and Bedrock ports at the same time; the server counts as online if
+    either answers. The last result is cached for `ttl` seconds and concurrent callers
+    share one probe in flight, so commands and the schedule never stampede the server.
+    """
+
+    def __init__(self, host: str, java_port: int = 25565, bedrock_port: int = 19132, timeout: float = 3.0, ttl: float = 15.0):
+        self.host = host
+        self.java_port = java_port
+        self.bedrock_port = bedrock_port
+        self.timeout = timeout
+        self.ttl = ttl
+        self.last: ServerStatus | None = None
+        self._inflight: asyncio.Task | None = None
+
+    async def status(self, max_age: float | None = None) -> ServerStatus:
+        """The cached status if it is younger than max_age (default ttl), else a fresh probe."""
+        max_age = self.ttl if max_age is None else max_age
+        if self.last is not None and time.time() - self.last.checked_at < max_age:
+            return self.last
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.create_task(self.probe())
+        return await asyncio.shield(self._inflight)
+
+    async def probe(self) -> ServerStatus:
+        attempts = []
+        if self.java_port:
+            attempts.append(self._timed("java", java_status(self.host, self.java_port, self.timeout)))
+        if self.bedrock_port:
+            attempts.append(self._timed("bedrock", bedrock_status(self.host, self.bedrock_port, self.timeout)))
+        results = await asyncio.gather(*attempts, return_exceptions=True)
+
+        answers = [r for r in results if isinstance(r, ServerStatus)]
+        if answers:
+            # Java reports the richer status; both count the same players on a Geyser setup
+            status = answers[0]
+        else:
+            errors = "; ".join(f"{type(e).__name__}: {e}" if str(e) else type(e).__name__ for e in results)
+            status = ServerStatus(online=False, checked_at=time.time(), error=errors)
+        self.last = status
+        return status
+
+    async def _timed(self, edition: str, coro) -> ServerStatus:
+        started = time.perf_counter()
+        try:
+            result = await coro
+        except Exception:
+            PROBE_SECONDS.observe(time.perf_counter() - started, edition, "down")
+            raise
+        PROBE_SECONDS.observe(time.perf_counter() - started, edition, "up")
+        return result
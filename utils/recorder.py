@@ -0,0 +1,98 @@
+# discord-bot/utils/recorder.py
+import json
+import time
+import asyncio
+from typing import Iterator, List
+
+# dispatch events worth recording: everything the cogs react to arrives as one of these
+RECORDED_EVENTS = ("message", "interaction")
+
+
+def _author(user) -> list:
+    """[id, name, bot, administrator] — all replay needs to rebuild the author."""
+    perms = getattr(user, "guild_permissions", None)
+    return [user.id, user.name, bool(user.bot), bool(perms.administrator) if perms is not None else False]
+
+
+def encode_event(event: str, obj, now: float) -> dict | None:
+    """One dispatch event as a compact dict (None for events that aren't recorded)."""
+    if event == "message":
+        record = {"t": round(now, 3), "e": "message", "id": obj.id, "c": obj.channel.id,
+                  "g": obj.guild.id if obj.guild else 0, "a": _author(obj.author)}
+        if obj.content:
+            record["x"] = obj.content
+        if obj.embeds:
+            record["m"] = [embed.to_dict() for embed in obj.embeds]
+        return record
+    if event == "interaction":
+        data = obj.data or {}
+        record = {"t": round(now, 3), "e": "interaction", "id": obj.id, "c": obj.channel_id or 0,
+                  "g": obj.guild_id or 0, "a": _author(obj.user), "k": data.get("custom_id", "")}
+        if obj.message is not None:
+            record["mid"] = obj.message.id
+        return record
+    return None
+
+
+class EventRecorder:
+    """
+    Appends incoming dispatch events to a line-delimited JSON log. Recording only
+    buffers; a background task writes the buffer once a second in a worker thread.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 1.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.recorded = 0
+        self._buffer: List[str] = []
+        self._flusher: asyncio.Task | None = None
+
+    def start(self, **header):
+        """Write the header line (start time plus whatever replay needs to know, like the poll channels)."""
+        self._buffer.append(json.dumps({"t": round(time.time(), 3), "e": "start", **header}, separators=(",", ":")))
+        self.flush_now()
+
+    def record(self, event: str, args: tuple):
+        if event not in RECORDED_EVENTS or not args:
+            return
+        try:
+            record = encode_event(event, args[0], time.time())
+        except Exception as e:
+            # imported here: read_events() is used by the replay tool before there is a config
+            from utils.log import log
+            log.warning("recorder.failed", f"❌ Could not record {event} event: {e}", error=str(e))
+            return
+        self._buffer.append(json.dumps(record, separators=(",", ":"), ensure_ascii=False))
+        self.recorded += 1
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush_now()
+            return
+        if self._flusher is None or self._flusher.done():
+            self._flusher = loop.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        while self._buffer:
+            await asyncio.sleep(self.flush_interval)
+            lines, self._buffer = self._buffer, []
+            await asyncio.to_thread(self._append, lines)
+
+    def flush_now(self):
+        lines, self._buffer = self._buffer, []
+        self._append(lines)
+
+    def _append(self, lines: List[str]):
+        if lines:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+
+
+def read_events(path: str) -> Iterator[dict]:
+    """Events of a recording in order (stops at a torn last line)."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                break
@@ -0,0 +1,158 @@
+# discord-bot/utils/rolesync.py
+import time
+import asyncio
+from typing import Dict, List, Tuple
+import discord
+from utils.outbound import outbound, member_route, ROLES
+from utils.log import log
+
+
+class RoleWorker:
+    """
+    Applies self-service role changes in batches. Clicks only record the state a member
+    wants per role; once the member has been quiet for `debounce` seconds, everything
+    pending for them is merged into one Member.edit(roles=...) call. On/off/on collapses
+    into "on", and a change that matches the roles the member already has is dropped.
+
+    Every request returns a future that resolves once its batch has been written: to None
+    when the member has the wanted roles, or to the exception Discord refused the edit with.
+    """
+
+    def __init__(self, debounce: float = 2.0):
+        self.debounce = debounce
+        # (guild_id, member_id) -> (member, {role_id: wanted})
+        self._pending: Dict[Tuple[int, int], Tuple[object, Dict[int, bool]]] = {}
+        self._last_change: Dict[Tuple[int, int], float] = {}
+        self._tasks: Dict[Tuple[int, int], asyncio.Task] = {}
+        # futures handed out for the pending changes, resolved when they are applied
+        self._waiters: Dict[Tuple[int, int], List[asyncio.Future]] = {}
+        # changes being written right now (member.roles catches up when Discord confirms)
+        self._inflight: Dict[Tuple[int, int], Dict[int, bool]] = {}
+        self.requests = 0
+        self.edits_sent = 0
+        self.edits_skipped = 0
+        self.edits_failed = 0
+
+    def wanted(self, member, role_id: int) -> bool:
+        """Whether member will have the role once pending changes are applied."""
+        key = (member.guild.id, member.id)
+        pending = self._pending.get(key)
+        if pending is not None and role_id in pending[1]:
+            return pending[1][role_id]
+        if role_id in self._inflight.get(key, {}):
+            return self._inflight[key][role_id]
+        return any(r.id == role_id for r in member.roles)
+
+    def request(self, member, role_id: int, wanted: bool) -> asyncio.Future:
+        """
+        Record that member wants (or doesn't want) role_id. Returns immediately, with a future
+        that resolves to None once it is applied, or to the exception if the edit failed.
+        """
+        key = (member.guild.id, member.id)
+        _, changes = self._pending.get(key, (member, {}))
+        changes[role_id] = wanted
+        self._pending[key] = (member, changes)
+        self._last_change[key] = time.monotonic()
+        applied = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(key, []).append(applied)
+        self.requests += 1
+        if key not in self._tasks:
+            self._tasks[key] = asyncio.create_task(self._flusher(key))
+        return applied
+
+    def toggle(self, member, role_id: int) -> Tuple[bool, asyncio.Future]:
+        """
+        Flip the role for member (taking pending clicks into account). Returns the new wanted
+        state and the future from request().
+        """
+        wanted = not self.wanted(member, role_id)
+        return wanted, self.request(member, role_id, wanted)
+
+    async def flush(self):
+        """Apply everything pending without waiting for members to stop clicking (e.g. on shutdown)."""
+        debounce, self.debounce = self.debounce, 0
+        try:
+            if self._tasks:
+                await asyncio.gather(*list(self._tasks.values()), return_exceptions=True)
+        finally:
+            self.debounce = debounce
+
+    def stats(self) -> dict:
+        return {"requests": self.requests, "pending": len(self._pending), "edits_sent": self.edits_sent,
+                "edits_skipped": self.edits_skipped, "edits_failed": self.edits_failed}
+
+    async def _flusher(self, key: Tuple[int, int]):
+        try:
+            while key in self._pending:
+                wait = self._last_change.get(key, 0.0) + self.debounce - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                    continue
+                member, changes = self._pending.pop(key)
+                waiters = self._waiters.pop(key, [])
+                self._last_change.pop(key, None)
+                self._inflight[key] = changes
+                error: Exception | None = RuntimeError("the role update was interrupted")
+                try:
+                    error = await self._apply(member, changes)
+                finally:
+                    self._inflight.pop(key, None)
+                    for applied in waiters:
+                        if not applied.done():
+                            applied.set_result(error)
+        finally:
+            self._tasks.pop(key, None)
+
+    async def _fresh_member(self, member):
+        """
+        The member as Discord has it now: from the cache, or fetched when members aren't
+        cached (BOT_PROFILE=lean). Falls back to the member from the click. None if they left.
+        """
+        guild = member.guild
+        cached = guild.get_member(member.id)
+        if cached is not None:
+            return cached
+        try:
+            return await outbound.call(member_route(guild.id), ROLES, lambda: guild.fetch_member(member.id))
+        except discord.NotFound:
+            return None
+        except Exception as e:
+            log.warning("roles.fetch_failed", f"⚠️ Could not fetch {member}, using their roles from the click: {e}",
+                        guild=guild.id, user=member.id, error=str(e))
+            return member
+
+    async def _apply(self, member, changes: Dict[int, bool]) -> Exception | None:
+        """Write changes in one edit. Returns the exception if Discord refused it."""
+        guild = member.guild
+        # roles may have changed since the click (other bots, admins, our previous batch)
+        member = await self._fresh_member(member)
+        if member is None:
+            self.edits_skipped += 1
+            return None
+        current = {r.id for r in member.roles if not r.is_default()}
+        target = set(current)
+        for role_id, wanted in changes.items():
+            if wanted:
+                target.add(role_id)
+            else:
+                target.discard(role_id)
+        if target == current:
+            self.edits_skipped += 1
+            return None
+        roles = [r for r in (guild.get_role(rid) for rid in target) if r is not None]
+        try:
+            await outbound.call(member_route(guild.id), ROLES,
+                                lambda: member.edit(roles=roles, reason="Self-service role menu"))
+            self.edits_sent += 1
+        except Exception as e:
+            self.edits_failed += 1
+            log.warning("roles.failed", f"❌ Failed to update roles of {member}: {e}", guild=guild.id, user=member.id, error=str(e))
+            return e
+        return None
+
+
+def failure_reason(error: Exception) -> str:
+    """What to tell a member whose role change failed."""
+    if isinstance(error, discord.Forbidden):
+        return "I'm not allowed to manage that role (missing permissions, or it is above mine)"
+    return str(error) or type(error).__name__
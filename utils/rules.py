@@ -0,0 +1,186 @@
+# discord-bot/utils/rules.py
+import re
+import time
+from typing import Dict, List, Tuple
+from utils.storage import read_json
+from utils.log import log
+
+# what a rule can look at, besides "field:<embed field name>"
+FIELDS = ("content", "description", "title", "footer", "author")
+
+
+def _field_value(message, embed, field: str) -> str | None:
+    """Pull the text a rule looks at out of a message/embed."""
+    if field == "content":
+        return message.content
+    if embed is None:
+        return None
+    if field == "description":
+        return embed.description
+    if field == "title":
+        return embed.title
+    if field == "footer":
+        return embed.footer.text if embed.footer else None
+    if field == "author":
+        return embed.author.name if embed.author else None
+    if field.startswith("field:"):
+        name = field[len("field:"):].lower()
+        for f in embed.fields:
+            if (f.name or "").lower() == name:
+                return f.value
+    return None
+
+
+class Rule:
+    """
+    One watcher rule: messages in channel_id from author whose field matches pattern
+    trigger action. Counts how often it was evaluated, how often it hit and how long that took.
+    """
+    __slots__ = ("name", "channel_id", "author", "field", "pattern", "contains", "action", "params",
+                 "evaluations", "hits", "total_ns")
+
+    def __init__(self, name: str, channel_id: int, author, field: str, pattern: re.Pattern, action: str, params: dict,
+                 contains: Tuple[str, ...] | None = None):
+        self.name = name
+        self.channel_id = channel_id
+        self.author = author
+        self.field = field
+        self.pattern = pattern
+        # "contains" rules: casefolded substrings that must all appear, checked before the pattern
+        self.contains = contains
+        self.action = action
+        self.params = params
+        self.evaluations = 0
+        self.hits = 0
+        self.total_ns = 0
+
+    @classmethod
+    def compile(cls, spec: dict, default_channel_id: int) -> "Rule":
+        """
+        Build a rule from its table entry. The pattern is either "pattern" (a regex) or
+        "contains" (a list of substrings that must all appear); both are case-insensitive.
+        """
+        contains = None
+        if "pattern" in spec:
+            source = spec["pattern"]
+        else:
+            parts = spec["contains"]
+            if not isinstance(parts, list) or not all(isinstance(part, str) for part in parts):
+                raise ValueError("contains must be a list of strings")
+            # plain substring checks; the pattern only finds the first part, for the action's {match}
+            contains = tuple(part.casefold() for part in parts)
+            source = re.escape(parts[0]) if parts else ""
+        author = spec.get("author", "bot")
+        if author not in ("bot", "any"):
+            try:
+                author = int(author)
+            except (TypeError, ValueError):
+                raise ValueError(f'author must be "bot", "any" or a user ID, not {author!r}') from None
+        field = spec.get("field", "description")
+        if field not in FIELDS and not (isinstance(field, str) and field.startswith("field:")):
+            raise ValueError(f"unknown field {field!r}, use one of {', '.join(FIELDS)} or field:<name>")
+        known = {"name", "channel_id", "author", "field", "pattern", "contains", "action"}
+        return cls(
+            name=spec["name"],
+            channel_id=int(spec.get("channel_id") or default_channel_id),
+            author=author,
+            field=field,
+            pattern=re.compile(source, re.IGNORECASE | re.DOTALL),
+            action=spec["action"],
+            params={k: v for k, v in spec.items() if k not in known},
+            contains=contains,
+        )
+
+    def author_ok(self, author) -> bool:
+        if self.author == "any":
+            return True
+        if self.author == "bot":
+            return author.bot
+        return author.id == self.author
+
+    def match(self, message, embed) -> re.Match | None:
+        start = time.perf_counter_ns()
+        self.evaluations += 1
+        found = None
+        if self.author_ok(message.author):
+            text = _field_value(message, embed, self.field)
+            if text and (self.contains is None or all(part in text.casefold() for part in self.contains)):
+                found = self.pattern.search(text)
+        if found:
+            self.hits += 1
+        self.total_ns += time.perf_counter_ns() - start
+        return found
+
+
+class RuleEngine:
+    """
+    Rules compiled into a channel-ID keyed index, so a message from a channel no rule
+    watches is rejected with one dict lookup.
+    """
+
+    def __init__(self, rules: List[Rule]):
+        self.rules = rules
+        self.by_channel: Dict[int, List[Rule]] = {}
+        for rule in rules:
+            self.by_channel.setdefault(rule.channel_id, []).append(rule)
+        # rules that look at message content instead of embeds
+        self._needs_content = {cid: any(r.field == "content" for r in rs) for cid, rs in self.by_channel.items()}
+
+    @classmethod
+    def load(cls, defaults: List[dict], path: str | None, default_channel_id: int) -> "RuleEngine":
+        """
+        Compile the built-in rules plus the ones in the JSON file at path (same name replaces a built-in).
+        A rule that doesn't compile (missing key, bad regex, ...) is logged with its place and skipped.
+        """
+        specs = {spec["name"]: ("built-in rules", index, spec) for index, spec in enumerate(defaults)}
+        if path:
+            extra = read_json(path, None)
+            if extra is None:
+                log.info("watcher.no_rules_file", f"ℹ️ No watcher rules file at {path}, using built-in rules only", path=path)
+            elif not isinstance(extra, list):
+                log.error("watcher.bad_rules_file", f"❌ {path} must hold a list of rules, using built-in rules only", path=path)
+                extra = None
+            for index, spec in enumerate(extra or []):
+                name = spec.get("name") if isinstance(spec, dict) else None
+                if not isinstance(name, str):
+                    log.error("watcher.bad_rule", f"❌ Skipping rule #{index} in {path}: it has no name", path=path, index=index)
+                    continue
+                specs[name] = (path, index, spec)
+
+        rules = []
+        for source, index, spec in specs.values():
+            try:
+                rules.append(Rule.compile(spec, default_channel_id))
+            except (KeyError, TypeError, ValueError, re.error) as e:
+                problem = f"missing {e.args[0]!r}" if isinstance(e, KeyError) else str(e)
+                log.error("watcher.bad_rule", f"❌ Skipping rule {spec['name']!r} (#{index} in {source}): {problem}",
+                          path=source, index=index, rule=spec["name"], error=problem)
+        return cls(rules)
+
+    def evaluate(self, message) -> List[Tuple[Rule, object, re.Match]]:
+        """Every (rule, embed, match) that fires for message; at most one rule per embed."""
+        rules = self.by_channel.get(message.channel.id)
+        if not rules:
+            return []
+        fired = []
+        targets = list(message.embeds)
+        if self._needs_content.get(message.channel.id):
+            targets.append(None)
+        for embed in targets:
+            for rule in rules:
+                if (rule.field == "content") != (embed is None):
+                    continue
+                found = rule.match(message, embed)
+                if found:
+                    fired.append((rule, embed, found))
+                    break
+        return fired
+
+    def stats(self) -> List[dict]:
+        return [{
+            "name": r.name,
+            "action": r.action,
+            "evaluations": r.evaluations,
+            "hits": r.hits,
+            "avg_us": (r.total_ns / r.evaluations / 1000) if r.evaluations else 0.0,
+        } for r in self.rules]
@@ -0,0 +1,76 @@
+# discord-bot/utils/schedule.py
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from typing import List, Tuple
+
+PAUSED = "paused"
+OPEN = "open"
+
+
+def _minutes(text: str) -> int:
+    hours, _, minutes = text.strip().partition(":")
+    hours, minutes = int(hours), int(minutes or 0)
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ValueError(f"time out of range: {text!r}")
+    return hours * 60 + minutes
+
+
+class PollSchedule:
+    """
+    When a poll is paused: a list of (start, end) windows in minutes after local midnight,
+    in one time zone. A window may wrap past midnight (e.g. 21:00-08:00).
+    """
+
+    def __init__(self, windows: List[Tuple[int, int]], tz: ZoneInfo):
+        self.windows = windows
+        self.tz = tz
+
+    @classmethod
+    def parse(cls, text: str, default_tz: str = "America/Denver") -> "PollSchedule":
+        """
+        Parse "21:00-08:00,13:00-13:30@Europe/Berlin": comma separated pause windows,
+        optionally followed by @<IANA time zone>. An empty string means never paused.
+        """
+        text, _, tz_name = text.partition("@")
+        windows = []
+        for part in text.split(","):
+            if not part.strip():
+                continue
+            start, _, end = part.partition("-")
+            windows.append((_minutes(start), _minutes(end)))
+        return cls(windows, ZoneInfo(tz_name.strip() or default_tz))
+
+    def phase_at(self, when: datetime) -> str:
+        local = when.astimezone(self.tz)
+        minute = local.hour * 60 + local.minute
+        for start, end in self.windows:
+            if start <= end:
+                if start <= minute < end:
+                    return PAUSED
+            elif minute >= start or minute < end:
+                return PAUSED
+        return OPEN
+
+    def next_transition(self, when: datetime) -> Tuple[datetime, str] | None:
+        """The next moment after `when` at which the phase changes, and the phase it changes to."""
+        if not self.windows:
+            return None
+        current = self.phase_at(when)
+        local = when.astimezone(self.tz)
+        candidates = []
+        for day in range(3):
+            date = (local + timedelta(days=day)).date()
+            for start, end in self.windows:
+                for minute in (start, end):
+                    at = datetime(date.year, date.month, date.day, minute // 60, minute % 60, tzinfo=self.tz)
+                    if at > when:
+                        candidates.append(at)
+        for at in sorted(candidates):
+            phase = self.phase_at(at)
+            if phase != current:
+                return at, phase
+        return None
+
+    def describe(self) -> str:
+        windows = ", ".join(f"{s // 60:02d}:{s % 60:02d}-{e // 60:02d}:{e % 60:02d}" for s, e in self.windows)
+        return f"{windows or 'never'} ({self.tz.key})"
@@ -0,0 +1,59 @@
+# discord-bot/utils/snapshot.py
+import os
+import time
+from typing import Any, Callable, Dict, Tuple
+from utils.storage import atomic_write_json, read_json, data_path
+from utils.log import log
+
+SNAPSHOT_VERSION = 1
+
+
+class Snapshot:
+    """
+    What the bot was doing when it was told to stop, written once on SIGTERM and read
+    back once by the next start, before it connects.
+
+    Modules register a section with a dump() that returns something JSON-able and a
+    load(data) that puts it back. The file is removed after it was loaded: if the bot
+    later crashes without writing a new one, the next start doesn't trust old data and
+    recovers the slow way (message index and channel history) instead.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.sections: Dict[str, Tuple[Callable[[], Any], Callable[[Any], None]]] = {}
+
+    def section(self, name: str, dump: Callable[[], Any], load: Callable[[Any], None]):
+        self.sections[name] = (dump, load)
+
+    def write(self) -> int:
+        """Dump every section into one file. Returns its size in bytes."""
+        data = {"v": SNAPSHOT_VERSION, "at": time.time()}
+        for name, (dump, _) in self.sections.items():
+            try:
+                data[name] = dump()
+            except Exception as e:
+                log.error("snapshot.dump_failed", f"❌ Snapshot section {name} failed: {e}", section=name, exc=e)
+        atomic_write_json(self.path, data)
+        return os.path.getsize(self.path)
+
+    def restore(self) -> float | None:
+        """Load the snapshot left by the last shutdown, if any. Returns how old it is in seconds."""
+        data = read_json(self.path)
+        if not isinstance(data, dict) or data.get("v") != SNAPSHOT_VERSION:
+            return None
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+        for name, (_, load) in self.sections.items():
+            if name in data:
+                try:
+                    load(data[name])
+                except Exception as e:
+                    log.error("snapshot.load_failed", f"❌ Could not restore {name} from the snapshot: {e}", section=name, exc=e)
+        return time.time() - data["at"]
+
+
+# the one snapshot of the process
+snapshot = Snapshot(data_path("snapshot.json"))
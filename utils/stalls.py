@@ -0,0 +1,187 @@
+# discord-bot/utils/stalls.py
+import os
+import sys
+import time
+import heapq
+import asyncio
+import itertools
+import threading
+import traceback
+from typing import List, Tuple
+from discord import ui
+from discord.ext import commands
+from utils.log import log
+from utils.metrics import LOOP_LAG_SECONDS, LOOP_STALLS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STACK_DEPTH = 15
+
+
+def _where(frame: traceback.FrameSummary) -> str:
+    """file:line in function, with the path relative to the bot (or to site-packages)."""
+    path = frame.filename
+    if path.startswith(ROOT + os.sep):
+        path = os.path.relpath(path, ROOT)
+    elif "site-packages" in path:
+        path = path.split("site-packages" + os.sep, 1)[1]
+    return f"{path}:{frame.lineno} in {frame.name}"
+
+
+def _ours(path: str) -> bool:
+    return path.startswith(ROOT + os.sep) and "site-packages" not in path and path != __file__
+
+
+class Stall:
+    """One time the event loop was held for longer than the threshold."""
+    __slots__ = ("at", "seconds", "task", "cog", "command", "where", "stack")
+
+    def __init__(self, at: float, seconds: float, sample: dict | None):
+        sample = sample or {}
+        self.at = at
+        self.seconds = seconds
+        self.task: str | None = sample.get("task")
+        self.cog: str | None = sample.get("cog")
+        self.command: str | None = sample.get("command")
+        self.where: str | None = sample.get("where")
+        self.stack: List[str] = sample.get("stack", [])
+
+
+class StallDetector:
+    """
+    Opt-in watchdog for event loop stalls (BOT_STALL_THRESHOLD_MS, off at 0).
+
+    A callback on the loop notes the time every quarter of the threshold and records
+    how late it ran (the loop lag). A daemon thread looks at that note just as often:
+    once the loop is overdue by more than the threshold, something is holding it, and
+    the thread samples the loop thread's stack on the spot, while the culprit is still
+    on it. When the loop comes back the stall's length is known; it is kept together
+    with the sample: the task that was running, the cog (or view) and command involved
+    and the innermost line of the bot's own code. Only the `keep` worst are kept.
+
+    Between stalls it costs one callback and one thread wake-up per interval.
+    """
+
+    def __init__(self, keep: int = 20):
+        self.keep = keep
+        self.threshold = 0.0
+        self.stalls = 0
+        self._worst: List[Tuple[float, int, Stall]] = []  # min-heap, the mildest stall on top
+        self._seq = itertools.count()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread: int | None = None
+        self._handle: asyncio.TimerHandle | None = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._due = 0.0
+        # (due, sample) written by the watchdog thread for the stall that made the loop miss `due`
+        self._sample: Tuple[float, dict] | None = None
+
+    @property
+    def interval(self) -> float:
+        return self.threshold / 4
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def configure(self, threshold_ms: float, keep: int):
+        """Apply the settings: starts or stops the watchdog when it is switched on or off."""
+        self.keep = max(1, keep)
+        while len(self._worst) > self.keep:
+            heapq.heappop(self._worst)
+        self.threshold = max(0.0, threshold_ms / 1000)
+        if self.threshold and not self.running:
+            self.start()
+        elif not self.threshold and self.running:
+            self.stop()
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._due = time.monotonic() + self.interval
+        self._handle = self._loop.call_at(self._loop.time() + self.interval, self._tick)
+        # a fresh event each time: a thread from before a quick stop/start still sees its own set
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._watch, args=(self._stop,), name="stall-watchdog", daemon=True)
+        self._thread.start()
+        log.info("stalls.started", f"🐢 Watching for event loop stalls over {self.threshold * 1000:.0f} ms",
+                 threshold_ms=self.threshold * 1000)
+
+    def stop(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self._stop.set()
+        self._thread = None
+
+    def worst(self) -> List[Stall]:
+        """The kept stalls, longest first."""
+        return [stall for _, _, stall in sorted(self._worst, reverse=True)]
+
+    # ---- on the loop --------------------------------------------------------
+
+    def _tick(self):
+        now = time.monotonic()
+        due = self._due
+        late = max(0.0, now - due)
+        LOOP_LAG_SECONDS.observe(late)
+        if late >= self.threshold:
+            sample = self._sample
+            self._record(late, sample[1] if sample is not None and sample[0] == due else None)
+        self._sample = None
+        self._due = now + self.interval
+        self._handle = self._loop.call_at(self._loop.time() + self.interval, self._tick)
+
+    def _record(self, seconds: float, sample: dict | None):
+        stall = Stall(time.time() - seconds, seconds, sample)
+        self.stalls += 1
+        LOOP_STALLS.inc()
+        entry = (seconds, next(self._seq), stall)
+        if len(self._worst) < self.keep:
+            heapq.heappush(self._worst, entry)
+        elif seconds > self._worst[0][0]:
+            heapq.heapreplace(self._worst, entry)
+        log.warning("loop.stall", f"🐢 Event loop blocked for {seconds * 1000:.0f} ms"
+                    + (f" at {stall.where}" if stall.where else " (too short to sample)"),
+                    ms=round(seconds * 1000, 1), task=stall.task, cog=stall.cog, command=stall.command, where=stall.where)
+
+    # ---- on the watchdog thread ---------------------------------------------
+
+    def _watch(self, stop: threading.Event):
+        while not stop.wait(self.interval):
+            due = self._due
+            if time.monotonic() - due >= self.threshold and (self._sample is None or self._sample[0] != due):
+                self._sample = (due, self._take_sample())
+
+    def _take_sample(self) -> dict:
+        """What the loop thread is doing right now."""
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is None:
+            return {}
+        sample = {}
+        task = asyncio.current_task(self._loop)
+        if task is not None:
+            coro = task.get_coro()
+            sample["task"] = f"{task.get_name()} ({getattr(coro, '__qualname__', coro)})"
+        # innermost first: the closest cog/view and command to where the loop is stuck
+        f = frame
+        while f is not None and not ("cog" in sample and "command" in sample):
+            names = f.f_code.co_varnames
+            if "self" in names or "ctx" in names:
+                scope = f.f_locals
+                owner = scope.get("self")
+                if "cog" not in sample and isinstance(owner, (commands.Cog, ui.View)):
+                    sample["cog"] = type(owner).__name__
+                ctx = scope.get("ctx")
+                if "command" not in sample and isinstance(ctx, commands.Context) and ctx.command is not None:
+                    sample["command"] = ctx.command.qualified_name
+            f = f.f_back
+        stack = traceback.extract_stack(frame)
+        ours = [s for s in stack if _ours(s.filename)]
+        sample["where"] = _where(ours[-1] if ours else stack[-1])
+        sample["stack"] = [_where(s) for s in stack[-STACK_DEPTH:]]
+        return sample
+
+
+# the one detector of the process, started by AdminCog when BOT_STALL_THRESHOLD_MS is set
+stalls = StallDetector()
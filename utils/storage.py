@@ -0,0 +1,37 @@
+# discord-bot/utils/storage.py
+import os
+import json
+import threading
+from utils.config import get_config
+
+
+def data_dir() -> str:
+    """Where the bot keeps its local state (votes, indexes, ...), BOT_DATA_DIR. Mount a volume here on Railway."""
+    path = get_config().data_dir
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def data_path(name: str) -> str:
+    """Path of a file inside the data directory (the directory is created if needed)."""
+    return os.path.join(data_dir(), name)
+
+
+def atomic_write_json(path: str, data):
+    """Write JSON to path so readers only ever see the old or the new file, never half of one."""
+    # own temp file per writer thread, so two saves of the same file can't trip over each other
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def read_json(path: str, default=None):
+    """Read a JSON file, returning default if it is missing or unreadable."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
@@ -0,0 +1,184 @@
+# discord-bot/utils/timers.py
+import time
+import heapq
+import asyncio
+import itertools
+from typing import Any, Callable, Dict, List, Tuple
+from utils.log import log
+
+
+class Clock:
+    """Real time. Swap for a VirtualClock to run timers in simulated time."""
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def time(self) -> float:
+        """Wall clock (unix seconds), for things scheduled at a time of day."""
+        return time.time()
+
+
+class VirtualClock(Clock):
+    """A clock that only moves when told to (TimerService.advance / set)."""
+
+    def __init__(self, start: float | None = None):
+        self._now = 0.0
+        self._wall_start = time.time() if start is None else start
+
+    def monotonic(self) -> float:
+        return self._now
+
+    def time(self) -> float:
+        return self._wall_start + self._now
+
+    def set(self, monotonic: float):
+        self._now = max(self._now, monotonic)
+
+
+class Timer:
+    __slots__ = ("key", "deadline", "callback", "args", "cancelled")
+
+    def __init__(self, key: str, deadline: float, callback: Callable, args: Tuple):
+        self.key = key
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+
+class TimerService:
+    """
+    One heap of deadlines on the event loop that owns every deferred poll transition
+    (cooldowns, scheduled pauses, ...). Timers have a string key so they can be
+    cancelled or moved; a single runner task sleeps until the earliest deadline.
+
+    Cancelled timers stay in the heap and are skipped when they come up, which keeps
+    schedule/cancel O(log n) / O(1) even with thousands pending.
+    """
+
+    def __init__(self, clock: Clock | None = None):
+        self.clock = clock or Clock()
+        self._heap: List[Tuple[float, int, Timer]] = []
+        self._timers: Dict[str, Timer] = {}
+        self._seq = itertools.count()
+        self._wakeup: asyncio.Event | None = None
+        self._runner: asyncio.Task | None = None
+        self._running_callbacks: set = set()
+
+    # ---- public API ---------------------------------------------------------
+
+    def schedule(self, key: str, delay: float, callback: Callable, *args: Any) -> Timer:
+        """Run callback(*args) (sync or async) after delay seconds. Replaces any timer with the same key."""
+        self.cancel(key)
+        timer = Timer(key, self.clock.monotonic() + max(0.0, delay), callback, args)
+        self._timers[key] = timer
+        heapq.heappush(self._heap, (timer.deadline, next(self._seq), timer))
+        self._poke()
+        return timer
+
+    def cancel(self, key: str) -> bool:
+        timer = self._timers.pop(key, None)
+        if timer is None:
+            return False
+        timer.cancelled = True
+        if len(self._heap) > 2 * len(self._timers) + 64:
+            # mostly dead entries — rebuild so the heap doesn't grow without bound
+            self._heap = [entry for entry in self._heap if not entry[2].cancelled]
+            heapq.heapify(self._heap)
+        return True
+
+    def reschedule(self, key: str, delay: float) -> bool:
+        """Move an existing timer to fire delay seconds from now. Returns False if there is none."""
+        timer = self._timers.get(key)
+        if timer is None:
+            return False
+        self.schedule(key, delay, timer.callback, *timer.args)
+        return True
+
+    def remaining(self, key: str) -> float | None:
+        """Seconds until the timer fires, or None if no such timer is pending."""
+        timer = self._timers.get(key)
+        if timer is None:
+            return None
+        return max(0.0, timer.deadline - self.clock.monotonic())
+
+    def pending(self) -> int:
+        return len(self._timers)
+
+    async def advance(self, seconds: float) -> int:
+        """
+        Virtual time only: move the clock forward, firing (and awaiting) every timer that
+        comes due on the way, in deadline order. Returns how many fired.
+        """
+        if not isinstance(self.clock, VirtualClock):
+            raise RuntimeError("advance() needs a VirtualClock")
+        end = self.clock.monotonic() + seconds
+        fired = 0
+        while self._heap and self._heap[0][0] <= end:
+            deadline, _, timer = heapq.heappop(self._heap)
+            if timer.cancelled:
+                continue
+            self.clock.set(deadline)
+            self._timers.pop(timer.key, None)
+            result = timer.callback(*timer.args)
+            if asyncio.iscoroutine(result):
+                await result
+            fired += 1
+        self.clock.set(end)
+        return fired
+
+    # ---- real-time runner ---------------------------------------------------
+
+    def _poke(self):
+        if isinstance(self.clock, VirtualClock):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._runner is None or self._runner.done():
+            self._runner = loop.create_task(self._run())
+        self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            self._fire_due()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+            delay = self._heap[0][0] - self.clock.monotonic()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+
+    def _fire_due(self):
+        now = self.clock.monotonic()
+        while self._heap and self._heap[0][0] <= now:
+            _, _, timer = heapq.heappop(self._heap)
+            if timer.cancelled:
+                continue
+            self._timers.pop(timer.key, None)
+            try:
+                result = timer.callback(*timer.args)
+            except Exception as e:
+                log.error("timer.failed", f"❌ Timer {timer.key} failed: {e}", timer=timer.key, exc=e)
+                continue
+            if asyncio.iscoroutine(result):
+                task = asyncio.create_task(self._guard(timer.key, result))
+                self._running_callbacks.add(task)
+                task.add_done_callback(self._running_callbacks.discard)
+
+    async def _guard(self, key: str, coro):
+        try:
+            await coro
+        except Exception as e:
+            log.error("timer.failed", f"❌ Timer {key} failed: {e}", timer=key, exc=e)
+
+
+# single timer service for the whole bot
+timers = TimerService()
@@ -0,0 +1,122 @@
+# discord-bot/utils/tracked.py
+import time
+import asyncio
+import discord
+from typing import Dict, Iterable, List, Tuple
+from utils.storage import atomic_write_json, read_json
+from utils.outbound import outbound, channel_route, state_of, CLEANUP
+from utils.log import log
+
+# Discord refuses bulk deletes of messages older than 14 days (keep a small safety margin)
+BULK_DELETE_MAX_AGE = 14 * 24 * 3600 - 60
+BULK_DELETE_CHUNK = 100
+
+
+class SentRegistry:
+    """
+    Remembers the IDs of the messages the bot sent, per channel, so cleanup can delete
+    exactly those with bulk delete calls instead of paging through channel history.
+    """
+
+    def __init__(self, path: str, per_channel_limit: int = 500):
+        self.path = path
+        self.per_channel_limit = per_channel_limit
+        raw = read_json(path, {}) or {}
+        # dict used as an ordered set: oldest message first
+        self.channels: Dict[int, Dict[int, None]] = {int(cid): dict.fromkeys(ids) for cid, ids in raw.items()}
+        self._save_task: asyncio.Task | None = None
+        self._dirty = False
+
+    def track(self, message):
+        """Remember a message the bot sent (safe to call twice for the same message)."""
+        ids = self.channels.setdefault(message.channel.id, {})
+        if message.id in ids:
+            return
+        ids[message.id] = None
+        while len(ids) > self.per_channel_limit:
+            del ids[next(iter(ids))]
+        self._schedule_save()
+
+    def forget(self, channel_id: int, message_ids: Iterable[int]):
+        ids = self.channels.get(channel_id)
+        if not ids:
+            return
+        for mid in message_ids:
+            ids.pop(mid, None)
+        self._schedule_save()
+
+    async def purge(self, channel, keep: Iterable[int] = ()) -> Tuple[int, int, List[int]]:
+        """
+        Delete every tracked bot message in channel (except the IDs in keep).
+        Returns (messages deleted, REST calls made, IDs that are gone now, including ones
+        that were already deleted).
+        """
+        keep = set(keep)
+        ids = [mid for mid in self.channels.get(channel.id, {}) if mid not in keep]
+        if not ids:
+            return 0, 0, []
+
+        cutoff = time.time() - BULK_DELETE_MAX_AGE
+        recent = [mid for mid in ids if discord.utils.snowflake_time(mid).timestamp() > cutoff]
+        old = [mid for mid in ids if discord.utils.snowflake_time(mid).timestamp() <= cutoff]
+        deleted = calls = 0
+        gone = []
+        # a worker process can make these calls (BOT_WORKERS) when it's a real channel
+        remote = state_of(channel) is not None
+
+        for i in range(0, len(recent), BULK_DELETE_CHUNK):
+            chunk = recent[i:i + BULK_DELETE_CHUNK]
+            if len(chunk) == 1:
+                # bulk delete needs at least 2 messages
+                old.extend(chunk)
+                continue
+            calls += 1
+            try:
+                await outbound.call(channel_route(channel.id), CLEANUP,
+                                    lambda chunk=chunk: channel.delete_messages([discord.Object(id=mid) for mid in chunk]),
+                                    job=("bulk_delete", channel.id, chunk) if remote else None)
+                deleted += len(chunk)
+                gone.extend(chunk)
+            except discord.HTTPException as e:
+                # e.g. one of them was already deleted — retry this chunk one by one
+                log.warning("cleanup.bulk_failed", f"Bulk delete failed in channel {channel.id}: {e}", channel=channel.id, error=str(e))
+                old.extend(chunk)
+
+        for mid in old:
+            calls += 1
+            try:
+                await outbound.call(channel_route(channel.id), CLEANUP, channel.get_partial_message(mid).delete,
+                                    job=("delete", channel.id, mid) if remote else None)
+                deleted += 1
+                gone.append(mid)
+            except discord.NotFound:
+                gone.append(mid)
+            except discord.HTTPException as e:
+                log.warning("cleanup.delete_failed", f"Failed to delete message {mid}: {e}", channel=channel.id, message=mid, error=str(e))
+
+        self.forget(channel.id, gone)
+        return deleted, calls, gone
+
+    def _schedule_save(self):
+        self._dirty = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._save()
+            return
+        if self._save_task is None or self._save_task.done():
+            self._save_task = loop.create_task(self._save_later())
+
+    async def _save_later(self):
+        # collect a second's worth of changes into one write, again if more came in meanwhile
+        while self._dirty:
+            await asyncio.sleep(1.0)
+            self._dirty = False
+            await asyncio.to_thread(atomic_write_json, self.path, self._snapshot())
+
+    def _snapshot(self) -> dict:
+        return {str(cid): list(ids) for cid, ids in self.channels.items() if ids}
+
+    def _save(self):
+        self._dirty = False
+        atomic_write_json(self.path, self._snapshot())
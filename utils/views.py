@@ -0,0 +1,84 @@
+# discord-bot/utils/views.py
+import sys
+import time
+from typing import Callable, Dict
+import discord
+from utils.metrics import INTERACTION_ACK_SECONDS
+
+
+def view_size(view: discord.ui.View) -> int:
+    """Rough bytes held by a view and its items (not what they point to, like the poll state)."""
+    size = sys.getsizeof(view) + sys.getsizeof(vars(view))
+    for item in view.children:
+        size += sys.getsizeof(item) + sys.getsizeof(vars(item))
+        underlying = getattr(item, "_underlying", None)
+        if underlying is not None:
+            size += sys.getsizeof(underlying)
+    return size
+
+
+def component_label(custom_id: str) -> str:
+    """Metric label of a component: the first two parts of its custom_id ("poll:vote", "roles:toggle")."""
+    return ":".join(custom_id.split(":")[:2]) or "unknown"
+
+
+class TimedView(discord.ui.View):
+    """A view whose component callbacks (which answer the click) are timed in INTERACTION_ACK_SECONDS."""
+
+    async def _scheduled_task(self, item: discord.ui.Item, interaction: discord.Interaction):
+        started = time.perf_counter()
+        try:
+            await super()._scheduled_task(item, interaction)
+        finally:
+            INTERACTION_ACK_SECONDS.observe(time.perf_counter() - started,
+                                            component_label((interaction.data or {}).get("custom_id", "")))
+
+
+class ViewRegistry:
+    """
+    Exactly one live view per message. discord.py keeps every view handed to add_view()
+    (or sent/edited along with a message) in its view store until the view is stopped,
+    so building a new one on every reset or cooldown piles them up for as long as the
+    process runs. Callers take the message's view from here, flip its buttons in place,
+    and drop() it once the message is gone or no longer has buttons.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.views: Dict[int, discord.ui.View] = {}
+
+    def __len__(self) -> int:
+        return len(self.views)
+
+    def get(self, message_id: int, factory: Callable[[], discord.ui.View]) -> discord.ui.View:
+        """The message's view, built with factory() and registered the first time."""
+        view = self.views.get(message_id)
+        if view is None:
+            view = self.views[message_id] = factory()
+            self.bot.add_view(view, message_id=message_id)
+        return view
+
+    def put(self, message_id: int, view: discord.ui.View):
+        """Register a view that was just sent with a new message (replacing any other for it)."""
+        old = self.views.get(message_id)
+        if old is not None and old is not view:
+            old.stop()
+        self.views[message_id] = view
+        self.bot.add_view(view, message_id=message_id)
+
+    def drop(self, message_id: int):
+        """Forget the message's view; stopping it removes it from discord.py's view store too."""
+        view = self.views.pop(message_id, None)
+        if view is not None:
+            view.stop()
+
+    def stats(self) -> dict:
+        """Live views here and in discord.py's view store, with their approximate memory."""
+        store = self.bot._connection._view_store
+        return {
+            "views": len(self.views),
+            "bytes": sum(view_size(v) for v in self.views.values()),
+            "store_messages": len(store._synced_message_views),
+            "store_items": sum(len(items) for items in store._views.values()),
+            "store_persistent": len(store.persistent_views),
+        }
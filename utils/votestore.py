@@ -0,0 +1,154 @@
+# discord-bot/utils/votestore.py
+import os
+import json
+import time
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Set, List, Tuple
+from utils.storage import atomic_write_json, read_json
+from utils.log import log
+
+
+class VoteStore:
+    """
+    Poll votes kept in memory and made durable with an append-only log plus compacted snapshots.
+
+    Mutations only touch memory and a buffer; a background task appends the buffer to the
+    log (fsync in a worker thread) every flush_interval seconds, so a click never waits on disk.
+    Once the log has compact_every entries it is folded into the snapshot and truncated.
+
+    Writes go through one writer thread, one at a time and in order, and lines leave the
+    buffer only once they are on disk: a failed write is tried again with the next flush.
+    """
+
+    def __init__(self, directory: str, flush_interval: float = 0.5, compact_every: int = 1000):
+        self.snapshot_path = os.path.join(directory, "votes.snapshot.json")
+        self.log_path = os.path.join(directory, "votes.log")
+        self.flush_interval = flush_interval
+        self.compact_every = compact_every
+        self.votes: Dict[int, Set[int]] = {}
+        self._buffer: List[str] = []
+        self._log_entries = 0
+        self._flusher: asyncio.Task | None = None
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="votestore")
+        # the write currently handed to the writer thread, joined by flush_now()
+        self._writing: Future | None = None
+
+    # ---- startup -------------------------------------------------------------
+
+    def load(self) -> float:
+        """Rebuild votes from snapshot + log. Returns how long it took in milliseconds."""
+        start = time.perf_counter()
+        os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+        snapshot = read_json(self.snapshot_path, {}) or {}
+        self.votes = {int(mid): set(uids) for mid, uids in snapshot.items()}
+        self._log_entries = 0
+        try:
+            with open(self.log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # a torn last line from a crash mid-write; everything before it is good
+                        break
+                    self._apply(record)
+                    self._log_entries += 1
+        except OSError:
+            pass
+        return (time.perf_counter() - start) * 1000
+
+    def _apply(self, record: dict):
+        op, mid = record["op"], record["m"]
+        if op == "add":
+            self.votes.setdefault(mid, set()).add(record["u"])
+        elif op == "remove":
+            self.votes.setdefault(mid, set()).discard(record["u"])
+        elif op == "reset":
+            self.votes[mid] = set()
+        elif op == "drop":
+            self.votes.pop(mid, None)
+
+    # ---- mutations (memory first, disk later) --------------------------------
+
+    def get(self, message_id: int) -> Set[int]:
+        return self.votes.setdefault(message_id, set())
+
+    def add(self, message_id: int, user_id: int):
+        self._record({"op": "add", "m": message_id, "u": user_id})
+
+    def remove(self, message_id: int, user_id: int):
+        self._record({"op": "remove", "m": message_id, "u": user_id})
+
+    def reset(self, message_id: int):
+        """Clear all votes on a poll message (new round)."""
+        self._record({"op": "reset", "m": message_id})
+
+    def drop(self, message_id: int):
+        """Forget a poll message entirely (it was replaced or deleted)."""
+        if message_id in self.votes:
+            self._record({"op": "drop", "m": message_id})
+
+    def _record(self, record: dict):
+        self._apply(record)
+        self._buffer.append(json.dumps(record, separators=(",", ":")))
+        if self._flusher is None or self._flusher.done():
+            try:
+                self._flusher = asyncio.get_running_loop().create_task(self._flush_later())
+            except RuntimeError:
+                # no event loop (scripts/tools) — write straight away
+                self.flush_now()
+
+    # ---- disk ---------------------------------------------------------------
+
+    async def _flush_later(self):
+        # keep going while changes arrive during the write, so nothing is left in the buffer
+        while self._buffer:
+            await asyncio.sleep(self.flush_interval)
+            self._writing = self._writer.submit(self._write, *self._take())
+            try:
+                await asyncio.wrap_future(self._writing)
+            except OSError as e:
+                log.error("votes.persist_failed", f"❌ Failed to persist votes, will retry: {e}", exc=e)
+
+    def _take(self) -> Tuple[int, List[str], dict | None]:
+        """What the next write covers: the buffered lines, plus a snapshot when the log is due for compaction."""
+        lines = list(self._buffer)
+        if self._log_entries + len(lines) >= self.compact_every:
+            return len(lines), lines, {str(mid): sorted(uids) for mid, uids in self.votes.items()}
+        return len(lines), lines, None
+
+    def _write(self, count: int, lines: List[str], snapshot: dict | None):
+        if snapshot is not None:
+            self._write_snapshot(snapshot)
+            self._log_entries = 0
+        elif lines:
+            self._append_lines(lines)
+            self._log_entries += count
+        # only now: lines buffered since _take() stay for the next write
+        del self._buffer[:count]
+
+    def _append_lines(self, lines: List[str]):
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _write_snapshot(self, snapshot: dict):
+        # The snapshot already contains every buffered change, so the log can start over.
+        atomic_write_json(self.snapshot_path, snapshot)
+        with open(self.log_path, "w", encoding="utf-8") as f:
+            f.flush()
+            os.fsync(f.fileno())
+
+    def flush_now(self):
+        """Synchronously write anything still buffered (used on shutdown)."""
+        if self._flusher is not None and not self._flusher.done():
+            self._flusher.cancel()
+        # a write already running in the writer thread finishes first, so the newer lines land after it
+        if self._writing is not None:
+            try:
+                self._writing.result()
+            except Exception:
+                pass  # its lines are still buffered and written below
+        if self._buffer:
+            self._write(*self._take())
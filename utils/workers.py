@@ -0,0 +1,292 @@
+# discord-bot/utils/workers.py
+"""
+Worker processes that make REST calls for the bot (BOT_WORKERS > 0).
+
+The gateway process keeps everything that has to be quick: heartbeats, answering clicks,
+poll state, the outbound queue's priorities and rate limits. Calls the outbound queue
+can describe as plain data (sends, edits, deletes and bulk deletes in a channel, see
+utils/outbound.py) are handed to a worker over a Unix socket in the data directory, so
+building requests, TLS and parsing Discord's answers happen in another process. Anything
+else (DMs, webhooks, member fetches) and everything while no worker is connected still
+runs in the gateway process. If a worker dies mid-call, edits and deletes are made again
+here; a send fails with WorkerGone instead, since it may already have been posted.
+
+One JSON object per line each way: {"id", "job"} to the worker, {"id", "ok"} or
+{"id", "error"} back. A worker is started as
+
+    python -m utils.workers <socket path> [module:Runner]
+"""
+import os
+import sys
+import json
+import signal
+import asyncio
+import importlib
+import itertools
+from typing import Any, Dict, List, Tuple
+import discord
+from discord.http import HTTPClient, Route
+from utils.outbound import Action, DiscordBackend
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_RUNNER = "utils.workers:RestRunner"
+# a message with its components easily exceeds asyncio's default 64 KiB line limit
+LINE_LIMIT = 2 ** 24
+
+
+# jobs that can be made again if a worker died mid-call without harm (a send could post twice)
+RETRYABLE = ("edit", "delete", "bulk_delete")
+
+
+class WorkerGone(Exception):
+    """
+    No worker could answer the job (none connected, or it died before answering).
+    maybe_made: the job had been handed to a worker, so its call may have reached Discord.
+    """
+
+    def __init__(self, message: str, maybe_made: bool = False):
+        super().__init__(message)
+        self.maybe_made = maybe_made
+
+
+class _Response:
+    """What discord.HTTPException reads from a response, rebuilt from a worker's error."""
+
+    def __init__(self, status: int, reason: str, headers: Dict[str, str]):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+
+
+def http_error(error: dict) -> Exception:
+    """The exception the call would have raised in this process."""
+    if error.get("status") is None:
+        return RuntimeError(error.get("message", "worker failed"))
+    response = _Response(error["status"], error.get("reason", ""), error.get("headers") or {})
+    status = response.status
+    cls = {403: discord.Forbidden, 404: discord.NotFound}.get(status, discord.DiscordServerError if status >= 500 else discord.HTTPException)
+    e = cls(response, {"code": error.get("code", 0), "message": error.get("text", "")})
+    e.ratelimit_headers = response.headers
+    return e
+
+
+class _Connection:
+    __slots__ = ("reader", "writer", "in_flight")
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.in_flight = 0
+
+
+class WorkerPool:
+    """
+    Starts `count` worker processes and hands them jobs, each to the one with the fewest
+    in flight. A worker that exits is started again after a second.
+    """
+
+    def __init__(self, count: int, path: str, runner: str = DEFAULT_RUNNER):
+        self.count = count
+        self.path = path
+        self.runner = runner
+        self.jobs = 0
+        self._server: asyncio.AbstractServer | None = None
+        self._connections: List[_Connection] = []
+        self._futures: Dict[int, Tuple[asyncio.Future, _Connection]] = {}
+        self._ids = itertools.count(1)
+        self._supervisors: List[asyncio.Task] = []
+        self._processes: List[asyncio.subprocess.Process] = []
+        self._closing = False
+
+    @property
+    def connected(self) -> int:
+        return len(self._connections)
+
+    async def start(self):
+        from utils.log import log
+
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        self._server = await asyncio.start_unix_server(self._accept, path=self.path, limit=LINE_LIMIT)
+        loop = asyncio.get_running_loop()
+        self._supervisors = [loop.create_task(self._supervise(i), name=f"worker:{i}") for i in range(self.count)]
+        log.info("workers.starting", f"🧵 Starting {self.count} REST worker processes", workers=self.count)
+
+    async def stop(self):
+        self._closing = True
+        for task in self._supervisors:
+            task.cancel()
+        if self._server is not None:
+            self._server.close()
+        for connection in list(self._connections):
+            connection.writer.close()
+        for process in self._processes:
+            if process.returncode is None:
+                process.terminate()
+        for process in self._processes:
+            try:
+                await asyncio.wait_for(process.wait(), 2)
+            except asyncio.TimeoutError:
+                process.kill()
+        self._processes.clear()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    async def run(self, job: tuple) -> Any:
+        """Have a worker make the call; returns Discord's JSON answer or raises what the call raised."""
+        if not self._connections:
+            raise WorkerGone("no worker connected")
+        connection = min(self._connections, key=lambda c: c.in_flight)
+        job_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._futures[job_id] = (future, connection)
+        connection.in_flight += 1
+        self.jobs += 1
+        connection.writer.write(json.dumps({"id": job_id, "job": job}).encode() + b"\n")
+        reply = await future
+        if "error" in reply:
+            raise http_error(reply["error"])
+        return reply["ok"]
+
+    async def _supervise(self, index: int):
+        from utils.log import log
+
+        while not self._closing:
+            process = await asyncio.create_subprocess_exec(sys.executable, "-m", "utils.workers", self.path, self.runner, cwd=ROOT)
+            self._processes.append(process)
+            code = await process.wait()
+            self._processes.remove(process)
+            if self._closing:
+                return
+            log.warning("workers.exited", f"⚠️ REST worker {index} exited with {code}, starting it again",
+                        worker=index, code=code)
+            await asyncio.sleep(1)
+
+    async def _accept(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        connection = _Connection(reader, writer)
+        self._connections.append(connection)
+        try:
+            while line := await reader.readline():
+                reply = json.loads(line)
+                entry = self._futures.pop(reply["id"], None)
+                if entry is not None:
+                    connection.in_flight -= 1
+                    if not entry[0].done():
+                        entry[0].set_result(reply)
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            self._connections.remove(connection)
+            for job_id, (future, owner) in list(self._futures.items()):
+                if owner is connection:
+                    del self._futures[job_id]
+                    if not future.done():
+                        future.set_exception(WorkerGone("worker exited before answering", maybe_made=True))
+            writer.close()
+
+
+class WorkerBackend(DiscordBackend):
+    """Outbound backend that gives actions with a job to the worker pool and runs the rest here."""
+
+    def __init__(self, pool: WorkerPool):
+        self.pool = pool
+
+    async def perform(self, action: Action):
+        if action.job is None or not self.pool.connected:
+            return await super().perform(action)
+        try:
+            data = await self.pool.run(action.job)
+        except WorkerGone as e:
+            if e.maybe_made and action.job[0] not in RETRYABLE:
+                # the message may already be posted: tell the caller instead of sending it twice
+                from utils.log import log
+                log.warning("workers.lost", f"⚠️ REST worker died during a {action.job[0]}, not repeating it",
+                            job=action.job[0], route=action.route)
+                raise
+            return await super().perform(action)
+        return (action.finish(data) if action.finish is not None else data), None
+
+
+# ---- in the worker process ---------------------------------------------------
+
+class RestRunner:
+    """Makes a job's call with discord.py's HTTP client, which handles Discord's rate limits itself."""
+
+    async def start(self, token: str):
+        self.http = HTTPClient(asyncio.get_running_loop())
+        await self.http.static_login(token)
+
+    async def close(self):
+        await self.http.close()
+
+    async def run(self, job: list) -> Any:
+        kind, channel_id, *rest = job
+        if kind == "send":
+            return await self.http.request(Route("POST", "/channels/{channel_id}/messages", channel_id=channel_id), json=rest[0])
+        if kind == "edit":
+            message_id, payload = rest
+            return await self.http.request(Route("PATCH", "/channels/{channel_id}/messages/{message_id}",
+                                                 channel_id=channel_id, message_id=message_id), json=payload)
+        if kind == "delete":
+            return await self.http.request(Route("DELETE", "/channels/{channel_id}/messages/{message_id}",
+                                                 channel_id=channel_id, message_id=rest[0]))
+        if kind == "bulk_delete":
+            return await self.http.request(Route("POST", "/channels/{channel_id}/messages/bulk-delete", channel_id=channel_id),
+                                           json={"messages": [str(m) for m in rest[0]]})
+        raise ValueError(f"unknown job {kind!r}")
+
+
+def _error(e: Exception) -> dict:
+    if isinstance(e, discord.HTTPException):
+        response = getattr(e, "response", None)
+        return {"status": e.status, "reason": getattr(response, "reason", ""), "code": e.code, "text": e.text,
+                "headers": dict(getattr(response, "headers", {}) or {})}
+    return {"status": None, "message": f"{type(e).__name__}: {e}"}
+
+
+async def serve(path: str, runner_spec: str):
+    from utils.config import get_config
+    from utils.log import log
+
+    module, _, name = runner_spec.partition(":")
+    runner = getattr(importlib.import_module(module), name)()
+    await runner.start(get_config().discord_token)
+    reader, writer = await asyncio.open_unix_connection(path, limit=LINE_LIMIT)
+    log.info("workers.ready", f"🧵 REST worker {os.getpid()} ready", pid=os.getpid())
+    tasks = set()
+
+    async def answer(message: dict):
+        try:
+            reply = {"id": message["id"], "ok": await runner.run(message["job"])}
+        except Exception as e:
+            reply = {"id": message["id"], "error": _error(e)}
+        writer.write(json.dumps(reply).encode() + b"\n")
+
+    # the gateway closing the socket is the signal to stop
+    while line := await reader.readline():
+        task = asyncio.create_task(answer(json.loads(line)))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    await runner.close()
+    log.flush()
+
+
+def main(argv: List[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    # Ctrl+C reaches the whole process group: the gateway process finishes its queue and stops us
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    from utils.config import init_config
+    init_config(os.environ.get("BOT_ENV_FILE", ".env"))
+    try:
+        asyncio.run(serve(argv[0], argv[1] if len(argv) > 1 else DEFAULT_RUNNER))
+    except (KeyboardInterrupt, ConnectionError):
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())